@@ -1,7 +1,7 @@
 bl_info = {
     "name": "Action Auto Looper (Blender 5.0 Fix)",
     "author": "YourName",
-    "version": (1, 2),
+    "version": (1, 3),
     "blender": (5, 0, 0),
     "location": "View3D > Sidebar > Anima",
     "description": "Auto-match action slot, frame range and loop play",
@@ -9,6 +9,15 @@ bl_info = {
 }
 
 import bpy
+import math
+import time
+import random
+import fnmatch
+from collections import deque
+from bpy.app.handlers import persistent
+
+from mixamo_core import animdata, profiling, search
+from mixamo_core import store as action_store
 
 # ------------------------------------------------------------------------
 #    核心逻辑 (Core Logic)
@@ -16,35 +25,9 @@ import bpy
 
 def assign_action_robust(obj, action):
     """
-    适配 Blender 5.0 的动作应用逻辑。
+    适配 Blender 5.0 的动作应用逻辑 (slot 选择见 mixamo_core.animdata)。
     """
-    if not obj.animation_data:
-        obj.animation_data_create()
-    
-    adt = obj.animation_data
-    adt.action = action
-    
-    # Blender 5.0 Slotted Action 处理
-    if hasattr(action, "slots") and len(action.slots) > 0:
-        # 检查 adt 是否有 action_slot 属性 (5.0 API)
-        if hasattr(adt, "action_slot"):
-            needs_assign = True
-            
-            # 检查当前 slot 是否有效且属于当前 action
-            if adt.action_slot is not None:
-                # 遍历 action 的 slots 看当前 slot 是否在其中
-                for s in action.slots:
-                    if s == adt.action_slot:
-                        needs_assign = False
-                        break
-            
-            # 如果需要重新分配 (即当前 slot 无效或不属于此 action)
-            if needs_assign:
-                try:
-                    adt.action_slot = action.slots[0]
-                    # print(f"Assigned slot: {action.slots[0].name}")
-                except Exception as e:
-                    print(f"Could not assign slot: {e}")
+    animdata.assign_action(obj, action)
 
 def set_frame_range_from_action(scene, action):
     # Blender 5.0 依然兼容 frame_range
@@ -53,16 +36,360 @@ def set_frame_range_from_action(scene, action):
     scene.frame_end = int(end)
     scene.frame_current = int(start)
 
+# ------------------------------------------------------------------------
+#    播放列表 (Playlist)
+# ------------------------------------------------------------------------
+
+class PlaylistEntry:
+    """预先算好的一条播放记录：切换时无需再遍历 slots / 读 frame_range"""
+    __slots__ = ("action", "slot", "start", "end")
+
+    def __init__(self, action, slot, start, end):
+        self.action = action
+        self.slot = slot
+        self.start = start
+        self.end = end
+
+class PlaylistState:
+    """模块级播放状态 (ID 引用不能存进 RNA 属性里随 handler 使用)"""
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.obj = None
+        self.entries = []
+        self.index = 0
+        self.loops_per_clip = 1
+        self.loops_done = 0
+        self.last_frame = None
+
+    @property
+    def active(self):
+        return bool(self.entries)
+
+    @property
+    def current(self):
+        return self.entries[self.index] if self.entries else None
+
+_playlist = PlaylistState()
+
+def pick_action_slot(action):
+    """与 assign_action_robust 一致：优先 OBJECT 类型的 slot，否则取第一个"""
+    return animdata.slot_for_object(None, action)
+
+def build_playlist_entries(actions):
+    entries = []
+    for action in actions:
+        start, end = action.frame_range
+        entries.append(PlaylistEntry(action, pick_action_slot(action), int(start), int(end)))
+    return entries
+
+def filter_actions(pattern):
+    """按名称通配符筛选动作 (不区分大小写)，结果按名称排序"""
+    pattern = (pattern or "*").lower()
+    return sorted((a for a in bpy.data.actions if fnmatch.fnmatchcase(a.name.lower(), pattern)),
+                  key=lambda a: a.name)
+
+def apply_playlist_entry(obj, scene, entry):
+    """直接写 action / action_slot 与帧范围，不经过任何 operator"""
+    adt = obj.animation_data or obj.animation_data_create()
+    adt.action = entry.action
+    if entry.slot is not None and hasattr(adt, "action_slot"):
+        adt.action_slot = entry.slot
+    scene.frame_start = entry.start
+    scene.frame_end = entry.end
+    scene.frame_current = entry.start
+
+def playlist_jump(scene, index):
+    state = _playlist
+    state.index = index % len(state.entries)
+    state.loops_done = 0
+    apply_playlist_entry(state.obj, scene, state.current)
+    state.last_frame = scene.frame_current
+
+@persistent
+def aal_playlist_frame_handler(scene, depsgraph=None):
+    """播放到片尾回绕到 frame_start 时计一次循环，达到次数后切到下一段"""
+    state = _playlist
+    if not state.active:
+        return
+    entry = state.current
+    frame = scene.frame_current
+    try:
+        wrapped = state.last_frame is not None and frame == entry.start and state.last_frame > frame
+        state.last_frame = frame
+        if wrapped:
+            state.loops_done += 1
+            if state.loops_done >= state.loops_per_clip:
+                playlist_jump(scene, state.index + 1)
+    except ReferenceError:
+        # 撤销或删除导致 ID 失效：停止播放列表
+        stop_playlist()
+
+@persistent
+def aal_playlist_load_handler(_dummy=None):
+    stop_playlist()
+
+def start_playlist(obj, scene, entries, loops_per_clip):
+    stop_playlist()
+    _playlist.obj = obj
+    _playlist.entries = entries
+    _playlist.loops_per_clip = max(1, loops_per_clip)
+    playlist_jump(scene, 0)
+    bpy.app.handlers.frame_change_pre.append(aal_playlist_frame_handler)
+    bpy.app.handlers.load_pre.append(aal_playlist_load_handler)
+
+def stop_playlist():
+    _playlist.reset()
+    if aal_playlist_frame_handler in bpy.app.handlers.frame_change_pre:
+        bpy.app.handlers.frame_change_pre.remove(aal_playlist_frame_handler)
+    if aal_playlist_load_handler in bpy.app.handlers.load_pre:
+        bpy.app.handlers.load_pre.remove(aal_playlist_load_handler)
+
+# ------------------------------------------------------------------------
+#    群组预览 (Crowd Preview)
+# ------------------------------------------------------------------------
+
+CROWD_TRACK_NAME = "AAL Crowd"
+
+class FPSMeter:
+    """滚动窗口统计真实播放帧率 (frame_change_post 计时)"""
+    def __init__(self, window=60):
+        self.samples = deque(maxlen=window)
+        self.last = None
+        self.ticks = 0
+
+    def reset(self):
+        self.samples.clear()
+        self.last = None
+        self.ticks = 0
+
+    def tick(self):
+        now = time.perf_counter()
+        # 暂停后重新播放的长间隔不计入
+        if self.last is not None and now - self.last < 1.0:
+            self.samples.append(now - self.last)
+        self.last = now
+        self.ticks += 1
+
+    @property
+    def fps(self):
+        if not self.samples:
+            return 0.0
+        return len(self.samples) / sum(self.samples)
+
+_crowd_meter = FPSMeter()
+
+@persistent
+def aal_crowd_fps_handler(scene, depsgraph=None):
+    _crowd_meter.tick()
+    # 低频刷新面板上的 FPS 读数
+    if _crowd_meter.ticks % 15 == 0 and bpy.context.screen:
+        for area in bpy.context.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+def crowd_armatures(context):
+    return [obj for obj in context.selected_objects if obj.type == 'ARMATURE']
+
+def choose_crowd_actions(objects, pool, mode, rng):
+    """
+    为每个骨架挑一个动作 (共享同一 Action，不复制)：
+      RANDOM      随机
+      ROUND_ROBIN 轮流
+      TAG         骨架自定义属性 aal_tag 与动作标签匹配，在匹配集合内轮流
+    """
+    if mode == 'RANDOM':
+        return [rng.choice(pool) for _ in objects]
+    if mode == 'ROUND_ROBIN':
+        return [pool[i % len(pool)] for i in range(len(objects))]
+
+    by_tag = {}
+    for action in pool:
+        for tag in search.TOKEN_RE.findall(action.aal_tags.lower()):
+            by_tag.setdefault(tag, []).append(action)
+    counters = {}
+    chosen = []
+    for obj in objects:
+        tag = str(obj.get("aal_tag", "")).lower()
+        candidates = by_tag.get(tag) or pool
+        n = counters.get(tag, 0)
+        counters[tag] = n + 1
+        chosen.append(candidates[n % len(candidates)])
+    return chosen
+
+def clear_crowd_track(obj):
+    adt = obj.animation_data
+    if adt:
+        track = adt.nla_tracks.get(CROWD_TRACK_NAME)
+        if track:
+            adt.nla_tracks.remove(track)
+
+def assign_crowd_strip(obj, action, scene, offset):
+    """用 NLA strip 播放动作：起点前移 offset 帧，repeat 覆盖整个场景范围"""
+    adt = obj.animation_data or obj.animation_data_create()
+    adt.action = None
+    clear_crowd_track(obj)
+
+    track = adt.nla_tracks.new()
+    track.name = CROWD_TRACK_NAME
+    a_start, a_end = action.frame_range
+    length = max(a_end - a_start, 1.0)
+    start = scene.frame_start - offset
+    strip = track.strips.new(action.name, int(start), action)
+    slot = pick_action_slot(action)
+    if slot is not None and hasattr(strip, "action_slot"):
+        strip.action_slot = slot
+    strip.repeat = math.ceil((scene.frame_end - start) / length) + 1
+    return strip
+
+# ------------------------------------------------------------------------
+#    动作搜索索引 (Search Index)
+# ------------------------------------------------------------------------
+
+_search_index = search.ActionSearchIndex()
+
+@persistent
+def aal_search_depsgraph_handler(scene, depsgraph):
+    """增量更新：被修改/改名的动作直接重建记录，增删交给 ensure() 对账"""
+    if _search_index.stale:
+        return
+    for update in depsgraph.updates:
+        if isinstance(update.id, bpy.types.Action):
+            _search_index.add(update.id.original)
+
+@persistent
+def aal_search_load_handler(_dummy=None):
+    _search_index.clear()
+
+def run_action_search(props):
+    props.search_results.clear()
+    for name, score in _search_index.search(props.search_query, props.search_limit):
+        action = bpy.data.actions.get(name)
+        if action:
+            item = props.search_results.add()
+            item.action = action
+            item.score = score
+
+def update_search_query(self, context):
+    run_action_search(self)
+
+def update_action_tags(self, context):
+    if not _search_index.stale:
+        _search_index.add(self)
+
+# ------------------------------------------------------------------------
+#    外部动作库 (Action Store)
+# ------------------------------------------------------------------------
+
+def current_store(props):
+    """面板设置对应的动作库；未设置目录时返回 None"""
+    if not props.store_dir:
+        return None
+    return action_store.get_store(props.store_dir, props.store_capacity)
+
+def run_store_search(props):
+    """按名称 / 标签 / 来源子串筛选库中的动作 (不物化)"""
+    props.store_results.clear()
+    store = current_store(props)
+    if store is None:
+        return
+    terms = props.store_query.lower().split()
+    for name in store.names():
+        entry = store.index[name]
+        text = f"{name} {entry.get('tags', '')} {entry.get('source', '')}".lower()
+        if all(t in text for t in terms):
+            item = props.store_results.add()
+            item.name = name
+            item.keys = entry["keys"]
+            if len(props.store_results) >= props.search_limit:
+                break
+
+def update_store_query(self, context):
+    run_store_search(self)
+
+@persistent
+def aal_store_load_handler(_dummy=None):
+    # 物化记录只对当前文件有效
+    action_store.clear_stores()
+
+def play_action_loop(context, obj, action):
+    """Match & Loop 的完整流程，供按钮与搜索结果共用"""
+    assign_action_robust(obj, action)
+    set_frame_range_from_action(context.scene, action)
+    if not context.screen.is_animation_playing:
+        bpy.ops.screen.animation_play()
+
 # ------------------------------------------------------------------------
 #    数据属性 (Data Properties)
 # ------------------------------------------------------------------------
 
+class AAL_SearchResult(bpy.types.PropertyGroup):
+    action: bpy.props.PointerProperty(type=bpy.types.Action)
+    score: bpy.props.IntProperty()
+
+class AAL_StoreResult(bpy.types.PropertyGroup):
+    keys: bpy.props.IntProperty()
+
 class AAL_Properties(bpy.types.PropertyGroup):
     target_action: bpy.props.PointerProperty(
         name="Target Action",
         type=bpy.types.Action,
         description="Select the action to play"
     )
+    playlist_filter: bpy.props.StringProperty(
+        name="Filter",
+        description="按名称筛选播放列表 / 群组预览的动作 (支持 * ? 通配符)",
+        default="*"
+    )
+    playlist_loops: bpy.props.IntProperty(
+        name="Loops per Clip",
+        description="每段动作循环几次后自动切到下一段",
+        default=2, min=1, max=100
+    )
+    search_query: bpy.props.StringProperty(
+        name="Search",
+        description="按名称 / 标签 / 来源文件夹搜索动作 (支持前缀与模糊匹配)",
+        options={'TEXTEDIT_UPDATE'},
+        update=update_search_query
+    )
+    search_limit: bpy.props.IntProperty(
+        name="Max Results",
+        default=12, min=1, max=100
+    )
+    search_results: bpy.props.CollectionProperty(type=AAL_SearchResult)
+    crowd_mode: bpy.props.EnumProperty(
+        name="Assign",
+        items=[
+            ('ROUND_ROBIN', "Round Robin", "按顺序轮流分配"),
+            ('RANDOM', "Random", "随机分配"),
+            ('TAG', "By Tag", "骨架属性 aal_tag 与动作标签匹配"),
+        ],
+        default='ROUND_ROBIN'
+    )
+    crowd_max_offset: bpy.props.IntProperty(
+        name="Max Offset",
+        description="每个角色随机的起始帧偏移上限",
+        default=30, min=0
+    )
+    crowd_seed: bpy.props.IntProperty(name="Seed", default=0)
+    store_dir: bpy.props.StringProperty(
+        name="Store",
+        description="外部动作库目录 (压缩 .npz + index.json)",
+        subtype='DIR_PATH'
+    )
+    store_capacity: bpy.props.IntProperty(
+        name="Resident",
+        description="最多同时物化在文件中的库动作数 (LRU 淘汰未使用的动作)",
+        default=8, min=1, max=500
+    )
+    store_query: bpy.props.StringProperty(
+        name="Store Search",
+        description="按名称 / 标签 / 来源筛选库中的动作",
+        options={'TEXTEDIT_UPDATE'},
+        update=update_store_query
+    )
+    store_results: bpy.props.CollectionProperty(type=AAL_StoreResult)
 
 # ------------------------------------------------------------------------
 #    操作符 (Operator)
@@ -83,19 +410,266 @@ class AAL_OT_PlayLoop(bpy.types.Operator):
         obj = context.active_object
         props = context.scene.aal_props
         action = props.target_action
-        scene = context.scene
 
-        # 1. 应用动作 (修复版)
-        assign_action_robust(obj, action)
+        # 应用动作 (修复版) -> 设置时间轴范围 -> 播放
+        with profiling.run("Play Loop"):
+            with profiling.stage("play_action_loop", 1, "actions"):
+                play_action_loop(context, obj, action)
+
+        self.report({'INFO'}, f"Looping: {action.name}")
+        return {'FINISHED'}
+
+class AAL_OT_SearchActions(bpy.types.Operator):
+    """Query the in-memory action index (prefix + fuzzy)"""
+    bl_idname = "aal.search_actions"
+    bl_label = "Search Actions"
+
+    query: bpy.props.StringProperty(name="Query")
+    rebuild: bpy.props.BoolProperty(name="Rebuild Index", default=False)
+
+    def execute(self, context):
+        props = context.scene.aal_props
+        with profiling.run("Search Actions"):
+            if self.rebuild:
+                _search_index.clear()
+            with profiling.stage("search", len(bpy.data.actions), "actions"):
+                if self.query:
+                    props.search_query = self.query
+                else:
+                    run_action_search(props)
+        self.report({'INFO'}, f"{len(props.search_results)} matches")
+        return {'FINISHED'}
+
+class AAL_OT_SearchPick(bpy.types.Operator):
+    """Set the search result as target action and loop it"""
+    bl_idname = "aal.search_pick"
+    bl_label = "Loop Search Result"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    action_name: bpy.props.StringProperty()
+
+    @classmethod
+    def poll(cls, context):
+        return context.active_object is not None
+
+    def execute(self, context):
+        action = bpy.data.actions.get(self.action_name)
+        if not action:
+            self.report({'WARNING'}, f"Action not found: {self.action_name}")
+            return {'CANCELLED'}
+        context.scene.aal_props.target_action = action
+        with profiling.run("Play Loop"):
+            with profiling.stage("play_action_loop", 1, "actions"):
+                play_action_loop(context, context.active_object, action)
+        self.report({'INFO'}, f"Looping: {action.name}")
+        return {'FINISHED'}
+
+class AAL_OT_StorePack(bpy.types.Operator):
+    """Write actions into the external store as compressed arrays"""
+    bl_idname = "aal.store_pack"
+    bl_label = "Pack Actions"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    remove_packed: bpy.props.BoolProperty(
+        name="Remove From File",
+        description="打包后从文件中删除没有被使用的动作",
+        default=False
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return bool(context.scene.aal_props.store_dir)
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        props = context.scene.aal_props
+        store = current_store(props)
+        actions = [a for a in bpy.data.actions if not a.library]
+        removed = kept = 0
+        with profiling.run("Pack Actions"):
+            with profiling.stage("pack", len(actions), "actions"):
+                store.add_many(actions)
+            if self.remove_packed:
+                with profiling.stage("remove packed"):
+                    unused = [a for a in actions if not store.in_use(a)]
+                    # 曲线修改器等不入库的动作删除后无法原样物化，保留在文件中
+                    removable = [a for a in unused if store.removable(a)]
+                    kept = len(unused) - len(removable)
+                    for action in removable:
+                        store.resident.pop(action.get(action_store.STORE_KEY, ""), None)
+                    removed = len(removable)
+                    if removable:
+                        bpy.data.batch_remove(ids=removable)
+            with profiling.stage("store search"):
+                run_store_search(props)
+        message = f"Packed {len(actions)} actions ({store.total_bytes() / 1e6:.1f} MB), removed {removed}"
+        if kept:
+            message += f", kept {kept} (not lossless, see index.json)"
+        self.report({'INFO'}, message)
+        return {'FINISHED'}
+
+class AAL_OT_StorePlay(bpy.types.Operator):
+    """Materialize an action from the store and loop it"""
+    bl_idname = "aal.store_play"
+    bl_label = "Loop Stored Action"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    store_name: bpy.props.StringProperty()
+
+    @classmethod
+    def poll(cls, context):
+        return context.active_object is not None and bool(context.scene.aal_props.store_dir)
+
+    def execute(self, context):
+        props = context.scene.aal_props
+        store = current_store(props)
+        if self.store_name not in store:
+            self.report({'WARNING'}, f"Not in store: {self.store_name}")
+            return {'CANCELLED'}
+        obj = context.active_object
+        with profiling.run("Loop Stored Action"):
+            with profiling.stage("materialize", 1, "actions"):
+                action = store.materialize(self.store_name, obj.name)
+            props.target_action = action
+            with profiling.stage("play_action_loop", 1, "actions"):
+                play_action_loop(context, obj, action)
+            # 切换后上一个动作不再被使用，可以被淘汰
+            with profiling.stage("evict"):
+                store.evict(keep={self.store_name})
+        self.report({'INFO'}, f"Looping: {action.name} ({len(store.resident)} resident)")
+        return {'FINISHED'}
+
+class AAL_OT_StoreRelease(bpy.types.Operator):
+    """Remove every materialized store action that is not in use"""
+    bl_idname = "aal.store_release"
+    bl_label = "Release Unused"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return bool(context.scene.aal_props.store_dir)
 
-        # 2. 设置时间轴范围
-        set_frame_range_from_action(scene, action)
+    def execute(self, context):
+        with profiling.run("Release Unused"):
+            with profiling.stage("evict") as st:
+                removed = current_store(context.scene.aal_props).release_all()
+                st.add(removed, "actions")
+        self.report({'INFO'}, f"Released {removed} actions")
+        return {'FINISHED'}
+
+class AAL_OT_CrowdAssign(bpy.types.Operator):
+    """Assign filtered actions across all selected armatures as offset NLA strips"""
+    bl_idname = "aal.crowd_assign"
+    bl_label = "Assign Crowd"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return any(obj.type == 'ARMATURE' for obj in context.selected_objects)
+
+    def execute(self, context):
+        props = context.scene.aal_props
+        pool = filter_actions(props.playlist_filter)
+        if not pool:
+            self.report({'WARNING'}, "No actions match the filter")
+            return {'CANCELLED'}
 
-        # 3. 播放控制
+        objects = crowd_armatures(context)
+        rng = random.Random(props.crowd_seed)
+        with profiling.run("Assign Crowd"):
+            with profiling.stage("choose actions", len(objects), "characters"):
+                chosen = choose_crowd_actions(objects, pool, props.crowd_mode, rng)
+            with profiling.stage("assign strips", len(objects), "characters"):
+                for obj, action in zip(objects, chosen):
+                    assign_crowd_strip(obj, action, context.scene, rng.randint(0, props.crowd_max_offset))
+
+        # 开始测量帧率
+        _crowd_meter.reset()
+        if aal_crowd_fps_handler not in bpy.app.handlers.frame_change_post:
+            bpy.app.handlers.frame_change_post.append(aal_crowd_fps_handler)
         if not context.screen.is_animation_playing:
             bpy.ops.screen.animation_play()
 
-        self.report({'INFO'}, f"Looping: {action.name}")
+        self.report({'INFO'}, f"Crowd: {len(objects)} characters, {len(set(chosen))} distinct actions")
+        return {'FINISHED'}
+
+class AAL_OT_CrowdClear(bpy.types.Operator):
+    """Remove crowd NLA tracks from selected armatures and stop the FPS meter"""
+    bl_idname = "aal.crowd_clear"
+    bl_label = "Clear Crowd"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        objects = crowd_armatures(context)
+        if _crowd_meter.samples:
+            print(f"[Crowd] {len(objects)} characters: {_crowd_meter.fps:.1f} fps "
+                  f"({1000.0 / _crowd_meter.fps:.1f} ms/frame)")
+        for obj in objects:
+            clear_crowd_track(obj)
+        if aal_crowd_fps_handler in bpy.app.handlers.frame_change_post:
+            bpy.app.handlers.frame_change_post.remove(aal_crowd_fps_handler)
+        _crowd_meter.reset()
+        return {'FINISHED'}
+
+class AAL_OT_PlaylistStart(bpy.types.Operator):
+    """Precompute slots/frame ranges for all filtered actions and auto-advance on playback"""
+    bl_idname = "aal.playlist_start"
+    bl_label = "Start Playlist"
+
+    @classmethod
+    def poll(cls, context):
+        return context.active_object is not None
+
+    def execute(self, context):
+        props = context.scene.aal_props
+        with profiling.run("Start Playlist"):
+            with profiling.stage("filter", len(bpy.data.actions), "actions"):
+                actions = filter_actions(props.playlist_filter)
+            if not actions:
+                self.report({'WARNING'}, "No actions match the filter")
+                return {'CANCELLED'}
+            with profiling.stage("build entries", len(actions), "actions"):
+                entries = build_playlist_entries(actions)
+            start_playlist(context.active_object, context.scene, entries, props.playlist_loops)
+
+        if not context.screen.is_animation_playing:
+            bpy.ops.screen.animation_play()
+
+        self.report({'INFO'}, f"Playlist: {len(actions)} actions")
+        return {'FINISHED'}
+
+class AAL_OT_PlaylistStop(bpy.types.Operator):
+    """Stop auto-advancing"""
+    bl_idname = "aal.playlist_stop"
+    bl_label = "Stop Playlist"
+
+    @classmethod
+    def poll(cls, context):
+        return _playlist.active
+
+    def execute(self, context):
+        stop_playlist()
+        return {'FINISHED'}
+
+class AAL_OT_PlaylistStep(bpy.types.Operator):
+    """Jump to the previous / next clip in the playlist"""
+    bl_idname = "aal.playlist_step"
+    bl_label = "Playlist Step"
+
+    step: bpy.props.IntProperty(default=1)
+
+    @classmethod
+    def poll(cls, context):
+        return _playlist.active
+
+    def execute(self, context):
+        try:
+            playlist_jump(context.scene, _playlist.index + self.step)
+        except ReferenceError:
+            stop_playlist()
+            return {'CANCELLED'}
         return {'FINISHED'}
 
 # ------------------------------------------------------------------------
@@ -120,18 +694,89 @@ class AAL_PT_MainPanel(bpy.types.Panel):
 
         col = layout.column(align=True)
         col.template_ID(props, "target_action", new="action.new", open="action.open")
+        if props.target_action:
+            col.prop(props.target_action, "aal_tags")
+
+        box = layout.box()
+        row = box.row(align=True)
+        row.prop(props, "search_query", text="", icon='VIEWZOOM')
+        row.operator("aal.search_actions", text="", icon='FILE_REFRESH').rebuild = True
+        for item in props.search_results:
+            if item.action:
+                box.operator("aal.search_pick", text=item.action.name, icon='ACTION').action_name = item.action.name
 
         row = layout.row()
         row.scale_y = 1.5
         row.operator("aal.play_loop", icon='PLAY', text="Match & Loop")
 
+        box = layout.box()
+        box.label(text="Playlist", icon='SEQUENCE')
+        col = box.column(align=True)
+        col.prop(props, "playlist_filter")
+        col.prop(props, "playlist_loops")
+
+        if _playlist.active:
+            try:
+                name = _playlist.current.action.name
+            except ReferenceError:
+                name = "?"
+            box.label(text=f"{_playlist.index + 1}/{len(_playlist.entries)}: {name}")
+            row = box.row(align=True)
+            row.operator("aal.playlist_step", icon='TRIA_LEFT', text="").step = -1
+            row.operator("aal.playlist_stop", icon='SNAP_FACE', text="Stop")
+            row.operator("aal.playlist_step", icon='TRIA_RIGHT', text="").step = 1
+        else:
+            box.operator("aal.playlist_start", icon='PLAY', text="Start Playlist")
+
+        box = layout.box()
+        box.label(text="Action Store", icon='DISK_DRIVE')
+        col = box.column(align=True)
+        col.prop(props, "store_dir", text="")
+        col.prop(props, "store_capacity")
+        if props.store_dir:
+            row = box.row(align=True)
+            row.prop(props, "store_query", text="", icon='VIEWZOOM')
+            row.operator("aal.store_pack", text="", icon='PACKAGE')
+            row.operator("aal.store_release", text="", icon='TRASH')
+            for item in props.store_results:
+                box.operator("aal.store_play", text=f"{item.name} ({item.keys} keys)", icon='ACTION').store_name = item.name
+
+        box = layout.box()
+        box.label(text="Crowd Preview", icon='COMMUNITY')
+        col = box.column(align=True)
+        col.prop(props, "crowd_mode")
+        col.prop(props, "crowd_max_offset")
+        col.prop(props, "crowd_seed")
+        row = box.row(align=True)
+        row.operator("aal.crowd_assign", icon='NLA_PUSHDOWN')
+        row.operator("aal.crowd_clear", icon='X', text="")
+        if aal_crowd_fps_handler in bpy.app.handlers.frame_change_post:
+            fps = _crowd_meter.fps
+            frame_ms = 1000.0 / fps if fps else 0.0
+            box.label(text=f"{len(crowd_armatures(context))} characters | {fps:.1f} fps | {frame_ms:.1f} ms/frame")
+
+        profiling.draw_panel(layout, context, ("Play Loop", "Search Actions", "Start Playlist", "Assign Crowd",
+                                               "Pack Actions", "Loop Stored Action", "Release Unused"))
+
 # ------------------------------------------------------------------------
 #    注册 (Registration)
 # ------------------------------------------------------------------------
 
 classes = (
+    AAL_SearchResult,
+    AAL_StoreResult,
     AAL_Properties,
     AAL_OT_PlayLoop,
+    AAL_OT_SearchActions,
+    AAL_OT_SearchPick,
+    AAL_OT_StorePack,
+    AAL_OT_StorePlay,
+    AAL_OT_StoreRelease,
+    AAL_OT_CrowdAssign,
+    AAL_OT_CrowdClear,
+    AAL_OT_PlaylistStart,
+    AAL_OT_PlaylistStop,
+    AAL_OT_PlaylistStep,
     AAL_PT_MainPanel,
 )
 
@@ -139,11 +784,33 @@ def register():
     for cls in classes:
         bpy.utils.register_class(cls)
     bpy.types.Scene.aal_props = bpy.props.PointerProperty(type=AAL_Properties)
+    bpy.types.Action.aal_tags = bpy.props.StringProperty(
+        name="Tags",
+        description="自定义标签 (空格或逗号分隔)，用于动作搜索",
+        update=update_action_tags
+    )
+    bpy.app.handlers.depsgraph_update_post.append(aal_search_depsgraph_handler)
+    bpy.app.handlers.load_post.append(aal_search_load_handler)
+    bpy.app.handlers.load_post.append(aal_store_load_handler)
+    profiling.register()
 
 def unregister():
+    stop_playlist()
+    if aal_crowd_fps_handler in bpy.app.handlers.frame_change_post:
+        bpy.app.handlers.frame_change_post.remove(aal_crowd_fps_handler)
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
     del bpy.types.Scene.aal_props
+    del bpy.types.Action.aal_tags
+    if aal_search_depsgraph_handler in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(aal_search_depsgraph_handler)
+    if aal_search_load_handler in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(aal_search_load_handler)
+    if aal_store_load_handler in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(aal_store_load_handler)
+    _search_index.clear()
+    action_store.clear_stores()
+    profiling.unregister()
 
 if __name__ == "__main__":
     register()
\ No newline at end of file
@@ -0,0 +1,149 @@
+bl_info = {
+    "name": "Action Batch Exporter (Blender 5.0)",
+    "author": "YourName",
+    "version": (1, 0),
+    "blender": (5, 0, 0),
+    "location": "View3D > Sidebar > Anima",
+    "description": "Export every processed action to FBX / glTF using parallel headless workers",
+    "category": "Import-Export",
+}
+
+import bpy
+
+from mixamo_core import export, profiling
+
+# ------------------------------------------------------------------------
+#    属性 (Properties)
+# ------------------------------------------------------------------------
+
+class ABE_Properties(bpy.types.PropertyGroup):
+    output_dir: bpy.props.StringProperty(
+        name="Output Folder",
+        description="导出目录 (同时保存 export_manifest.json)",
+        subtype='DIR_PATH',
+        default="//export/",
+    )
+    export_format: bpy.props.EnumProperty(
+        name="Format",
+        items=[
+            ('FBX', "FBX", "每个动作一个 .fbx"),
+            ('GLB', "glTF Binary", ".glb"),
+            ('GLTF_SEPARATE', "glTF Separate", ".gltf + .bin"),
+        ],
+        default='FBX',
+    )
+    single_file: bpy.props.BoolProperty(
+        name="Single File",
+        description="所有动作导出到一个 glTF (只用一个工作进程)",
+        default=False,
+    )
+    include_meshes: bpy.props.BoolProperty(
+        name="Include Meshes",
+        description="同时导出骨架下的网格 (关闭则只导出骨架与动画)",
+        default=True,
+    )
+    jobs: bpy.props.IntProperty(
+        name="Workers",
+        description="无界面 Blender 工作进程数 (0 = CPU 核数)",
+        default=0, min=0, max=64,
+    )
+    store_dir: bpy.props.StringProperty(
+        name="Action Store",
+        description="同时导出此外部动作库中的动作 (留空则只导出文件内的动作)",
+        subtype='DIR_PATH',
+        default="",
+    )
+    force: bpy.props.BoolProperty(
+        name="Force",
+        description="忽略内容哈希，全部重新导出",
+        default=False,
+    )
+
+# ------------------------------------------------------------------------
+#    操作符 (Operators)
+# ------------------------------------------------------------------------
+
+class ABE_OT_ExportActions(bpy.types.Operator):
+    """把活动骨架的所有动作批量导出 (只导出内容有变化的动作)"""
+    bl_idname = "abe.export_actions"
+    bl_label = "Export Actions"
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.active_object
+        return obj is not None and obj.type == 'ARMATURE'
+
+    def execute(self, context):
+        props = context.scene.abe_props
+        if props.single_file and props.export_format == 'FBX':
+            self.report({'ERROR'}, "Single File 只支持 glTF")
+            return {'CANCELLED'}
+        with profiling.run("Export Actions"):
+            summary = export.run_export(
+                context.active_object,
+                props.output_dir,
+                fmt=props.export_format,
+                single_file=props.single_file,
+                include_meshes=props.include_meshes,
+                jobs=props.jobs,
+                force=props.force,
+                store_dir=props.store_dir,
+            )
+        msg = (f"Exported {summary['exported']}, unchanged {summary['skipped']}, "
+               f"{summary['workers']} workers, {summary['seconds']:.1f}s")
+        if summary["failed"]:
+            self.report({'WARNING'}, f"{msg}; 失败 {len(summary['failed'])}: {', '.join(summary['failed'][:5])}")
+        else:
+            self.report({'INFO'}, msg)
+        return {'FINISHED'}
+
+# ------------------------------------------------------------------------
+#    界面 (UI)
+# ------------------------------------------------------------------------
+
+class ABE_PT_MainPanel(bpy.types.Panel):
+    bl_label = "Action Batch Export"
+    bl_idname = "ABE_PT_main_panel"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = 'Anima'
+
+    def draw(self, context):
+        layout = self.layout
+        props = context.scene.abe_props
+
+        layout.prop(props, "output_dir")
+        layout.prop(props, "export_format")
+        col = layout.column(align=True)
+        col.prop(props, "single_file")
+        col.prop(props, "include_meshes")
+        col.prop(props, "force")
+        layout.prop(props, "store_dir")
+        layout.prop(props, "jobs")
+        layout.operator("abe.export_actions", icon='EXPORT')
+        profiling.draw_panel(layout, context, ("Export Actions",))
+
+# ------------------------------------------------------------------------
+#    注册 (Register)
+# ------------------------------------------------------------------------
+
+classes = (
+    ABE_Properties,
+    ABE_OT_ExportActions,
+    ABE_PT_MainPanel,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    bpy.types.Scene.abe_props = bpy.props.PointerProperty(type=ABE_Properties)
+    profiling.register()
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
+    del bpy.types.Scene.abe_props
+    profiling.unregister()
+
+if __name__ == "__main__":
+    register()
@@ -0,0 +1,337 @@
+bl_info = {
+    "name": "Action Library Analyzer (Blender 5.0)",
+    "author": "ChatGPT Fixed",
+    "version": (1, 0, 0),
+    "blender": (5, 0, 0),
+    "location": "View3D > Sidebar > Anima",
+    "description": "Find duplicate / mirrored Mixamo motions and score / trim loop points across bpy.data.actions.",
+    "category": "Animation",
+}
+
+import bpy
+import time
+
+from mixamo_core import analysis, profiling
+
+# ------------------------------------------------------------------------
+#    数据属性 (Data Properties)
+# ------------------------------------------------------------------------
+
+class ALA_DuplicateItem(bpy.types.PropertyGroup):
+    action: bpy.props.PointerProperty(type=bpy.types.Action)
+    cluster: bpy.props.IntProperty()
+    similarity: bpy.props.FloatProperty()
+    mirror_of: bpy.props.StringProperty(description="非空表示此动作是该动作的镜像")
+
+class ALA_LoopItem(bpy.types.PropertyGroup):
+    action: bpy.props.PointerProperty(type=bpy.types.Action)
+    score_before: bpy.props.FloatProperty()
+    score_after: bpy.props.FloatProperty()
+    frame_start: bpy.props.IntProperty()
+    frame_end: bpy.props.IntProperty()
+
+class ALA_Properties(bpy.types.PropertyGroup):
+    samples: bpy.props.IntProperty(
+        name="Samples",
+        description="每条曲线降采样的时间点数",
+        default=16, min=4, max=128,
+    )
+    threshold: bpy.props.FloatProperty(
+        name="Similarity",
+        description="判定为重复所需的指纹余弦相似度",
+        default=0.97, min=0.5, max=1.0,
+    )
+    length_tolerance: bpy.props.FloatProperty(
+        name="Length Tolerance",
+        description="允许的动作长度相对差异",
+        default=0.1, min=0.0, max=1.0, subtype='FACTOR',
+    )
+    include_mirrored: bpy.props.BoolProperty(
+        name="Detect Mirrored",
+        description="同时检测左右镜像的动作 (仅报告，不合并)",
+        default=True,
+    )
+    duplicates: bpy.props.CollectionProperty(type=ALA_DuplicateItem)
+    loop_search_frames: bpy.props.IntProperty(
+        name="Search Frames",
+        description="在首尾各多少帧内搜索最佳循环点",
+        default=10, min=1, max=120,
+    )
+    loop_length_weight: bpy.props.FloatProperty(
+        name="Length Penalty",
+        description="每裁掉一帧增加的误差 (越大越倾向保留原长度)",
+        default=0.5, min=0.0,
+    )
+    loop_min_gain: bpy.props.FloatProperty(
+        name="Min Improvement",
+        description="误差至少降低多少才写入新的循环范围",
+        default=1.0, min=0.0,
+    )
+    loops: bpy.props.CollectionProperty(type=ALA_LoopItem)
+
+# ------------------------------------------------------------------------
+#    操作符 (Operators)
+# ------------------------------------------------------------------------
+
+class ALA_OT_FindDuplicates(bpy.types.Operator):
+    """Fingerprint all actions and cluster near-duplicates"""
+    bl_idname = "ala.find_duplicates"
+    bl_label = "Find Duplicate Actions"
+
+    def execute(self, context):
+        props = context.scene.ala_props
+        actions = [a for a in bpy.data.actions if not a.library]
+        props.duplicates.clear()
+        if len(actions) < 2:
+            self.report({'INFO'}, "动作数量不足，无需检测。")
+            return {'CANCELLED'}
+
+        t0 = time.perf_counter()
+        with profiling.run("Find Duplicate Actions"):
+            clusters, mirror_links = analysis.find_duplicate_clusters(
+                actions,
+                samples=props.samples,
+                threshold=props.threshold,
+                length_tolerance=props.length_tolerance,
+                include_mirrored=props.include_mirrored,
+                stage=profiling.stage,
+            )
+        elapsed = time.perf_counter() - t0
+
+        for cluster_id, members in enumerate(clusters):
+            print(f"[Duplicates] Cluster {cluster_id}:")
+            for index, similarity in members:
+                item = props.duplicates.add()
+                item.action = actions[index]
+                item.cluster = cluster_id
+                item.similarity = similarity
+                print(f"    {actions[index].name} ({similarity:.3f})")
+
+        for i, j, similarity in mirror_links:
+            item = props.duplicates.add()
+            item.action = actions[i]
+            item.cluster = -1
+            item.similarity = similarity
+            item.mirror_of = actions[j].name
+            print(f"[Duplicates] Mirror: {actions[i].name} <-> {actions[j].name} ({similarity:.3f})")
+
+        self.report({'INFO'}, f"{len(actions)} actions, {len(clusters)} duplicate clusters, "
+                              f"{len(mirror_links)} mirrored pairs in {elapsed:.2f}s")
+        return {'FINISHED'}
+
+class ALA_OT_MergeDuplicates(bpy.types.Operator):
+    """Remap users of each duplicate cluster to one action and remove the rest"""
+    bl_idname = "ala.merge_duplicates"
+    bl_label = "Merge Duplicates"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return any(item.cluster >= 0 for item in context.scene.ala_props.duplicates)
+
+    def execute(self, context):
+        props = context.scene.ala_props
+        clusters = {}
+        for item in props.duplicates:
+            if item.cluster >= 0 and item.action:
+                clusters.setdefault(item.cluster, []).append(item.action)
+
+        to_remove = []
+        for members in clusters.values():
+            if len(members) < 2:
+                continue
+            keeper = analysis.pick_keeper(members)
+            for action in members:
+                if action != keeper:
+                    action.user_remap(keeper)
+                    to_remove.append(action)
+
+        props.duplicates.clear()
+        if to_remove:
+            bpy.data.batch_remove(ids=to_remove)
+        self.report({'INFO'}, f"Merged {len(to_remove)} duplicate actions")
+        return {'FINISHED'}
+
+class ALA_OT_AnalyzeLoops(bpy.types.Operator):
+    """Score start/end pose mismatch for every action and search the best loop window"""
+    bl_idname = "ala.analyze_loops"
+    bl_label = "Analyze Loops"
+
+    def execute(self, context):
+        props = context.scene.ala_props
+        props.loops.clear()
+
+        t0 = time.perf_counter()
+        results = []
+        with profiling.run("Analyze Loops"):
+            for action in bpy.data.actions:
+                if action.library:
+                    continue
+                with profiling.stage("analyze_action_loop", 1, "actions"):
+                    before, after, start, end = analysis.analyze_action_loop(
+                        action, props.loop_search_frames, props.loop_length_weight)
+                results.append((action, before, after, start, end))
+        elapsed = time.perf_counter() - t0
+
+        # 误差最大的排前面
+        results.sort(key=lambda r: -r[1])
+        for action, before, after, start, end in results:
+            item = props.loops.add()
+            item.action = action
+            item.score_before = before
+            item.score_after = after
+            item.frame_start = start
+            item.frame_end = end
+            print(f"[Loop] {action.name}: {before:.2f} -> {after:.2f} ({start}-{end})")
+
+        self.report({'INFO'}, f"Analyzed {len(results)} actions in {elapsed:.2f}s")
+        return {'FINISHED'}
+
+class ALA_OT_ApplyLoops(bpy.types.Operator):
+    """Write the analyzed loop windows as manual action frame ranges or the scene range"""
+    bl_idname = "ala.apply_loops"
+    bl_label = "Apply Loop Points"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    target: bpy.props.EnumProperty(
+        name="Target",
+        items=[
+            ('ACTION', "Action Frame Range", "写入动作的手动帧范围 (Looper 会直接使用)"),
+            ('SCENE', "Scene Range", "仅为活动对象当前动作设置场景帧范围"),
+        ],
+        default='ACTION',
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.scene.ala_props.loops) > 0
+
+    def execute(self, context):
+        props = context.scene.ala_props
+        items = [item for item in props.loops
+                 if item.action and item.score_before - item.score_after >= props.loop_min_gain]
+
+        if self.target == 'SCENE':
+            obj = context.active_object
+            current = obj.animation_data.action if obj and obj.animation_data else None
+            item = next((i for i in items if i.action == current), None)
+            if not item:
+                self.report({'WARNING'}, "Active object's action has no improved loop window")
+                return {'CANCELLED'}
+            context.scene.frame_start = item.frame_start
+            context.scene.frame_end = item.frame_end
+            self.report({'INFO'}, f"Scene range: {item.frame_start}-{item.frame_end}")
+            return {'FINISHED'}
+
+        for item in items:
+            action = item.action
+            action.use_frame_range = True
+            action.frame_start = item.frame_start
+            action.frame_end = item.frame_end
+            action.use_cyclic = True
+        self.report({'INFO'}, f"Updated loop range on {len(items)} actions")
+        return {'FINISHED'}
+
+# ------------------------------------------------------------------------
+#    面板 (Panel)
+# ------------------------------------------------------------------------
+
+class ALA_PT_MainPanel(bpy.types.Panel):
+    bl_label = "Action Library"
+    bl_idname = "ALA_PT_MainPanel"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = 'Anima'
+
+    # 面板只画前 N 条结果，避免大库时 draw 卡顿
+    MAX_ROWS = 60
+
+    def draw(self, context):
+        layout = self.layout
+        props = context.scene.ala_props
+
+        col = layout.column(align=True)
+        col.prop(props, "samples")
+        col.prop(props, "threshold")
+        col.prop(props, "length_tolerance")
+        col.prop(props, "include_mirrored")
+
+        row = layout.row(align=True)
+        row.operator("ala.find_duplicates", icon='VIEWZOOM')
+        row.operator("ala.merge_duplicates", icon='AUTOMERGE_ON')
+
+        if props.duplicates:
+            self.draw_duplicates(layout, props)
+
+        layout.separator()
+        layout.label(text="Loop Quality", icon='FILE_REFRESH')
+        col = layout.column(align=True)
+        col.prop(props, "loop_search_frames")
+        col.prop(props, "loop_length_weight")
+        col.prop(props, "loop_min_gain")
+        row = layout.row(align=True)
+        row.operator("ala.analyze_loops", icon='GRAPH')
+        row.operator("ala.apply_loops", icon='CHECKMARK').target = 'ACTION'
+        row.operator("ala.apply_loops", icon='SCENE_DATA', text="").target = 'SCENE'
+
+        if props.loops:
+            self.draw_loops(layout, props)
+
+        profiling.draw_panel(layout, context, ("Find Duplicate Actions", "Analyze Loops"))
+
+    def draw_duplicates(self, layout, props):
+        box = layout.box()
+        last_cluster = None
+        for item in props.duplicates[:self.MAX_ROWS]:
+            if not item.action:
+                continue
+            if item.cluster != last_cluster and item.cluster >= 0:
+                box.label(text=f"Cluster {item.cluster}", icon='DUPLICATE')
+                last_cluster = item.cluster
+            row = box.row()
+            if item.mirror_of:
+                row.label(text=f"{item.action.name} ⇄ {item.mirror_of}", icon='MOD_MIRROR')
+            else:
+                row.label(text=item.action.name, icon='ACTION')
+            row.label(text=f"{item.similarity:.3f}")
+        if len(props.duplicates) > self.MAX_ROWS:
+            box.label(text=f"... {len(props.duplicates) - self.MAX_ROWS} more (see console)")
+
+    def draw_loops(self, layout, props):
+        box = layout.box()
+        for item in props.loops[:self.MAX_ROWS]:
+            if not item.action:
+                continue
+            row = box.row()
+            row.label(text=item.action.name, icon='ACTION')
+            row.label(text=f"{item.score_before:.1f} → {item.score_after:.1f}  [{item.frame_start}-{item.frame_end}]")
+
+# ------------------------------------------------------------------------
+#    注册 (Registration)
+# ------------------------------------------------------------------------
+
+classes = (
+    ALA_DuplicateItem,
+    ALA_LoopItem,
+    ALA_Properties,
+    ALA_OT_FindDuplicates,
+    ALA_OT_MergeDuplicates,
+    ALA_OT_AnalyzeLoops,
+    ALA_OT_ApplyLoops,
+    ALA_PT_MainPanel,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    bpy.types.Scene.ala_props = bpy.props.PointerProperty(type=ALA_Properties)
+    profiling.register()
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
+    del bpy.types.Scene.ala_props
+    profiling.unregister()
+
+if __name__ == "__main__":
+    register()
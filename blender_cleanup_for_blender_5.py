@@ -12,12 +12,20 @@ import bpy
 import re
 from bpy.types import Panel, Operator
 
+from mixamo_core import profiling
+
 class OBJECT_OT_cleanup_unused_data(Operator):
     """清理所有未使用的数据块 (适配 Blender 5.0+)"""
     bl_idname = "object.cleanup_unused_data"
     bl_label = "执行清理"
     bl_options = {'REGISTER', 'UNDO'}
 
+    purge_orphans: bpy.props.BoolProperty(
+        name="Purge Orphans",
+        description="最后运行官方的递归孤立数据清理",
+        default=True,
+    )
+
     def get_visible_objects_recursive(self, context):
         """递归获取所有真正可见的对象（修复逻辑漏洞）"""
         visible_objs = set()
@@ -57,10 +65,15 @@ class OBJECT_OT_cleanup_unused_data(Operator):
                 used_data['images'].add(node.image)
 
     def execute(self, context):
+        with profiling.run("Cleanup Unused Data"):
+            return self.cleanup(context)
+
+    def cleanup(self, context):
         report_msg = []
         
         # 1. 收集所有可见对象及其依赖
-        visible_objects = self.get_visible_objects_recursive(context)
+        with profiling.stage("collect visible"):
+            visible_objects = self.get_visible_objects_recursive(context)
         
         used_data = {
             'meshes': set(),
@@ -103,13 +116,15 @@ class OBJECT_OT_cleanup_unused_data(Operator):
         # --- 清理网格 ---
         meshes_to_remove = [m for m in bpy.data.meshes if m not in used_data['meshes'] and m.users == 0]
         if meshes_to_remove:
-            bpy.data.batch_remove(ids=meshes_to_remove)
+            with profiling.stage("batch_remove", len(meshes_to_remove), "ids"):
+                bpy.data.batch_remove(ids=meshes_to_remove)
             report_msg.append(f"网格: {len(meshes_to_remove)}")
 
         # --- 清理材质 ---
         mats_to_remove = [m for m in bpy.data.materials if m not in used_data['materials'] and m.users == 0]
         if mats_to_remove:
-            bpy.data.batch_remove(ids=mats_to_remove)
+            with profiling.stage("batch_remove", len(mats_to_remove), "ids"):
+                bpy.data.batch_remove(ids=mats_to_remove)
             report_msg.append(f"材质: {len(mats_to_remove)}")
 
         # --- 清理骨架 ---
@@ -135,36 +150,42 @@ class OBJECT_OT_cleanup_unused_data(Operator):
         all_armatures_to_remove = list(set(duplicate_armatures + unused_armatures))
         
         if all_armatures_to_remove:
-            bpy.data.batch_remove(ids=all_armatures_to_remove)
+            with profiling.stage("batch_remove", len(all_armatures_to_remove), "ids"):
+                bpy.data.batch_remove(ids=all_armatures_to_remove)
             report_msg.append(f"骨架: {len(all_armatures_to_remove)}")
 
         # --- 清理动作 ---
         actions_to_remove = [a for a in bpy.data.actions if a not in used_data['actions'] and a.users == 0]
         if actions_to_remove:
-            bpy.data.batch_remove(ids=actions_to_remove)
+            with profiling.stage("batch_remove", len(actions_to_remove), "ids"):
+                bpy.data.batch_remove(ids=actions_to_remove)
             report_msg.append(f"动作: {len(actions_to_remove)}")
 
         # --- 清理节点组 ---
         groups_to_remove = [g for g in bpy.data.node_groups if g not in used_data['node_groups'] and g.users == 0]
         if groups_to_remove:
-            bpy.data.batch_remove(ids=groups_to_remove)
+            with profiling.stage("batch_remove", len(groups_to_remove), "ids"):
+                bpy.data.batch_remove(ids=groups_to_remove)
             report_msg.append(f"节点组: {len(groups_to_remove)}")
         
         # --- 清理图像 ---
         imgs_to_remove = [img for img in bpy.data.images if img not in used_data['images'] and img.users == 0]
         if imgs_to_remove:
-            bpy.data.batch_remove(ids=imgs_to_remove)
+            with profiling.stage("batch_remove", len(imgs_to_remove), "ids"):
+                bpy.data.batch_remove(ids=imgs_to_remove)
             report_msg.append(f"图像: {len(imgs_to_remove)}")
 
         # 3. 最后运行一次官方的深度递归清理 (Orphans Purge)
         # 它可以处理那些非常隐蔽的深层依赖
-        try:
-            # 显式使用 context override (适配 Blender 3.2+)
-            with context.temp_override(area=context.area):
-                bpy.ops.outliner.orphans_purge(do_local_ids=True, do_linked_ids=True, do_recursive=True)
-        except Exception:
-            # 如果上下文不对（极少情况），回退到直接调用
-            bpy.ops.outliner.orphans_purge(do_local_ids=True, do_linked_ids=True, do_recursive=True)
+        if self.purge_orphans:
+            with profiling.stage("orphans purge"):
+                try:
+                    # 显式使用 context override (适配 Blender 3.2+)
+                    with context.temp_override(area=context.area):
+                        bpy.ops.outliner.orphans_purge(do_local_ids=True, do_linked_ids=True, do_recursive=True)
+                except Exception:
+                    # 如果上下文不对（极少情况，如后台模式），回退到直接调用
+                    bpy.ops.outliner.orphans_purge(do_local_ids=True, do_linked_ids=True, do_recursive=True)
 
         self.report({'INFO'}, f"清理完成: {' | '.join(report_msg) if report_msg else '未发现垃圾数据'}")
         return {'FINISHED'}
@@ -179,6 +200,7 @@ class VIEW3D_PT_cleanup_panel(Panel):
         layout = self.layout
         layout.label(text="安全清理未使用数据", icon='TRASH')
         layout.operator("object.cleanup_unused_data", icon='BRUSH_DATA')
+        profiling.draw_panel(layout, context, ("Cleanup Unused Data",))
 
 classes = (
     OBJECT_OT_cleanup_unused_data,
@@ -188,10 +210,12 @@ classes = (
 def register():
     for cls in classes:
         bpy.utils.register_class(cls)
+    profiling.register()
 
 def unregister():
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
+    profiling.unregister()
 
 if __name__ == "__main__":
     register()
\ No newline at end of file
@@ -10,6 +10,9 @@ bl_info = {
 
 import bpy
 import os
+import time
+
+from mixamo_core import animdata, checkpoint, fbxanim, ledger, library, prefetch, profiling, resample, retarget
 
 class MixamoFixImportProperties(bpy.types.PropertyGroup):
     mixamo_import_folder: bpy.props.StringProperty(
@@ -22,6 +25,72 @@ class MixamoFixImportProperties(bpy.types.PropertyGroup):
         description="String to be removed from bone names (e.g., 'mixamorig:')",
         default="mixamorig:"
     )
+    fast_anim_import: bpy.props.BoolProperty(
+        name="Fast Animation Import",
+        description="第一个文件完整导入，之后的文件只读取动画曲线写入新动作 (不创建对象；无法处理时回退到完整导入)。"
+                    "实验性，默认关闭",
+        default=False
+    )
+    prefetch_depth: bpy.props.IntProperty(
+        name="Prefetch Files",
+        description="后台线程预读 (并计算哈希) 接下来的文件数，读盘与处理重叠 (0 = 不预读)",
+        default=4, min=0, max=32
+    )
+    source_fps: bpy.props.FloatProperty(
+        name="Source FPS",
+        description="没有记录帧率的已有动作按此帧率处理 (导入的动作记录 FBX 文件自身的帧率)",
+        default=30.0, min=1.0
+    )
+    target_fps: bpy.props.IntProperty(
+        name="Resample to FPS",
+        description="导入时把动作重采样到此帧率 (0 = 保持原样)",
+        default=0, min=0, max=240
+    )
+    retarget_source: bpy.props.PointerProperty(
+        name="Source Rig",
+        description="动作所针对的 Mixamo 骨架",
+        type=bpy.types.Object,
+        poll=lambda self, obj: obj.type == 'ARMATURE'
+    )
+    retarget_target: bpy.props.PointerProperty(
+        name="Target Rig",
+        description="生产骨架 (静止姿态取自此骨架，除非给出 Rest JSON)",
+        type=bpy.types.Object,
+        poll=lambda self, obj: obj.type == 'ARMATURE'
+    )
+    bone_map_path: bpy.props.StringProperty(
+        name="Bone Map",
+        description="骨骼映射：JSON {源: 目标} 或每行 '源 = 目标' 的文本",
+        subtype='FILE_PATH'
+    )
+    target_rest_path: bpy.props.StringProperty(
+        name="Target Rest JSON",
+        description="可选：目标静止姿态矩阵 {\"bones\": {name: {parent, matrix}}}",
+        subtype='FILE_PATH'
+    )
+    retarget_suffix: bpy.props.StringProperty(
+        name="Suffix",
+        description="重定向动作名 = 源动作名 + 后缀",
+        default="_retarget"
+    )
+    library_dir: bpy.props.StringProperty(
+        name="Library Folder",
+        description="动作分片库目录：每个分片是一个独立 .blend，工作文件只链接用到的动作",
+        subtype='DIR_PATH'
+    )
+    library_mode: bpy.props.EnumProperty(
+        name="Shard By",
+        items=[
+            ('FOLDER', "Folder", "每个 FBX 来源文件夹一个库文件"),
+            ('ACTION', "Action", "每个动作一个库文件"),
+        ],
+        default='FOLDER'
+    )
+    library_action: bpy.props.StringProperty(
+        name="Library Action",
+        description="要链接的库动作",
+        search=lambda self, context, edit_text: library.index_names(self.library_dir) if self.library_dir else []
+    )
 
 class MixamoFixImportPanel(bpy.types.Panel):
     bl_label = "Mixamo Fix Import"
@@ -37,27 +106,37 @@ class MixamoFixImportPanel(bpy.types.Panel):
         
         layout.prop(props, "mixamo_import_folder")
         layout.prop(props, "bone_name_prefix_to_remove")
-        layout.operator("import.mixamo_fbx", text="Import & Fix Mixamo FBX", icon='IMPORT')
+        row = layout.row(align=True)
+        row.prop(props, "fast_anim_import")
+        row.prop(props, "prefetch_depth")
+        row = layout.row(align=True)
+        row.prop(props, "source_fps")
+        row.prop(props, "target_fps")
+        layout.operator(checkpoint.operator_id(context, "import.mixamo_fbx"),
+                        text="Import & Fix Mixamo FBX", icon='IMPORT')
+        checkpoint.draw_panel(layout, context)
+        layout.operator("import.mixamo_resample_actions", icon='TIME')
 
-# --- 核心辅助函数：兼容 Blender 5.0 的 F-Curve 获取器 ---
-def get_all_fcurves(action):
-    """
-    生成器：遍历 Action 中的所有 F-Curve。
-    兼容 Blender 5.0 (Slotted Actions) 和旧版本。
-    """
-    if hasattr(action, "fcurves"): # 旧版
-        for fc in action.fcurves:
-            yield fc
-        return
+        box = layout.box()
+        box.label(text="Retarget", icon='ARMATURE_DATA')
+        col = box.column(align=True)
+        col.prop(props, "retarget_source")
+        col.prop(props, "retarget_target")
+        col.prop(props, "bone_map_path")
+        col.prop(props, "target_rest_path")
+        col.prop(props, "retarget_suffix")
+        box.operator("import.mixamo_retarget_actions", icon='CON_ARMATURE')
 
-    # Blender 5.0+ 新版结构
-    if hasattr(action, "layers"):
-        for layer in action.layers:
-            for strip in layer.strips:
-                if hasattr(strip, "channelbags"):
-                    for channelbag in strip.channelbags:
-                        for fc in channelbag.fcurves:
-                            yield fc
+        box = layout.box()
+        box.label(text="Action Libraries", icon='LINK_BLEND')
+        box.prop(props, "library_dir")
+        box.prop(props, "library_mode")
+        box.operator("import.mixamo_shard_actions", icon='FILE_BLEND')
+        row = box.row(align=True)
+        row.prop(props, "library_action", text="", icon='ACTION')
+        row.operator("import.mixamo_link_action", text="", icon='LINKED')
+        box.operator("import.mixamo_unlink_unused", icon='UNLINKED')
+        profiling.draw_panel(layout, context, ("Import Mixamo FBX", "Resample Actions", "Retarget Actions", "Shard Actions"))
 
 def normalize_object(obj):
     """应用变换 (Location, Rotation, Scale)"""
@@ -70,24 +149,47 @@ def normalize_object(obj):
         print(f"Failed to normalize {obj.name}: {e}")
 
 def rename_bones(armature_obj, target_string):
-    """移除骨骼名称前缀"""
+    """
+    移除骨骼名称前缀。
+    Blender 每次改骨骼名都会修正动画路径，动作还绑定着时每个骨骼都要遍历一遍曲线；
+    这里先解绑动作，改完名后按映射表一次性改写 data_path，再绑回原来的 slot。
+    """
     if not target_string or armature_obj.type != 'ARMATURE':
         return
+    renames = {bone.name: bone.name.replace(target_string, "")
+               for bone in armature_obj.data.bones if target_string in bone.name}
+    if not renames:
+        return
+    adt = armature_obj.animation_data
+    action = adt.action if adt else None
+    slot = getattr(adt, "action_slot", None) if action else None
+    if action:
+        adt.action = None
+
     for bone in armature_obj.data.bones:
-        if target_string in bone.name:
-            bone.name = bone.name.replace(target_string, "")
+        new_name = renames.get(bone.name)
+        if new_name is not None:
+            old_name = bone.name
+            bone.name = new_name
+            # 与已有骨骼重名时 Blender 会加后缀，以实际名字为准
+            renames[old_name] = bone.name
 
-def delete_duplicate_pattern_objects():
-    """批量删除 xxxx.001 对象"""
+    if action:
+        animdata.rename_bone_paths(action, renames)
+        animdata.assign_action(armature_obj, action, slot)
+
+def delete_duplicate_pattern_objects(import_ledger):
+    """批量删除本次导入产生的 xxxx.001 对象 (以及它们不再使用的网格 / 材质 / 图像)"""
     objects_to_delete = []
-    for obj in bpy.data.objects:
+    for obj in import_ledger.objects():
         if "." in obj.name and obj.name.split(".")[-1].isdigit():
              objects_to_delete.append(obj)
 
     if objects_to_delete:
         count = len(objects_to_delete)
-        bpy.data.batch_remove(ids=objects_to_delete)
-        print(f"已批量删除 {count} 个副本对象。")
+        with profiling.stage("batch_remove duplicates", count, "objects"):
+            removed = import_ledger.remove_objects(objects_to_delete)
+        print(f"已批量删除 {count} 个副本对象 (共 {removed} 个数据块)。")
 
 def adjust_hips_location(obj):
     """修正 Hips 位移"""
@@ -104,14 +206,23 @@ def adjust_hips_location(obj):
     if not hips_bone_name:
         return
 
-    target_path = f'pose.bones["{hips_bone_name}"].location'
+    # 一次 foreach_get / foreach_set 缩放整条曲线
+    for fcurve in animdata.FCurveIndex(action, obj).bone(hips_bone_name, "location"):
+        if fcurve:
+            with profiling.stage("hips scaling", len(fcurve.keyframe_points), "keys"):
+                animdata.transform_values(fcurve, scale=0.01)
 
-    # 使用兼容生成器遍历
-    for fcurve in get_all_fcurves(action):
-        if fcurve.data_path == target_path:
-            for keyframe in fcurve.keyframe_points:
-                keyframe.co[1] *= 0.01 
-            fcurve.update()
+def tag_imported_action(action, fbx_path, import_fps, target_fps, source_hash=""):
+    """记录来源文件 (及其内容哈希) 与帧率，需要时重采样"""
+    # 记录来源文件，供动作搜索按文件夹检索
+    action["mixamo_source"] = fbx_path
+    if source_hash:
+        action["mixamo_source_hash"] = source_hash
+    # 关键帧按 FBX 文件自身的帧率换算 (导入器把场景帧率设为它)，记录下来作为源帧率
+    action[resample.FPS_KEY] = import_fps
+    if target_fps and target_fps != import_fps:
+        with profiling.stage("resample", 1, "actions"):
+            resample.resample_action(action, import_fps, target_fps)
 
 class ImportMixamoFBX(bpy.types.Operator):
     bl_idname = "import.mixamo_fbx"
@@ -119,6 +230,10 @@ class ImportMixamoFBX(bpy.types.Operator):
     bl_options = {'REGISTER', 'UNDO'}
     
     def execute(self, context):
+        with profiling.run("Import Mixamo FBX"):
+            return self.import_folder(context)
+
+    def import_folder(self, context):
         props = context.scene.mixamo_fix_import_properties
         folder = props.mixamo_import_folder
         target_string = props.bone_name_prefix_to_remove
@@ -133,70 +248,289 @@ class ImportMixamoFBX(bpy.types.Operator):
             self.report({'WARNING'}, "No FBX files found.")
             return {'CANCELLED'}
         
-        # 记录初始对象集合，用于后续清理
-        # initial_objects = set(bpy.data.objects) 
-        # (此处不需要记录初始，因为我们在循环内动态捕捉)
+        render = context.scene.render
+        # 导入器按每个文件的 TimeMode 设置场景帧率，源帧率在每次导入后读取
+        import_fps = None
 
-        for i, fbx_file in enumerate(fbx_files):
-            fbx_path = os.path.join(folder, fbx_file)
-            filename_no_ext = os.path.splitext(fbx_file)[0]
-            
-            # 1. 记录导入前的对象快照
-            objs_before = set(bpy.data.objects)
+        # 导入账本：记录每个文件新建的 ID，后续修正与清理只处理这些
+        import_ledger = ledger.ImportLedger()
+
+        # 第一个完整导入的骨架；之后的文件只读动画写到它的骨骼空间
+        reference = None
+        fast_loaded = 0
+
+        # 后台线程预读接下来的文件 (页缓存 + 哈希 + 文件头检查)
+        paths = [os.path.join(folder, f) for f in fbx_files]
+        with prefetch.Prefetcher(paths, props.prefetch_depth) as files:
+            for i, item in enumerate(files):
+                fbx_path = item.path
+                fbx_file = os.path.basename(fbx_path)
+                filename_no_ext = os.path.splitext(fbx_file)[0]
+                if item.error:
+                    self.report({'ERROR'}, f"Skipping {fbx_file}: {item.error}")
+                    continue
+
+                # 0. 快速路径：只解析动画曲线，不创建对象
+                if props.fast_anim_import and reference is not None:
+                    try:
+                        with profiling.stage("fast anim load", 1, "files"):
+                            action, clip_fps = fbxanim.load_action(fbx_path, reference, target_string,
+                                                                   filename_no_ext)
+                    except fbxanim.FBXAnimError as e:
+                        print(f"Fast load failed for {fbx_file}, using full import: {e}")
+                    else:
+                        # 没有对象使用它，保存时不能被当作孤立数据丢掉
+                        action.use_fake_user = True
+                        tag_imported_action(action, fbx_path, clip_fps, props.target_fps, item.sha1)
+                        fast_loaded += 1
+                        self.report({'INFO'}, f"Processing {i + 1}/{len(fbx_files)}: {fbx_file} (fast)")
+                        continue
             
-            # 2. 导入
-            try:
-                bpy.ops.import_scene.fbx(
-                    filepath=fbx_path, 
-                    ignore_leaf_bones=True, 
-                    automatic_bone_orientation=True,
-                    anim_offset=0.0
-                )
-            except Exception as e:
-                self.report({'ERROR'}, f"Error importing {fbx_file}: {e}")
-                continue
-
-            # 3. 计算刚导入的新对象 (差集)
-            objs_after = set(bpy.data.objects)
-            new_objs = list(objs_after - objs_before)
+                # 1. 导入 (账本记录新建的对象与数据块)
+                try:
+                    with import_ledger.record(fbx_path, context):
+                        with profiling.stage("fbx import", 1, "files"):
+                            bpy.ops.import_scene.fbx(
+                                filepath=fbx_path, 
+                                ignore_leaf_bones=True, 
+                                automatic_bone_orientation=True,
+                                anim_offset=0.0
+                            )
+                except Exception as e:
+                    self.report({'ERROR'}, f"Error importing {fbx_file}: {e}")
+                    continue
+                import_fps = render.fps / render.fps_base
+
+                # 2. 刚导入的新对象
+                new_objs = import_ledger.objects(fbx_path)
             
-            self.report({'INFO'}, f"Processing {i + 1}/{len(fbx_files)}: {fbx_file}")
+                self.report({'INFO'}, f"Processing {i + 1}/{len(fbx_files)}: {fbx_file}")
             
-            # 4. 立即处理当前文件对应的对象
-            for obj in new_objs:
-                if obj.type == 'ARMATURE':
-                    # 设置活动对象，以便后续操作
-                    context.view_layer.objects.active = obj
-                    obj.select_set(True)
+                # 3. 立即处理当前文件对应的对象
+                for obj in new_objs:
+                    if obj.type == 'ARMATURE':
+                        # 设置活动对象，以便后续操作
+                        context.view_layer.objects.active = obj
+                        obj.select_set(True)
                     
-                    # --- 关键修复：立即重命名 Action ---
-                    if obj.animation_data and obj.animation_data.action:
-                        # 强制使用文件名作为动作名
-                        obj.animation_data.action.name = filename_no_ext
+                        # --- 关键修复：立即重命名 Action ---
+                        if obj.animation_data and obj.animation_data.action:
+                            # 强制使用文件名作为动作名
+                            obj.animation_data.action.name = filename_no_ext
                     
-                    # 执行修复逻辑
-                    rename_bones(obj, target_string)
-                    normalize_object(obj)
-                    adjust_hips_location(obj)
+                        # 执行修复逻辑
+                        with profiling.stage("rename_bones", len(obj.data.bones), "bones"):
+                            rename_bones(obj, target_string)
+                        with profiling.stage("normalize_object", 1, "objects"):
+                            normalize_object(obj)
+                        adjust_hips_location(obj)
+                        if obj.animation_data and obj.animation_data.action:
+                            tag_imported_action(obj.animation_data.action, fbx_path, import_fps,
+                                                props.target_fps, item.sha1)
+                        if reference is None:
+                            reference = obj
+
+                    elif obj.type == 'MESH':
+                        if obj.parent and obj.parent.type == 'ARMATURE':
+                            with profiling.stage("normalize_object", 1, "objects"):
+                                normalize_object(obj)
+
+                # 刷新一下视图层，防止连续导入导致上下文混乱
+                with profiling.stage("view_layer update"):
+                    context.view_layer.update()
 
-                elif obj.type == 'MESH':
-                    if obj.parent and obj.parent.type == 'ARMATURE':
-                        normalize_object(obj)
+        if props.prefetch_depth:
+            print(f"[import] waited {files.waited:.2f}s for prefetched files")
 
-            # 刷新一下视图层，防止连续导入导致上下文混乱
-            context.view_layer.update()
+        # 4. 最后统一清理本次导入产生的重复对象
+        delete_duplicate_pattern_objects(import_ledger)
 
-        # 5. 最后统一清理重复的空对象
-        delete_duplicate_pattern_objects()
+        if props.target_fps:
+            render.fps = props.target_fps
+            render.fps_base = 1.0
         
-        self.report({'INFO'}, "Batch Import Completed.")
+        self.report({'INFO'}, f"Batch Import Completed ({fast_loaded}/{len(fbx_files)} fast-loaded).")
+        return {'FINISHED'}
+
+class ImportMixamoFBXCheckpoint(ImportMixamoFBX):
+    """Import Mixamo FBX 的检查点变体：先压缩另存一份检查点 .blend，不压入撤销栈"""
+    bl_idname = "import.mixamo_fbx_checkpoint"
+    bl_label = "Import Mixamo FBX (Checkpoint)"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        if checkpoint.save("import", self) is None:
+            return {'CANCELLED'}
+        return super().execute(context)
+
+class ResampleActions(bpy.types.Operator):
+    """Resample every local action to a target frame rate (slerp for quaternions)"""
+    bl_idname = "import.mixamo_resample_actions"
+    bl_label = "Resample Existing Actions"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    target_fps: bpy.props.IntProperty(name="Target FPS", default=60, min=1, max=240)
+    set_scene_fps: bpy.props.BoolProperty(
+        name="Set Scene FPS",
+        description="同时把场景帧率设为目标帧率",
+        default=True
+    )
+
+    def invoke(self, context, event):
+        props = context.scene.mixamo_fix_import_properties
+        self.target_fps = props.target_fps or context.scene.render.fps
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        props = context.scene.mixamo_fix_import_properties
+        with profiling.run("Resample Actions"):
+            totals = resample.resample_actions(bpy.data.actions, self.target_fps, props.source_fps)
+        if self.set_scene_fps:
+            context.scene.render.fps = self.target_fps
+            context.scene.render.fps_base = 1.0
+        self.report({'INFO'}, f"Resampled {totals['actions']} actions to {self.target_fps} fps "
+                              f"({totals['keys_before']} -> {totals['keys_after']} keys).")
+        return {'FINISHED'}
+
+def retarget_all(source_obj, target_obj, bone_map, target_rest=None, suffix="_retarget"):
+    """
+    重定向所有带有源骨骼曲线的本地动作，返回新动作列表。
+    映射中没有一个源骨骼存在于源骨架上 (多半是骨骼名前缀不一致) 时抛出 ValueError。
+    """
+    source_rest = retarget.rest_from_armature(source_obj.data)
+    if target_rest is None:
+        target_rest = retarget.rest_from_armature(target_obj.data)
+    mapped = retarget.mapped_source_bones(bone_map, source_rest)
+    if not mapped:
+        sample = ", ".join(list(bone_map)[:3])
+        raise ValueError(f"No bone in the bone map exists on {source_obj.name} (map sources: {sample} ...)")
+    prefixes = tuple(f'pose.bones["{name}"]' for name in mapped)
+    actions = [a for a in bpy.data.actions
+               if not a.library and not a.name.endswith(suffix)
+               and any(fc.data_path.startswith(prefixes) for fc in animdata.iter_fcurves(a))]
+    results = []
+    for action in actions:
+        with profiling.stage("retarget", 1, "actions"):
+            results.append(retarget.retarget_action(action, source_rest, target_rest, bone_map,
+                                                    target_obj, action.name + suffix))
+    return results
+
+class RetargetActions(bpy.types.Operator):
+    """Convert every Mixamo action onto the production rig (vectorized, no frame_set)"""
+    bl_idname = "import.mixamo_retarget_actions"
+    bl_label = "Retarget Actions"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        props = context.scene.mixamo_fix_import_properties
+        return props.retarget_source is not None and props.retarget_target is not None and bool(props.bone_map_path)
+
+    def execute(self, context):
+        props = context.scene.mixamo_fix_import_properties
+        try:
+            bone_map = retarget.load_bone_map(bpy.path.abspath(props.bone_map_path),
+                                              props.bone_name_prefix_to_remove)
+            target_rest = (retarget.rest_from_json(bpy.path.abspath(props.target_rest_path))
+                           if props.target_rest_path else None)
+        except (OSError, ValueError, KeyError) as e:
+            self.report({'ERROR'}, f"Failed to read bone map / rest pose: {e}")
+            return {'CANCELLED'}
+        t0 = time.perf_counter()
+        try:
+            with profiling.run("Retarget Actions"):
+                results = retarget_all(props.retarget_source, props.retarget_target, bone_map,
+                                       target_rest, props.retarget_suffix)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        if not results:
+            self.report({'WARNING'}, f"No actions animate the mapped bones of {props.retarget_source.name}")
+            return {'CANCELLED'}
+        elapsed = time.perf_counter() - t0
+        per_clip = elapsed / len(results) if results else 0.0
+        self.report({'INFO'}, f"Retargeted {len(results)} actions in {elapsed:.2f}s ({per_clip * 1000:.0f} ms/clip).")
+        return {'FINISHED'}
+
+class ShardActionLibraries(bpy.types.Operator):
+    """Save local actions into per-action / per-folder library .blend files and link them back"""
+    bl_idname = "import.mixamo_shard_actions"
+    bl_label = "Shard Actions to Libraries"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    force: bpy.props.BoolProperty(
+        name="Force",
+        description="忽略内容哈希，重写所有分片",
+        default=False
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return bool(context.scene.mixamo_fix_import_properties.library_dir)
+
+    def execute(self, context):
+        props = context.scene.mixamo_fix_import_properties
+        actions = [a for a in bpy.data.actions if not a.library]
+        if not actions:
+            self.report({'WARNING'}, "No local actions to shard.")
+            return {'CANCELLED'}
+        with profiling.run("Shard Actions"):
+            result = library.shard_actions(actions, props.library_dir, props.library_mode, force=self.force)
+        self.report({'INFO'}, f"Shards written {result['shards_written']}, unchanged {result['shards_skipped']}, "
+                              f"{result['replaced']} actions now linked.")
+        return {'FINISHED'}
+
+class LinkLibraryAction(bpy.types.Operator):
+    """Link an action from the shard libraries and assign it to the active armature"""
+    bl_idname = "import.mixamo_link_action"
+    bl_label = "Link Library Action"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        props = context.scene.mixamo_fix_import_properties
+        return bool(props.library_dir and props.library_action)
+
+    def execute(self, context):
+        props = context.scene.mixamo_fix_import_properties
+        action = library.link_action(props.library_dir, props.library_action)
+        if action is None:
+            self.report({'ERROR'}, f"Action not found in library: {props.library_action}")
+            return {'CANCELLED'}
+        obj = context.active_object
+        if obj and obj.type == 'ARMATURE':
+            animdata.assign_action(obj, action)
+        self.report({'INFO'}, f"Linked {action.name}")
+        return {'FINISHED'}
+
+class UnlinkUnusedLibraryActions(bpy.types.Operator):
+    """Remove linked library actions that nothing uses"""
+    bl_idname = "import.mixamo_unlink_unused"
+    bl_label = "Unlink Unused"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return bool(context.scene.mixamo_fix_import_properties.library_dir)
+
+    def execute(self, context):
+        removed = library.unlink_unused(context.scene.mixamo_fix_import_properties.library_dir)
+        self.report({'INFO'}, f"Unlinked {removed} actions.")
         return {'FINISHED'}
 
 def register():
     bpy.utils.register_class(MixamoFixImportProperties)
     bpy.utils.register_class(MixamoFixImportPanel)
     bpy.utils.register_class(ImportMixamoFBX)
+    bpy.utils.register_class(ImportMixamoFBXCheckpoint)
+    bpy.utils.register_class(ResampleActions)
+    bpy.utils.register_class(RetargetActions)
+    bpy.utils.register_class(ShardActionLibraries)
+    bpy.utils.register_class(LinkLibraryAction)
+    bpy.utils.register_class(UnlinkUnusedLibraryActions)
     bpy.types.Scene.mixamo_fix_import_properties = bpy.props.PointerProperty(type=MixamoFixImportProperties)
+    profiling.register()
+    checkpoint.register()
 
 def unregister():
     if hasattr(bpy.types.Scene, "mixamo_fix_import_properties"):
@@ -204,6 +538,14 @@ def unregister():
     bpy.utils.unregister_class(MixamoFixImportProperties)
     bpy.utils.unregister_class(MixamoFixImportPanel)
     bpy.utils.unregister_class(ImportMixamoFBX)
+    bpy.utils.unregister_class(ImportMixamoFBXCheckpoint)
+    bpy.utils.unregister_class(ResampleActions)
+    bpy.utils.unregister_class(RetargetActions)
+    bpy.utils.unregister_class(ShardActionLibraries)
+    bpy.utils.unregister_class(LinkLibraryAction)
+    bpy.utils.unregister_class(UnlinkUnusedLibraryActions)
+    profiling.unregister()
+    checkpoint.unregister()
 
 if __name__ == "__main__":
     register()
\ No newline at end of file
@@ -0,0 +1,217 @@
+"""
+基准测试：合成 Mixamo 形态的骨架与动作，计时各处理阶段
+
+用法:
+    blender -b -P mixamo_benchmark.py -- [--suite all|bpy|micro]
+        [--bones 65] [--frames 120] [--actions 50]
+        [--repeat 3] [--seed 0] [--output results.json]
+
+  bpy   : 在 Blender 中生成合成数据，计时 adjust_hips_location /
+          transfer_y_rotation_legacy_logic / ApplyTransferOperator / 清理操作符
+  micro : mixamo_microbench.py 中不依赖 bpy 的纯 Python / NumPy 部分 (指纹聚类、循环点搜索、
+          动作搜索、重定向、分类、量化、四元数分解)，也可以不启动 Blender 直接运行该脚本
+
+结果以 JSON 输出 (stdout 末尾或 --output)，每项包含耗时、数量与单位，
+便于跨版本对比回归与提速。
+"""
+
+import bpy
+import os
+import sys
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import mixamo2blender_for_blender_5 as mixamo_import
+import root_motion_transfer_for_blender_5 as root_motion
+import blender_cleanup_for_blender_5 as cleanup
+from mixamo_core import animdata, resample
+from mixamo_microbench import Results, add_arguments, mixamo_bone_list, run_micro_suite, synthetic_curves, timed
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(prog="mixamo_benchmark.py")
+    parser.add_argument("--suite", choices=("all", "bpy", "micro"), default="all")
+    add_arguments(parser)
+    return parser.parse_args(argv)
+
+# ------------------------------------------------------------------------
+#    合成数据生成 (Synthetic Mixamo Generator)
+# ------------------------------------------------------------------------
+
+def clear_scene_data():
+    """每轮重新生成前清空数据 (不用 read_factory_settings，避免注销已注册的类)"""
+    ids = []
+    for collection in (bpy.data.objects, bpy.data.armatures, bpy.data.actions,
+                       bpy.data.meshes, bpy.data.materials):
+        ids.extend(collection)
+    if ids:
+        bpy.data.batch_remove(ids=ids)
+
+def create_synthetic_armature(name="Armature", bone_count=65):
+    clear_scene_data()
+    arm_data = bpy.data.armatures.new(name)
+    obj = bpy.data.objects.new(name, arm_data)
+    bpy.context.scene.collection.objects.link(obj)
+    bpy.context.view_layer.objects.active = obj
+    obj.select_set(True)
+
+    bpy.ops.object.mode_set(mode='EDIT')
+    edit_bones = {}
+    for i, (bone_name, parent) in enumerate(mixamo_bone_list(bone_count)):
+        eb = arm_data.edit_bones.new(bone_name)
+        eb.head = (0.0, 0.0, 1.0 + 0.01 * i)
+        eb.tail = (0.0, 0.0, 1.1 + 0.01 * i)
+        if parent in edit_bones:
+            eb.parent = edit_bones[parent]
+        edit_bones[bone_name] = eb
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+    for pbone in obj.pose.bones:
+        pbone.rotation_mode = 'QUATERNION'
+    return obj
+
+def new_slotted_action(obj, name):
+    """创建 Blender 5.0 分层动作并返回 (action, channelbag)"""
+    action = bpy.data.actions.new(name)
+    slot = action.slots.new(id_type='OBJECT', name=obj.name)
+    layer = action.layers.new("Layer")
+    strip = layer.strips.new(type='KEYFRAME')
+    return action, strip.channelbag(slot, ensure=True)
+
+def write_curve(channelbag, data_path, index, values):
+    fc = channelbag.fcurves.new(data_path, index=index)
+    animdata.write_curve(fc, np.arange(1, len(values) + 1), values)
+    return fc
+
+def generate_library(args):
+    """生成骨架与 args.actions 个动作，返回骨架对象"""
+    rng = np.random.default_rng(args.seed)
+    obj = create_synthetic_armature(bone_count=args.bones)
+    bone_names = [b.name for b in obj.data.bones]
+    for a in range(args.actions):
+        action, channelbag = new_slotted_action(obj, f"Synthetic_{a:04d}")
+        action.use_fake_user = True
+        for data_path, index, values in synthetic_curves(bone_names, args.frames, rng):
+            write_curve(channelbag, data_path, index, values)
+    obj.animation_data_create()
+    first = bpy.data.actions[0]
+    obj.animation_data.action = first
+    obj.animation_data.action_slot = first.slots[0]
+    return obj
+
+class _Reporter:
+    """add_root_bone 需要 operator.report"""
+    def report(self, level, message):
+        pass
+
+# ------------------------------------------------------------------------
+#    bpy 基准 (Blender stages)
+# ------------------------------------------------------------------------
+
+def bench_generate(args, results):
+    times = [timed(generate_library, args) for _ in range(args.repeat)]
+    keys = args.actions * args.bones * 7 * args.frames
+    results.add("bpy", "generate_library", times, keys, "keys")
+
+def bench_adjust_hips(args, results):
+    times = []
+    for _ in range(args.repeat):
+        obj = generate_library(args)
+        actions = list(bpy.data.actions)
+
+        def run():
+            for action in actions:
+                obj.animation_data.action = action
+                mixamo_import.adjust_hips_location(obj)
+
+        times.append(timed(run))
+    results.add("bpy", "adjust_hips_location", times, args.actions, "actions")
+
+def bench_rename_bones(args, results):
+    """带前缀的骨架 (已绑定动作) 去前缀，文件中已有 args.actions 个动作"""
+    times = []
+    for _ in range(args.repeat):
+        obj = generate_library(args)
+        for bone in obj.data.bones:
+            bone.name = "mixamorig:" + bone.name
+        times.append(timed(mixamo_import.rename_bones, obj, "mixamorig:"))
+    results.add("bpy", "rename_bones", times, args.bones, "bones")
+
+def bench_rotation_transfer(args, results):
+    times = []
+    for _ in range(args.repeat):
+        obj = generate_library(args)
+        root_motion.add_root_bone(obj, _Reporter())
+        hips = obj.pose.bones["Hips"]
+        root = obj.pose.bones["Root"]
+        actions = list(bpy.data.actions)
+
+        def run():
+            for action in actions:
+                animdata.assign_action(obj, action)
+                root_motion.transfer_y_rotation_legacy_logic(obj, hips, root, action)
+
+        times.append(timed(run))
+    results.add("bpy", "transfer_y_rotation_legacy_logic", times, args.actions * args.frames, "frames")
+
+def bench_apply_transfer(args, results, rotation):
+    times = []
+    for _ in range(args.repeat):
+        obj = generate_library(args)
+        for action in bpy.data.actions:
+            action.transfer_mode = 'XZ'
+            # 旋转转移已向量化 (quat.split_heading)，所有动作都开启
+            action.transfer_rotation = rotation
+        bpy.context.scene.target_armature = obj.name
+        times.append(timed(bpy.ops.object.apply_transfer))
+    name = "apply_transfer" + ("+rotation" if rotation else "")
+    results.add("bpy", name, times, args.actions, "actions")
+
+def bench_cleanup(args, results):
+    times = []
+    junk = args.actions * 4
+    for _ in range(args.repeat):
+        generate_library(args)
+        for i in range(junk):
+            bpy.data.meshes.new(f"Junk{i}")
+            bpy.data.materials.new(f"Junk{i}")
+        times.append(timed(bpy.ops.object.cleanup_unused_data))
+    results.add("bpy", "cleanup_unused_data", times, junk * 2 + args.actions, "ids")
+
+def bench_resample(args, results):
+    times = []
+    for _ in range(args.repeat):
+        generate_library(args)
+        actions = list(bpy.data.actions)
+        times.append(timed(resample.resample_actions, actions, 60.0, 30.0))
+    results.add("bpy", "resample_30_to_60", times, args.actions * args.bones * 7 * args.frames, "keys")
+
+def run_bpy_suite(args, results):
+    for module in (mixamo_import, root_motion, cleanup):
+        try:
+            module.register()
+        except ValueError:
+            pass
+    bench_generate(args, results)
+    bench_adjust_hips(args, results)
+    bench_rename_bones(args, results)
+    bench_rotation_transfer(args, results)
+    bench_apply_transfer(args, results, rotation=False)
+    bench_apply_transfer(args, results, rotation=True)
+    bench_resample(args, results)
+    bench_cleanup(args, results)
+
+def main():
+    args = parse_args()
+    results = Results(args, bpy.app.version_string)
+    if args.suite in ("all", "micro"):
+        run_micro_suite(args, results)
+    if args.suite in ("all", "bpy"):
+        run_bpy_suite(args, results)
+    results.dump(args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Mixamo 工具集各插件共享的公共模块 (本身不是插件，没有 bl_info)。
+
+安装：把整个 mixamo_core 文件夹复制到 Blender 用户脚本目录的 modules/ 下
+(例如 ~/.config/blender/5.0/scripts/modules/mixamo_core)，
+各 *_for_blender_5.py 插件通过 `from mixamo_core import ...` 使用。
+
+模块：
+    animdata   Blender 5.0 分层动作访问层 (slot / channelbag、F-Curve 索引、批量关键帧读写)
+    quat       NumPy 向量化四元数运算 (含 slerp)
+    resample   批量帧率重采样
+    profiling  可选的分阶段性能分析
+    checkpoint 批量操作前的磁盘检查点 (替代撤销栈)，一键恢复
+    ledger     导入账本：记录每次导入新建的 ID (session_uid 水位线)
+    fbxanim    只读动画的 FBX 快速加载，直接换算到已有骨架的骨骼空间
+    prefetch   后台线程池预读文件 (页缓存 + 哈希 + 文件头检查)
+    quantize   关键帧量化压缩 (smallest-three 四元数 + 定点位移) 与 .mxqa 二进制读写
+    trajectory Root Motion 转移前后 Hips 世界轨迹的向量化校验
+    sidecar    Root Motion 附属轨道 (.rmtrack)：逐帧位移 / 朝向增量，可内存映射
+    export     多进程批量导出 FBX / glTF (内容哈希增量)
+    store      外部压缩动作库 (.npz)，按需物化、LRU 淘汰
+    library    动作分片到独立的库 .blend，按需链接
+    retarget   骨骼映射 + 静止姿态矩阵的向量化批量重定向
+    locomotion 根据 Hips 曲线自动判断位移 / 原地动作 (Root Motion 设置)
+    analysis   重复 / 镜像动作的指纹聚类与循环点搜索 (不依赖 bpy)
+    search     动作名称 / 标签的前缀与模糊搜索索引 (不依赖 bpy)
+
+命令行脚本 (mixamo_pipeline_cli.py / mixamo_benchmark.py / mixamo_microbench.py) 会自动把仓库目录加入 sys.path。
+animdata / quat / resample / retarget / locomotion / quantize / analysis / search 不导入 bpy，可以在 Blender 之外使用。
+"""
@@ -0,0 +1,319 @@
+"""
+动作库分析：重复 / 镜像动作的指纹聚类 (LSH) 与循环点搜索。
+
+只通过 animdata 读取曲线 (foreach_get)，不导入 bpy，可以在 Blender 之外用模拟动作测试与计时
+(mixamo_microbench.py)。Action Library Analyzer 插件的操作符调用这里的函数。
+"""
+
+import re
+from contextlib import nullcontext
+
+import numpy as np
+
+from . import animdata, quat
+
+def _no_stage(*_args):
+    return nullcontext()
+
+# ------------------------------------------------------------------------
+#    动作指纹与聚类 (Fingerprints)
+# ------------------------------------------------------------------------
+
+# 只分析骨骼的位移与旋转通道，缩放在 Mixamo 动作中恒为 1，没有区分度
+BONE_CHANNEL_RE = re.compile(r'^pose\.bones\["(.+)"\]\.(location|rotation_quaternion|rotation_euler)$')
+
+# 镜像时需要取反的分量 (与 Blender "Paste X-Flipped Pose" 一致)
+MIRROR_NEGATE = {
+    "location": {0},
+    "rotation_quaternion": {2, 3},
+    "rotation_euler": {1, 2},
+}
+
+def read_keyframes(fcurve):
+    """一次 foreach_get 读出整条曲线的 (frames, values)"""
+    co = animdata.read_curve(fcurve)
+    return co[:, 0], co[:, 1]
+
+def mirror_bone_name(name):
+    """Left <-> Right 互换 (Mixamo 命名规则)"""
+    if "Left" in name:
+        return name.replace("Left", "Right")
+    if "Right" in name:
+        return name.replace("Right", "Left")
+    return name
+
+def default_channel_value(prop, index):
+    return 1.0 if prop == "rotation_quaternion" and index == 0 else 0.0
+
+def canonicalize_quaternions(channels):
+    """q 与 -q 表示同一旋转：统一翻转到 w >= 0 的半球"""
+    bones = {bone for (bone, prop, _i) in channels if prop == "rotation_quaternion"}
+    for bone in bones:
+        keys = [(bone, "rotation_quaternion", i) for i in range(4)]
+        if not all(k in channels for k in keys):
+            continue
+        sign = np.where(channels[keys[0]] < 0.0, -1.0, 1.0).astype(np.float32)
+        for k in keys:
+            channels[k] = channels[k] * sign
+
+def sample_action_channels(action, samples):
+    """
+    将动作的骨骼曲线降采样到固定的 samples 个时间点。
+    返回 {(bone, prop, index): ndarray}，与动作长度无关。
+    """
+    frame_start, frame_end = action.frame_range
+    times = np.linspace(frame_start, frame_end, samples, dtype=np.float32)
+    channels = {}
+    for fc in animdata.iter_fcurves(action):
+        match = BONE_CHANNEL_RE.match(fc.data_path)
+        if not match or len(fc.keyframe_points) == 0:
+            continue
+        frames, values = read_keyframes(fc)
+        key = (match.group(1), match.group(2), fc.array_index)
+        channels[key] = np.interp(times, frames, values).astype(np.float32)
+    canonicalize_quaternions(channels)
+    return channels
+
+def mirror_channels(channels):
+    mirrored = {}
+    for (bone, prop, index), values in channels.items():
+        if index in MIRROR_NEGATE[prop]:
+            values = -values
+        mirrored[(mirror_bone_name(bone), prop, index)] = values
+    canonicalize_quaternions(mirrored)
+    return mirrored
+
+def build_fingerprint_matrix(channel_sets, samples):
+    """
+    把每个动作的通道字典按统一词表拼成 (n_actions, n_channels * samples) 矩阵。
+    缺失通道填默认值 (四元数 w=1，其余为 0)。
+    """
+    vocabulary = sorted({key for channels in channel_sets for key in channels})
+    column = {key: i for i, key in enumerate(vocabulary)}
+    defaults = np.array([default_channel_value(prop, idx) for (_b, prop, idx) in vocabulary], dtype=np.float32)
+
+    matrix = np.empty((len(channel_sets), len(vocabulary), samples), dtype=np.float32)
+    matrix[:] = defaults[None, :, None]
+    for row, channels in enumerate(channel_sets):
+        for key, values in channels.items():
+            matrix[row, column[key]] = values
+    return matrix.reshape(len(channel_sets), -1), vocabulary
+
+def project_channels(channel_sets, vocabulary, samples):
+    """按已有词表投影 (用于镜像指纹)，词表外的通道直接丢弃"""
+    column = {key: i for i, key in enumerate(vocabulary)}
+    defaults = np.array([default_channel_value(prop, idx) for (_b, prop, idx) in vocabulary], dtype=np.float32)
+    matrix = np.empty((len(channel_sets), len(vocabulary), samples), dtype=np.float32)
+    matrix[:] = defaults[None, :, None]
+    for row, channels in enumerate(channel_sets):
+        for key, values in channels.items():
+            col = column.get(key)
+            if col is not None:
+                matrix[row, col] = values
+    return matrix.reshape(len(channel_sets), -1)
+
+def normalize_rows(matrix, mean):
+    """减去全库均值后单位化：余弦相似度才有区分度"""
+    centered = matrix - mean
+    norms = np.linalg.norm(centered, axis=1, keepdims=True)
+    norms[norms < 1e-8] = 1.0
+    return centered / norms
+
+def lsh_band_keys(matrix, hyperplanes, bands, rows):
+    """随机超平面 SimHash，按 band 切分成可哈希的 bytes key"""
+    bits = (matrix @ hyperplanes) > 0.0
+    packed = np.packbits(bits.reshape(len(matrix), bands, rows), axis=2)
+    return [[packed[i, b].tobytes() for b in range(bands)] for i in range(len(matrix))]
+
+class UnionFind:
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+def find_duplicate_clusters(actions, samples=16, threshold=0.97, length_tolerance=0.1,
+                            bands=16, rows=12, include_mirrored=True, seed=0, stage=None):
+    """
+    LSH 聚类：只对同桶候选做一次指纹点积校验，避免 O(n²) 全曲线比较。
+    返回 (clusters, mirror_links)：
+      clusters: [[(action_index, similarity), ...], ...] 仅包含 size > 1 的簇
+      mirror_links: [(i, j, similarity), ...] i 的镜像与 j 近似
+    stage 为阶段计时 (插件传入 profiling.stage)，默认不计时。
+    """
+    stage = stage or _no_stage
+    with stage("sample curves", len(actions), "actions"):
+        channel_sets = [sample_action_channels(a, samples) for a in actions]
+    with stage("build fingerprints", len(actions), "actions"):
+        matrix, vocabulary = build_fingerprint_matrix(channel_sets, samples)
+    if matrix.shape[1] == 0:
+        return [], []
+
+    mean = matrix.mean(axis=0)
+    fingerprints = normalize_rows(matrix, mean)
+    lengths = np.array([max(a.frame_range[1] - a.frame_range[0], 1.0) for a in actions], dtype=np.float32)
+
+    rng = np.random.default_rng(seed)
+    hyperplanes = rng.standard_normal((fingerprints.shape[1], bands * rows)).astype(np.float32)
+    keys = lsh_band_keys(fingerprints, hyperplanes, bands, rows)
+
+    def length_ok(i, j):
+        return abs(lengths[i] - lengths[j]) <= length_tolerance * max(lengths[i], lengths[j])
+
+    # 每个 band 一张哈希表；桶内只与代表元素比较，保证线性复杂度
+    tables = [dict() for _ in range(bands)]
+    uf = UnionFind(len(actions))
+    best_similarity = np.zeros(len(actions), dtype=np.float32)
+    for i in range(len(actions)):
+        for b in range(bands):
+            rep = tables[b].setdefault(keys[i][b], i)
+            if rep == i or uf.find(rep) == uf.find(i) or not length_ok(i, rep):
+                continue
+            similarity = float(fingerprints[i] @ fingerprints[rep])
+            if similarity >= threshold:
+                uf.union(i, rep)
+                best_similarity[i] = max(best_similarity[i], similarity)
+                best_similarity[rep] = max(best_similarity[rep], similarity)
+
+    groups = {}
+    for i in range(len(actions)):
+        groups.setdefault(uf.find(i), []).append(i)
+    clusters = [[(i, float(best_similarity[i])) for i in members]
+                for members in groups.values() if len(members) > 1]
+
+    mirror_links = []
+    if include_mirrored:
+        mirrored = normalize_rows(project_channels([mirror_channels(c) for c in channel_sets], vocabulary, samples), mean)
+        mirror_keys = lsh_band_keys(mirrored, hyperplanes, bands, rows)
+        seen = set()
+        for i in range(len(actions)):
+            for b in range(bands):
+                rep = tables[b].get(mirror_keys[i][b])
+                if rep is None or uf.find(rep) == uf.find(i) or not length_ok(i, rep):
+                    continue
+                pair = tuple(sorted((uf.find(i), uf.find(rep))))
+                if pair in seen:
+                    continue
+                similarity = float(mirrored[i] @ fingerprints[rep])
+                if similarity >= threshold:
+                    seen.add(pair)
+                    mirror_links.append((i, rep, similarity))
+
+    return clusters, mirror_links
+
+# ------------------------------------------------------------------------
+#    循环质量分析 (Loop Quality)
+# ------------------------------------------------------------------------
+
+# 根位移 (行走类动作的前进量) 天然首尾不同，不计入循环误差
+ROOT_BONE_NAMES = {"hips", "root"}
+
+def sample_action_frames(action):
+    """
+    按整数帧采样动作的全部骨骼通道 (Mixamo 为逐帧烘焙)。
+    返回 (frames, quats (F, B, 4), values (F, M))。
+    """
+    frame_start, frame_end = action.curve_frame_range
+    frames = np.arange(int(np.ceil(frame_start)), int(np.floor(frame_end)) + 1, dtype=np.float32)
+    quat_parts = {}
+    values = []
+    for fc in animdata.iter_fcurves(action):
+        match = BONE_CHANNEL_RE.match(fc.data_path)
+        if not match or len(fc.keyframe_points) == 0:
+            continue
+        bone, prop = match.group(1), match.group(2)
+        if prop == "location" and bone.lower() in ROOT_BONE_NAMES and fc.array_index != 1:
+            continue
+        keys, vals = read_keyframes(fc)
+        sampled = np.interp(frames, keys, vals).astype(np.float32)
+        if prop == "rotation_quaternion":
+            quat_parts.setdefault(bone, [None] * 4)[fc.array_index] = sampled
+        else:
+            values.append(sampled)
+
+    quats = [np.stack(parts, axis=1) for parts in quat_parts.values() if all(p is not None for p in parts)]
+    quats = np.stack(quats, axis=1) if quats else np.zeros((len(frames), 0, 4), dtype=np.float32)
+    norms = np.linalg.norm(quats, axis=2, keepdims=True)
+    quats = quats / np.maximum(norms, 1e-8)
+    values = np.stack(values, axis=1) if values else np.zeros((len(frames), 0), dtype=np.float32)
+    return frames, quats, values
+
+def pose_distance_matrix(quats_a, values_a, quats_b, values_b):
+    """
+    (Ka, Kb) 姿态距离：骨骼平均旋转角 (度) + 其余通道 RMS 差 (厘米)。
+    全部为广播运算，无 Python 循环。
+    """
+    distance = np.zeros((len(quats_a), len(quats_b)), dtype=np.float32)
+    if quats_a.shape[1]:
+        dots = np.abs(np.einsum('ibk,jbk->ijb', quats_a, quats_b))
+        distance += np.degrees(2.0 * np.arccos(np.clip(dots, 0.0, 1.0))).mean(axis=2)
+    if values_a.shape[1]:
+        diff = values_a[:, None, :] - values_b[None, :, :]
+        distance += np.sqrt((diff ** 2).mean(axis=2)) * 100.0
+    return distance
+
+def find_best_loop(quats, values, search_frames=10, length_weight=0.5):
+    """
+    在前 search_frames 帧里找起点 s、后 search_frames 帧里找终点 e，
+    使 pose(e) ≈ pose(s)，播放区间为 [s, e - 1] (e 帧即回绕后的 s 帧)。
+    误差取 (s-1,e-1)/(s,e)/(s+1,e+1) 三组的平均，同时约束回绕处的速度。
+    丢弃帧数按实际播放区间计：s + (count - e)。
+
+    当前区间 [0, count - 1] (e = count，不丢帧) 也是一个候选：第 count 帧不存在，
+    由末两帧匀速外推，误差为 d(外推帧, 首帧) (首尾帧重复时回绕处停顿一帧，也会被发现)；
+    没有候选在加上丢帧惩罚后优于它时保持原区间。
+    返回 (original_score, best_score, s, e)，均为帧序号 (从 0 开始)。
+    """
+    count = len(quats)
+    if count < 4:
+        return 0.0, 0.0, 0, count
+
+    k = max(1, min(search_frames, count // 4))
+    head = np.arange(0, k + 1)
+    tail = np.arange(count - k - 1, count)
+    distance = pose_distance_matrix(quats[head], values[head], quats[tail], values[tail])
+
+    # 相邻帧对 (对角线平移) 求平均
+    padded = np.full((len(head) + 2, len(tail) + 2), np.nan, dtype=np.float32)
+    padded[1:-1, 1:-1] = distance
+    stacked = np.stack([padded[:-2, :-2], padded[1:-1, 1:-1], padded[2:, 2:]])
+    smoothed = np.nanmean(stacked, axis=0)
+
+    # 只考虑 s < k、e >= count - k 的组合，并按丢弃帧数加惩罚
+    s_idx = head[:, None]
+    e_idx = tail[None, :]
+    dropped = s_idx + (count - e_idx)
+    score = smoothed + length_weight * dropped
+    score[s_idx.ravel() >= k, :] = np.inf
+    score[:, e_idx.ravel() < count - k] = np.inf
+
+    # 当前区间：末帧之后应出现的第 count 帧 (匀速外推) 与回绕后的首帧比较
+    step = quat.multiply(quats[-1], quat.inverse(quats[-2]))
+    next_quats = quat.normalize(quat.multiply(step, quats[-1]))[None].astype(np.float32)
+    next_values = (2.0 * values[-1] - values[-2])[None]
+    original = float(pose_distance_matrix(next_quats, next_values, quats[:1], values[:1])[0, 0])
+    best = np.unravel_index(np.argmin(score), score.shape)
+    if score[best] >= original:
+        return original, original, 0, count
+    s, e = int(head[best[0]]), int(tail[best[1]])
+    return original, float(smoothed[best]), s, e
+
+def analyze_action_loop(action, search_frames=10, length_weight=0.5):
+    """返回 (原始误差, 最佳误差, 最佳起始帧, 最佳结束帧)，帧号为场景帧"""
+    frames, quats, values = sample_action_frames(action)
+    if len(frames) == 0:
+        return 0.0, 0.0, 0, 0
+    original, best, s, e = find_best_loop(quats, values, search_frames, length_weight)
+    return original, best, int(frames[s]), int(frames[max(e - 1, s)])
+
+def pick_keeper(actions):
+    """保留引用最多的动作，其次名字最短 (通常是原始下载而非 .001 副本)"""
+    return max(actions, key=lambda a: (a.users, -len(a.name), a.name))
@@ -0,0 +1,249 @@
+"""
+动作数据访问层：兼容 Blender 5.0 分层动作 (Slotted Actions) 与旧版 action.fcurves。
+
+热路径统一在这里优化：
+  - FCurveIndex: (data_path, index) -> FCurve 的字典索引，替代逐条线性查找
+  - read_curve / write_curve / merge_keys: 整条曲线一次 foreach_get / foreach_set，
+    替代逐个 keyframe_points.insert 与 keyframe.co 读写
+"""
+
+import re
+
+import numpy as np
+
+# ------------------------------------------------------------------------
+#    Slot / Channelbag
+# ------------------------------------------------------------------------
+
+def is_layered(action):
+    return not hasattr(action, "fcurves") and hasattr(action, "layers")
+
+def iter_fcurves(action):
+    """遍历 Action 中的所有 F-Curve (旧版与 5.0 分层结构)"""
+    if hasattr(action, "fcurves"):
+        yield from action.fcurves
+        return
+    if hasattr(action, "layers"):
+        for layer in action.layers:
+            for strip in layer.strips:
+                if hasattr(strip, "channelbags"):
+                    for channelbag in strip.channelbags:
+                        yield from channelbag.fcurves
+
+def slot_for_object(obj, action):
+    """
+    选择 obj 应使用的 slot：当前 slot 属于此 action 则保留，
+    否则取第一个 OBJECT 类型的 slot (没有则取第一个)。
+    """
+    slots = getattr(action, "slots", None)
+    if not slots:
+        return None
+    adt = obj.animation_data if obj else None
+    current = getattr(adt, "action_slot", None) if adt and adt.action == action else None
+    if current is not None and any(s == current for s in slots):
+        return current
+    for slot in slots:
+        if getattr(slot, "target_id_type", 'OBJECT') == 'OBJECT':
+            return slot
+    return slots[0]
+
+def assign_action(obj, action, slot=None):
+    """把 action 应用到 obj，并确保 action_slot 有效"""
+    adt = obj.animation_data or obj.animation_data_create()
+    if slot is None:
+        slot = slot_for_object(obj, action)
+    adt.action = action
+    if slot is not None and hasattr(adt, "action_slot") and adt.action_slot != slot:
+        try:
+            adt.action_slot = slot
+        except Exception as e:
+            print(f"Could not assign slot: {e}")
+    return slot
+
+def ensure_slot(action, obj=None):
+    """取 obj 正在使用的 slot；动作还没有 slot 时新建一个 OBJECT slot"""
+    slot = slot_for_object(obj, action)
+    if slot is None and hasattr(action, "slots"):
+        slot = action.slots.new(id_type='OBJECT', name=obj.name if obj else "Legacy Slot")
+        if obj and obj.animation_data and obj.animation_data.action == action:
+            obj.animation_data.action_slot = slot
+    return slot
+
+def channelbag_for(action, slot, ensure=False):
+    """slot 对应的 channelbag；ensure=True 时按需创建 layer / strip / channelbag"""
+    from bpy_extras import anim_utils
+    if ensure:
+        return anim_utils.action_ensure_channelbag_for_slot(action, slot)
+    return anim_utils.action_get_channelbag_for_slot(action, slot)
+
+# ------------------------------------------------------------------------
+#    F-Curve 索引 (Indexed lookup)
+# ------------------------------------------------------------------------
+
+class FCurveIndex:
+    """
+    一个动作的 F-Curve 字典索引。构建一次 O(n)，之后查找 O(1)。
+    ensure() 新建的曲线会同步加入索引。
+    """
+    def __init__(self, action, obj=None):
+        self.action = action
+        self.obj = obj
+        self.curves = {(fc.data_path, fc.array_index): fc for fc in iter_fcurves(action)}
+        self._channelbag = None
+
+    def __iter__(self):
+        return iter(self.curves.values())
+
+    def __len__(self):
+        return len(self.curves)
+
+    def get(self, data_path, index=0):
+        return self.curves.get((data_path, index))
+
+    def bone(self, bone_name, prop, count=3):
+        """[fc 或 None] * count，例如 bone("Hips", "location")"""
+        path = f'pose.bones["{bone_name}"].{prop}'
+        return [self.curves.get((path, i)) for i in range(count)]
+
+    def ensure(self, data_path, index=0, group_name=None):
+        fc = self.curves.get((data_path, index))
+        if fc is not None:
+            return fc
+        if is_layered(self.action):
+            if self._channelbag is None:
+                self._channelbag = channelbag_for(self.action, ensure_slot(self.action, self.obj), ensure=True)
+            fc = self._channelbag.fcurves.new(data_path, index=index)
+            if group_name:
+                group = self._channelbag.groups.get(group_name) or self._channelbag.groups.new(group_name)
+                fc.group = group
+        else:
+            fc = self.action.fcurves.new(data_path, index=index, action_group=group_name or "")
+        self.curves[(data_path, index)] = fc
+        return fc
+
+    def ensure_bone(self, bone_name, prop, count=3, group_name=None):
+        path = f'pose.bones["{bone_name}"].{prop}'
+        return [self.ensure(path, i, group_name) for i in range(count)]
+
+BONE_PATH = re.compile(r'^pose\.bones\["((?:[^"\\]|\\.)*)"\](.*)$')
+
+def rename_bone_paths(action, renames):
+    """
+    按 {旧骨骼名: 新骨骼名} 一次性改写动作中的 data_path 与同名的通道组，返回改写的曲线数。
+    骨骼改名前先解绑动作再调用它，可以避免 Blender 每改一个骨骼名就遍历一次动作曲线。
+    """
+    renamed = 0
+    for fc in iter_fcurves(action):
+        match = BONE_PATH.match(fc.data_path)
+        if match is None or match.group(1) not in renames:
+            continue
+        fc.data_path = f'pose.bones["{renames[match.group(1)]}"]{match.group(2)}'
+        if fc.group is not None and fc.group.name in renames:
+            fc.group.name = renames[fc.group.name]
+        renamed += 1
+    return renamed
+
+# ------------------------------------------------------------------------
+#    批量读写 (Bulk keyframe access)
+# ------------------------------------------------------------------------
+
+def read_curve(fc):
+    """整条曲线的关键帧 -> (N, 2) float32 数组，列为 [frame, value]"""
+    count = len(fc.keyframe_points)
+    co = np.empty(count * 2, dtype=np.float32)
+    fc.keyframe_points.foreach_get("co", co)
+    return co.reshape(count, 2)
+
+KEY_TYPES = ("interpolation", "handle_left_type", "handle_right_type")
+
+def read_key_types(fc):
+    """逐关键帧的插值与手柄类型 -> {属性: (N,) int32 枚举下标}"""
+    count = len(fc.keyframe_points)
+    types = {}
+    for attr in KEY_TYPES:
+        types[attr] = np.empty(count, dtype=np.int32)
+        fc.keyframe_points.foreach_get(attr, types[attr])
+    return types
+
+def key_enum_value(attr, identifier):
+    """Keyframe 枚举属性的标识符 -> foreach_get / foreach_set 使用的整数值"""
+    import bpy
+    return bpy.types.Keyframe.bl_rna.properties[attr].enum_items[identifier].value
+
+def set_interpolation(fc, identifier, update=True):
+    """所有关键帧设为同一种插值 (例如 'LINEAR')"""
+    points = fc.keyframe_points
+    points.foreach_set("interpolation", np.full(len(points), key_enum_value("interpolation", identifier),
+                                                dtype=np.int32))
+    if update:
+        fc.update()
+
+def write_curve(fc, frames, values, update=True):
+    """
+    用 (frames, values) 整体替换曲线的全部关键帧。
+    关键帧数量变化时 clear() + add() 会把类型重置为默认的 Bezier / auto-clamped，
+    所以先读出旧的插值与手柄类型再写回：同帧的关键帧保留自己的类型 (与 insert 替换一致)，
+    新帧沿用前一个旧关键帧的类型 (在第一个之前则用第一个)。
+    """
+    frames = np.asarray(frames, dtype=np.float32)
+    co = np.empty((len(frames), 2), dtype=np.float32)
+    co[:, 0] = frames
+    co[:, 1] = values
+    points = fc.keyframe_points
+    if len(points) != len(co):
+        old_frames = read_curve(fc)[:, 0]
+        types = read_key_types(fc) if len(old_frames) else None
+        points.clear()
+        points.add(len(co))
+        if types is not None and len(co):
+            source = np.clip(np.searchsorted(old_frames, frames, side="right") - 1, 0, len(old_frames) - 1)
+            for attr, old in types.items():
+                points.foreach_set(attr, old[source])
+    points.foreach_set("co", co.ravel())
+    # auto 类手柄在 update() 时按相邻关键帧重新计算
+    if update:
+        fc.update()
+
+def merge_keys(fc, frames, values, update=True):
+    """
+    等价于逐帧 keyframe_points.insert：同帧的旧关键帧被替换 (保留其插值与手柄类型)，其余保留。
+    """
+    frames = np.asarray(frames, dtype=np.float32)
+    values = np.asarray(values, dtype=np.float32)
+    old = read_curve(fc)
+    if len(old):
+        keep = ~np.isin(old[:, 0], frames)
+        frames = np.concatenate([old[keep, 0], frames])
+        values = np.concatenate([old[keep, 1], values])
+        order = np.argsort(frames, kind="stable")
+        frames, values = frames[order], values[order]
+    write_curve(fc, frames, values, update)
+
+def transform_values(fc, scale=1.0, offset=0.0, update=True):
+    """所有关键帧值就地变换 value * scale + offset (仅改 co，与逐帧修改 co 一致)"""
+    co = read_curve(fc)
+    if not len(co):
+        return
+    co[:, 1] = co[:, 1] * scale + offset
+    fc.keyframe_points.foreach_set("co", co.ravel())
+    if update:
+        fc.update()
+
+def evaluate_curve(fc, frames):
+    """
+    在指定帧求值。关键帧恰好落在这些帧上时 (Mixamo 逐帧烘焙) 直接取键值，
+    否则逐帧 fc.evaluate。
+    """
+    frames = np.asarray(frames, dtype=np.float32)
+    co = read_curve(fc)
+    if len(co):
+        pos = np.searchsorted(co[:, 0], frames)
+        pos = np.clip(pos, 0, len(co) - 1)
+        if np.all(co[pos, 0] == frames):
+            return co[pos, 1].copy()
+    return np.array([fc.evaluate(float(f)) for f in frames], dtype=np.float32)
+
+def frame_numbers(action):
+    """action.frame_range 覆盖的整数帧"""
+    start, end = action.frame_range
+    return np.arange(int(start), int(end) + 1, dtype=np.float32)
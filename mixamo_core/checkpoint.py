@@ -0,0 +1,169 @@
+"""
+磁盘检查点：大批量操作 (导入整个文件夹、整个动作库的 Root Motion) 不压入撤销栈，
+改为运行前把当前文件压缩另存为一份检查点 .blend，需要时一键打开它恢复。
+
+撤销栈的一步会在内存里保留整份数据的副本，动作库很大时峰值内存接近翻倍、压栈也要数秒；
+检查点只占磁盘，内存峰值保持在工作集大小。
+
+    from mixamo_core import checkpoint
+
+    class BatchCheckpoint(Batch):          # 同一操作符去掉 'UNDO' 的变体
+        bl_idname = "xxx.batch_checkpoint"
+        bl_options = {'REGISTER'}
+
+        def execute(self, context):
+            if checkpoint.save("batch", self) is None:
+                return {'CANCELLED'}
+            return super().execute(context)
+
+去掉 'UNDO' 后操作符本身不压栈；批量中用 bpy.ops 调用的操作符 (导入器等) 默认也不压栈 (undo=False)。
+不改动全局撤销 (preferences.edit.use_global_undo)：那是用户偏好，批量中途崩溃或退出时会随偏好自动保存留下来。
+
+检查点位置：已保存的文件放在同目录的 mixamo_checkpoints/ 下，未保存的文件放在系统临时目录。
+文件名为 <文件名>_<label>_<时间>.blend；每个文件每种 label 最多保留 MAX_CHECKPOINTS 份，
+更旧的按目录中的文件 (包括之前会话留下的) 自动删除。
+恢复会打开检查点文件本身 (当前文件路径随之变为检查点路径)，需要时用 Save As 保存回原位置。
+"""
+
+import os
+import re
+import time
+import tempfile
+
+import bpy
+
+CHECKPOINT_DIR = "mixamo_checkpoints"
+MAX_CHECKPOINTS = 3
+
+# 本次会话创建的检查点 (最新的在最后)：{"path", "label", "source", "time"}
+_checkpoints = []
+
+def is_enabled(context):
+    settings = getattr(context.window_manager, "mixamo_checkpoint", None)
+    return settings is not None and settings.mode == 'CHECKPOINT'
+
+def checkpoint_dir():
+    if not bpy.data.filepath:
+        return os.path.join(tempfile.gettempdir(), CHECKPOINT_DIR)
+    folder = os.path.dirname(bpy.data.filepath)
+    # 从检查点恢复后当前文件就在检查点目录里，不再嵌套一层
+    if os.path.basename(folder) == CHECKPOINT_DIR:
+        return folder
+    return os.path.join(folder, CHECKPOINT_DIR)
+
+def save(label, operator=None):
+    """把当前文件压缩另存为检查点 (不改变当前文件路径)，返回路径；失败时报告并返回 None"""
+    source = bpy.data.filepath
+    # 从检查点恢复后继续工作：仍按原文件命名与计数
+    source = next((c["source"] for c in _checkpoints if c["path"] == source), source)
+    stem = os.path.splitext(os.path.basename(source))[0] if source else "untitled"
+    folder = checkpoint_dir()
+    path = os.path.join(folder, f"{stem}_{label}_{time.strftime('%Y%m%d_%H%M%S')}.blend")
+    t0 = time.perf_counter()
+    try:
+        os.makedirs(folder, exist_ok=True)
+        bpy.ops.wm.save_as_mainfile(filepath=path, copy=True, compress=True, check_existing=False)
+    except (OSError, RuntimeError) as e:
+        if operator is not None:
+            operator.report({'ERROR'}, f"检查点保存失败: {e}")
+        return None
+    _checkpoints.append({"path": path, "label": label, "source": source, "time": time.time()})
+    prune(folder, stem, label)
+    print(f"[checkpoint] {label}: {path} ({os.path.getsize(path) / 1e6:.1f} MB, "
+          f"{time.perf_counter() - t0:.2f}s)")
+    return path
+
+def prune(folder, stem, label):
+    """
+    扫描检查点目录，同一文件同一 label 只保留最近 MAX_CHECKPOINTS 份。
+    _checkpoints 只记录本次会话，之前会话留下的检查点也要按文件名找出来。
+    """
+    pattern = re.compile(re.escape(f"{stem}_{label}_") + r"\d{8}_\d{6}\.blend$")
+    try:
+        names = sorted(name for name in os.listdir(folder) if pattern.match(name))
+    except OSError:
+        return
+    # 时间戳定长，按文件名排序即按时间排序
+    for name in names[:-MAX_CHECKPOINTS]:
+        path = os.path.join(folder, name)
+        if path == bpy.data.filepath:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    _checkpoints[:] = [c for c in _checkpoints if os.path.exists(c["path"])]
+
+def latest():
+    for entry in reversed(_checkpoints):
+        if os.path.exists(entry["path"]):
+            return entry
+    return None
+
+# ------------------------------------------------------------------------
+#    UI (模式开关与恢复)
+# ------------------------------------------------------------------------
+
+class MIXAMO_CheckpointSettings(bpy.types.PropertyGroup):
+    mode: bpy.props.EnumProperty(
+        name="Undo Mode",
+        description="批量操作如何支持撤销",
+        items=[
+            ('UNDO', "Undo", "压入撤销栈 (动作库很大时内存接近翻倍)"),
+            ('CHECKPOINT', "Checkpoint", "运行前压缩另存一份检查点 .blend，不压入撤销栈"),
+        ],
+        default='UNDO',
+    )
+
+class MIXAMO_OT_RevertCheckpoint(bpy.types.Operator):
+    """打开最近一次批量操作前保存的检查点 (丢弃之后的所有修改)"""
+    bl_idname = "mixamo.revert_checkpoint"
+    bl_label = "Revert to Checkpoint"
+
+    @classmethod
+    def poll(cls, context):
+        return latest() is not None
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_confirm(self, event)
+
+    def execute(self, context):
+        entry = latest()
+        bpy.ops.wm.open_mainfile(filepath=entry["path"], load_ui=False)
+        source = entry["source"] or "untitled"
+        self.report({'INFO'}, f"已恢复到 {entry['label']} 之前的检查点；用 Save As 保存回 {source}")
+        return {'FINISHED'}
+
+_register_count = 0
+
+def register():
+    """多个插件共用，按引用计数注册"""
+    global _register_count
+    _register_count += 1
+    if _register_count == 1:
+        bpy.utils.register_class(MIXAMO_CheckpointSettings)
+        bpy.utils.register_class(MIXAMO_OT_RevertCheckpoint)
+        bpy.types.WindowManager.mixamo_checkpoint = bpy.props.PointerProperty(type=MIXAMO_CheckpointSettings)
+
+def unregister():
+    global _register_count
+    _register_count -= 1
+    if _register_count == 0:
+        del bpy.types.WindowManager.mixamo_checkpoint
+        bpy.utils.unregister_class(MIXAMO_OT_RevertCheckpoint)
+        bpy.utils.unregister_class(MIXAMO_CheckpointSettings)
+
+def operator_id(context, idname):
+    """当前模式下批量按钮应调用的操作符 (检查点变体为 idname + "_checkpoint")"""
+    return idname + "_checkpoint" if is_enabled(context) else idname
+
+def draw_panel(layout, context):
+    settings = context.window_manager.mixamo_checkpoint
+    row = layout.row(align=True)
+    row.prop(settings, "mode", expand=True)
+    entry = latest()
+    if settings.mode == 'CHECKPOINT' or entry is not None:
+        row = layout.row(align=True)
+        label = f"{entry['label']} @ {time.strftime('%H:%M:%S', time.localtime(entry['time']))}" if entry else "—"
+        row.label(text=label, icon='FILE_BACKUP')
+        row.operator("mixamo.revert_checkpoint", text="Revert", icon='LOOP_BACK')
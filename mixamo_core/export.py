@@ -0,0 +1,323 @@
+"""
+批量导出：把处理好的骨架动作导出为 FBX / glTF 供游戏引擎使用。
+
+    协调进程 (coordinator)  计算每个动作的内容哈希，与输出目录中的 manifest 比较，
+                            只把变化的动作按帧数均衡分片，交给多个无界面 Blender 工作进程
+    工作进程 (worker)       打开同一个 .blend，逐个动作导出，结果写回 JSON
+                            (通过 --python-expr 启动，见 worker_expression)
+
+单文件多动作 glTF 无法分片合并，由一个进程导出。
+"""
+
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import subprocess
+
+import bpy
+import numpy as np
+
+from . import animdata, profiling
+from .store import STORE_KEY, get_store
+
+MANIFEST_NAME = "export_manifest.json"
+ALL_ACTIONS_KEY = "*"
+
+FORMAT_EXTENSIONS = {"FBX": ".fbx", "GLB": ".glb", "GLTF_SEPARATE": ".gltf"}
+
+# ------------------------------------------------------------------------
+#    内容哈希与 manifest
+# ------------------------------------------------------------------------
+
+def action_content_hash(action, settings_key=""):
+    """
+    动作内容的 SHA1：所有曲线 (按 data_path / index 排序) 的关键帧与手柄、
+    帧范围以及导出设置。改名不会触发重新导出，改任何一个关键帧都会。
+    """
+    h = hashlib.sha1(settings_key.encode("utf-8"))
+    h.update(np.asarray(action.frame_range, dtype=np.float32).tobytes())
+    for fc in sorted(animdata.iter_fcurves(action), key=lambda f: (f.data_path, f.array_index)):
+        h.update(f"{fc.data_path}[{fc.array_index}]".encode("utf-8"))
+        points = fc.keyframe_points
+        buf = np.empty(len(points) * 2, dtype=np.float32)
+        for prop in ("co", "handle_left", "handle_right"):
+            points.foreach_get(prop, buf)
+            h.update(buf.tobytes())
+    return h.hexdigest()
+
+def library_content_hash(hashes):
+    """多动作单文件的哈希：各动作哈希按名字排序后再哈希"""
+    h = hashlib.sha1()
+    for name in sorted(hashes):
+        h.update(name.encode("utf-8"))
+        h.update(hashes[name].encode("utf-8"))
+    return h.hexdigest()
+
+def load_manifest(output_dir):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[export] Ignoring unreadable manifest {path}: {e}")
+        return {}
+
+def save_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+def safe_file_name(name):
+    return re.sub(r'[^\w\-. ]', "_", name).strip() or "action"
+
+# ------------------------------------------------------------------------
+#    计划与分片
+# ------------------------------------------------------------------------
+
+def action_sources(actions, settings_key, store=None):
+    """
+    {动作名: (内容哈希, 帧数)}。store 给出时，库中尚未物化的动作也参与导出，
+    哈希直接取库索引中的内容哈希，无需物化。
+    """
+    sources = {}
+    for action in actions:
+        start, end = action.frame_range
+        sources[action.name] = (action_content_hash(action, settings_key), int(end - start) + 1)
+    if store is not None:
+        resident = {a.get(STORE_KEY) for a in actions}
+        for name, entry in store.index.items():
+            if name in sources or name in resident:
+                continue
+            start, end = entry["frame_range"]
+            digest = hashlib.sha1(f"{settings_key}|store|{entry['hash']}".encode("utf-8")).hexdigest()
+            sources[name] = (digest, int(end - start) + 1)
+    return sources
+
+def plan_exports(sources, output_dir, fmt, single_file=False, force=False):
+    """
+    返回 (jobs, skipped)。
+    jobs: [{"action", "file", "hash", "frames"}]，只包含内容变化或文件缺失的动作。
+    """
+    ext = FORMAT_EXTENSIONS[fmt]
+    manifest = {} if force else load_manifest(output_dir)
+
+    if single_file:
+        file_name = "animations" + ext
+        digest = library_content_hash({name: h for name, (h, _) in sources.items()})
+        entry = manifest.get(ALL_ACTIONS_KEY)
+        if entry and entry["hash"] == digest and os.path.exists(os.path.join(output_dir, entry["file"])):
+            return [], len(sources)
+        frames = sum(f for _, f in sources.values())
+        return [{"action": ALL_ACTIONS_KEY, "file": file_name, "hash": digest, "frames": frames}], 0
+
+    jobs = []
+    skipped = 0
+    for name, (digest, frames) in sources.items():
+        file_name = safe_file_name(name) + ext
+        entry = manifest.get(name)
+        if (entry and entry["hash"] == digest and entry["file"] == file_name
+                and os.path.exists(os.path.join(output_dir, file_name))):
+            skipped += 1
+            continue
+        jobs.append({"action": name, "file": file_name, "hash": digest, "frames": frames})
+    return jobs, skipped
+
+def shard_jobs(jobs, worker_count):
+    """按帧数做最长优先的贪心均衡 (LPT)，返回非空分片列表"""
+    shards = [[] for _ in range(max(1, worker_count))]
+    loads = [0] * len(shards)
+    for job in sorted(jobs, key=lambda j: -j["frames"]):
+        i = loads.index(min(loads))
+        shards[i].append(job)
+        loads[i] += job["frames"]
+    return [s for s in shards if s]
+
+# ------------------------------------------------------------------------
+#    单个导出 (在工作进程中运行)
+# ------------------------------------------------------------------------
+
+def select_export_objects(armature, include_meshes):
+    for obj in bpy.context.view_layer.objects:
+        obj.select_set(False)
+    armature.select_set(True)
+    if include_meshes:
+        for child in armature.children_recursive:
+            if child.type == 'MESH' and child.name in bpy.context.view_layer.objects:
+                child.select_set(True)
+    bpy.context.view_layer.objects.active = armature
+
+def export_fbx(filepath, include_meshes):
+    bpy.ops.export_scene.fbx(
+        filepath=filepath,
+        use_selection=True,
+        object_types={'ARMATURE', 'MESH'} if include_meshes else {'ARMATURE'},
+        add_leaf_bones=False,
+        bake_anim=True,
+        bake_anim_use_all_actions=False,
+        bake_anim_use_nla_strips=False,
+        bake_anim_force_startend_keying=True,
+    )
+
+def export_gltf(filepath, fmt, include_meshes, all_actions):
+    bpy.ops.export_scene.gltf(
+        filepath=filepath,
+        export_format=fmt,
+        use_selection=True,
+        export_skins=include_meshes,
+        export_animations=True,
+        export_animation_mode='ACTIONS' if all_actions else 'ACTIVE_ACTIONS',
+        export_force_sampling=True,
+    )
+
+def export_job(armature, job, output_dir, fmt, include_meshes, store=None):
+    scene = bpy.context.scene
+    filepath = os.path.join(output_dir, job["file"])
+    all_actions = job["action"] == ALL_ACTIONS_KEY
+    if all_actions and store is not None:
+        for name in store.names():
+            store.materialize(name, armature.name)
+    if not all_actions:
+        action = bpy.data.actions.get(job["action"])
+        if action is None and store is not None:
+            # 库中的动作：用到时才物化，导出下一个时按 LRU 淘汰
+            action = store.materialize(job["action"], armature.name)
+        animdata.assign_action(armature, action)
+        start, end = action.frame_range
+        scene.frame_start, scene.frame_end = int(start), int(end)
+    if fmt == "FBX":
+        export_fbx(filepath, include_meshes)
+    else:
+        export_gltf(filepath, fmt, include_meshes, all_actions)
+    return filepath
+
+def run_worker(job_file):
+    """工作进程入口：读取分片，逐个导出，把结果写到 job_file + '.result.json'"""
+    with open(job_file, "r", encoding="utf-8") as f:
+        spec = json.load(f)
+    armature = bpy.data.objects[spec["armature"]]
+    select_export_objects(armature, spec["include_meshes"])
+    store = None
+    if spec.get("store"):
+        # 逐个导出时只常驻当前动作；单文件导出需要全部动作同时存在
+        store = get_store(spec["store"], capacity=1)
+        if spec["jobs"][0]["action"] == ALL_ACTIONS_KEY:
+            store.capacity = len(store)
+    results = []
+    for job in spec["jobs"]:
+        t0 = time.perf_counter()
+        try:
+            export_job(armature, job, spec["output_dir"], spec["format"], spec["include_meshes"], store)
+            results.append({**job, "ok": True, "seconds": round(time.perf_counter() - t0, 3)})
+        except Exception as e:
+            print(f"[export] {job['action']} failed: {e}", flush=True)
+            results.append({**job, "ok": False, "error": str(e)})
+    with open(job_file + ".result.json", "w", encoding="utf-8") as f:
+        json.dump(results, f)
+
+# ------------------------------------------------------------------------
+#    协调进程
+# ------------------------------------------------------------------------
+
+def _log(message):
+    print(f"[export] {message}", flush=True)
+
+def worker_expression(job_file):
+    """工作进程的启动脚本：不依赖插件安装位置，直接从本包所在目录导入"""
+    package_parent = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return (f"import sys; sys.path.insert(0, {package_parent!r}); "
+            f"from mixamo_core import export; export.run_worker({job_file!r})")
+
+def saved_blend_path():
+    """工作进程需要磁盘上的 .blend：文件未保存或有改动时写一份临时副本"""
+    if bpy.data.filepath and not bpy.data.is_dirty:
+        return bpy.data.filepath, False
+    fd, path = tempfile.mkstemp(suffix=".blend", prefix="mixamo_export_")
+    os.close(fd)
+    bpy.ops.wm.save_as_mainfile(filepath=path, copy=True, compress=False)
+    return path, True
+
+def run_export(armature, output_dir, fmt="FBX", single_file=False, include_meshes=True,
+               jobs=0, force=False, store_dir="", log=None):
+    """
+    导出 armature 能用的所有动作。jobs=0 时使用 CPU 核数。
+    store_dir 给出时，外部动作库 (mixamo_core.store) 中的动作也一并导出。
+    返回 {"exported", "skipped", "failed", "workers", "seconds"}。
+    """
+    log = log or _log
+    t0 = time.perf_counter()
+    output_dir = os.path.abspath(bpy.path.abspath(output_dir))
+    os.makedirs(output_dir, exist_ok=True)
+    if single_file and fmt == "FBX":
+        raise ValueError("Single-file export is only supported for glTF")
+
+    actions = [a for a in bpy.data.actions if not a.library and any(True for _ in animdata.iter_fcurves(a))]
+    settings_key = f"{fmt}|{armature.name}|meshes={include_meshes}"
+    store = get_store(store_dir) if store_dir else None
+    with profiling.stage("content hash", len(actions), "actions"):
+        sources = action_sources(actions, settings_key, store)
+        plan, skipped = plan_exports(sources, output_dir, fmt, single_file, force)
+    summary = {"exported": 0, "skipped": skipped, "failed": [], "workers": 0, "seconds": 0.0}
+    if not plan:
+        log(f"Nothing to export ({skipped} unchanged)")
+        summary["seconds"] = round(time.perf_counter() - t0, 3)
+        return summary
+
+    worker_count = 1 if single_file else min(jobs or os.cpu_count() or 1, len(plan))
+    shards = shard_jobs(plan, worker_count)
+    with profiling.stage("save temp blend"):
+        blend_path, temporary = saved_blend_path()
+    log(f"{len(plan)} to export, {skipped} unchanged, {len(shards)} workers")
+
+    work_dir = tempfile.mkdtemp(prefix="mixamo_export_jobs_")
+    processes = []
+    try:
+        for i, shard in enumerate(shards):
+            job_file = os.path.join(work_dir, f"shard_{i:03d}.json")
+            with open(job_file, "w", encoding="utf-8") as f:
+                json.dump({"armature": armature.name, "output_dir": output_dir, "format": fmt,
+                           "include_meshes": include_meshes, "jobs": shard,
+                           "store": store.root if store else ""}, f)
+            cmd = [bpy.app.binary_path, "-b", blend_path, "--factory-startup",
+                   "--python-exit-code", "1", "--python-expr", worker_expression(job_file)]
+            processes.append((job_file, subprocess.Popen(cmd)))
+
+        manifest = {} if force else load_manifest(output_dir)
+        for job_file, process in processes:
+            with profiling.stage("wait workers"):
+                process.wait()
+            result_file = job_file + ".result.json"
+            if not os.path.exists(result_file):
+                with open(job_file, "r", encoding="utf-8") as f:
+                    lost = json.load(f)["jobs"]
+                summary["failed"].extend(j["action"] for j in lost)
+                log(f"Worker exited with code {process.returncode}: {len(lost)} actions lost")
+                continue
+            with open(result_file, "r", encoding="utf-8") as f:
+                for result in json.load(f):
+                    if result["ok"]:
+                        manifest[result["action"]] = {"file": result["file"], "hash": result["hash"]}
+                        summary["exported"] += 1
+                    else:
+                        summary["failed"].append(result["action"])
+        save_manifest(output_dir, manifest)
+    finally:
+        for job_file, process in processes:
+            if process.poll() is None:
+                process.kill()
+        shutil.rmtree(work_dir, ignore_errors=True)
+        if temporary:
+            os.remove(blend_path)
+
+    summary["workers"] = len(shards)
+    summary["seconds"] = round(time.perf_counter() - t0, 3)
+    log(f"exported {summary['exported']}, skipped {skipped}, "
+        f"failed {len(summary['failed'])} in {summary['seconds']:.1f}s")
+    return summary
@@ -0,0 +1,369 @@
+"""
+只读动画的 FBX 快速加载：同一角色的第 2..N 个 Mixamo 动作不再走 bpy.ops.import_scene.fbx
+(会新建对象 / 网格 / 材质并做骨骼朝向修正，随后又被当作副本删掉)，
+而是直接解析 Model / AnimationCurveNode / AnimationCurve，换算到已有骨架的骨骼空间，
+用 foreach_set 写入一个新动作。
+
+FBX 二进制解析使用 Blender 自带的 io_scene_fbx.parse_fbx (只支持二进制 FBX)。
+
+换算：设 G(f) 为 FBX 节点的全局矩阵 (所有帧一次计算，(F, 4, 4))，G_rest 为绑定姿态，
+C 为 FBX 全局坐标 -> Blender 的轴向 / 单位转换，M 为骨架中骨骼的静止矩阵 (matrix_local)：
+
+    D(f) = C @ G(f) @ G_rest⁻¹ @ C⁻¹        骨架空间中相对静止姿态的变化
+    B(f) = M⁻¹ @ D_parent(f)⁻¹ @ D(f) @ M    骨骼 Basis (根骨骼 D_parent = I)
+
+不需要重现导入器的骨骼朝向修正：静止矩阵 M 已经包含了它。
+结果与完整导入 + adjust_hips_location 一致 (位移已是 Blender 单位，不需要再乘 0.01)。
+要求动作与骨架来自同一角色：绑定姿态的骨骼长度 (缩放到同一尺度后) 与骨架静止姿态不一致时抛出 FBXAnimError。
+关键帧时间按文件自身的帧率 (GlobalSettings 的 TimeMode / CustomFrameRate) 换算，与导入器相同。
+各通道的 FBX 曲线在所有通道关键帧时间的并集上线性插值采样；写入的关键帧与导入器一样设为 LINEAR 插值
+(手柄保持默认的 auto-clamped)，所以帧间求值 (重采样、子帧播放) 也与完整导入一致。
+"""
+
+import numpy as np
+
+from . import animdata, quat
+
+FBX_KTIME = 46186158000     # FBX 时间单位 / 秒
+
+ROTATION_ORDERS = ("XYZ", "XZY", "YZX", "YXZ", "ZXY", "ZYX")
+
+CHANNELS = {b"Lcl Translation": "T", b"Lcl Rotation": "R", b"Lcl Scaling": "S"}
+
+# TimeMode -> 帧率 (与 io_scene_fbx 的 FBX_FRAMERATES 相同)；其他值 (14 = 自定义) 用 CustomFrameRate
+FRAME_RATES = {1: 120.0, 2: 100.0, 3: 60.0, 4: 50.0, 5: 48.0, 6: 30.0, 9: 30000.0 / 1001.0, 10: 25.0,
+               11: 24.0, 15: 24000.0 / 1001.0, 16: 96.0, 17: 72.0, 18: 60000.0 / 1001.0}
+DEFAULT_FRAME_RATE = 25.0
+
+# 绑定姿态与骨架静止姿态的骨骼长度允许的相对差 (相对最长骨骼)
+BIND_TOLERANCE = 1e-3
+
+class FBXAnimError(Exception):
+    """快速加载无法处理此文件 (调用方应回退到完整导入)"""
+
+# ------------------------------------------------------------------------
+#    FBX 元素访问
+# ------------------------------------------------------------------------
+
+def child(elem, name):
+    for sub in elem.elems:
+        if sub.id == name:
+            return sub
+    return None
+
+def properties(elem):
+    """Properties70 -> {名字: 值元组}"""
+    props70 = child(elem, b"Properties70")
+    if props70 is None:
+        return {}
+    return {p.props[0]: p.props[4:] for p in props70.elems if p.id == b"P"}
+
+def object_name(elem):
+    """b"mixamorig:Hips\\x00\\x01Model" -> "mixamorig:Hips" """
+    return elem.props[1].split(b"\x00\x01")[0].decode("utf-8", "replace")
+
+def vector(props, name, default):
+    values = props.get(name)
+    return np.array(values[:3] if values else default, dtype=np.float64)
+
+# ------------------------------------------------------------------------
+#    变换矩阵 (向量化)
+# ------------------------------------------------------------------------
+
+def euler_matrices(degrees, order="XYZ"):
+    """(F, 3) 角度 -> (F, 4, 4)；order 与 Blender Euler 相同 (XYZ 即先 X 后 Z)"""
+    radians = np.radians(np.atleast_2d(degrees))
+    cos, sin = np.cos(radians), np.sin(radians)
+    count = len(radians)
+    axes = {}
+    for axis, (i, j) in zip("XYZ", ((1, 2), (2, 0), (0, 1))):
+        m = np.tile(np.eye(4), (count, 1, 1))
+        k = "XYZ".index(axis)
+        m[:, i, i] = cos[:, k]
+        m[:, i, j] = -sin[:, k]
+        m[:, j, i] = sin[:, k]
+        m[:, j, j] = cos[:, k]
+        axes[axis] = m
+    return axes[order[2]] @ axes[order[1]] @ axes[order[0]]
+
+def translation_matrices(vectors):
+    vectors = np.atleast_2d(vectors)
+    m = np.tile(np.eye(4), (len(vectors), 1, 1))
+    m[:, :3, 3] = vectors
+    return m
+
+def scale_matrices(vectors):
+    vectors = np.atleast_2d(vectors)
+    m = np.tile(np.eye(4), (len(vectors), 1, 1))
+    m[:, 0, 0], m[:, 1, 1], m[:, 2, 2] = vectors[:, 0], vectors[:, 1], vectors[:, 2]
+    return m
+
+def local_matrices(props, translation, rotation, scaling):
+    """
+    FBX 局部矩阵 (与 io_scene_fbx 相同的公式)：
+    T @ Roff @ Rp @ Rpre @ R @ Rpost⁻¹ @ Rp⁻¹ @ Soff @ Sp @ S @ Sp⁻¹
+    translation / rotation / scaling 为 (F, 3)。
+    """
+    rotation_active = bool(props.get(b"RotationActive", (0,))[0])
+    order = ROTATION_ORDERS[int(props.get(b"RotationOrder", (0,))[0])] if rotation_active else "XYZ"
+    pre = vector(props, b"PreRotation", (0, 0, 0)) if rotation_active else np.zeros(3)
+    post = vector(props, b"PostRotation", (0, 0, 0)) if rotation_active else np.zeros(3)
+    rot_offset = vector(props, b"RotationOffset", (0, 0, 0))
+    rot_pivot = vector(props, b"RotationPivot", (0, 0, 0))
+    scale_offset = vector(props, b"ScalingOffset", (0, 0, 0))
+    scale_pivot = vector(props, b"ScalingPivot", (0, 0, 0))
+
+    before_rotation = translation_matrices(rot_offset + rot_pivot)[0] @ euler_matrices(pre)[0]
+    after_rotation = (np.linalg.inv(euler_matrices(post)[0]) @ translation_matrices(-rot_pivot)[0]
+                      @ translation_matrices(scale_offset + scale_pivot)[0])
+    return (translation_matrices(translation) @ before_rotation @ euler_matrices(rotation, order)
+            @ after_rotation @ scale_matrices(scaling) @ translation_matrices(-scale_pivot)[0])
+
+def axis_conversion_matrix(settings, scene_unit_factor=100.0):
+    """
+    FBX 全局坐标 -> Blender (Z 向上，正面朝 -Y) 的 4x4 矩阵，含单位缩放。
+    scene_unit_factor 与导入器相同：单位制为 NONE 时 1，否则 100 * scale_length。
+    """
+    def axis(name, default):
+        return int(settings.get(name, (default,))[0])
+
+    conversion = np.zeros((3, 3))
+    for index, sign, target in ((axis(b"UpAxis", 1), axis(b"UpAxisSign", 1), (0.0, 0.0, 1.0)),
+                                (axis(b"FrontAxis", 2), axis(b"FrontAxisSign", 1), (0.0, -1.0, 0.0)),
+                                (axis(b"CoordAxis", 0), axis(b"CoordAxisSign", 1), (1.0, 0.0, 0.0))):
+        conversion[:, index] = sign * np.array(target)
+    if abs(abs(np.linalg.det(conversion)) - 1.0) > 1e-6:
+        raise FBXAnimError("Unsupported FBX axis settings")
+    unit = float(settings.get(b"UnitScaleFactor", (1.0,))[0]) / scene_unit_factor
+    matrix = np.eye(4)
+    matrix[:3, :3] = conversion * unit
+    return matrix
+
+# ------------------------------------------------------------------------
+#    解析
+# ------------------------------------------------------------------------
+
+class Clip:
+    """一个 FBX 文件中的动画：节点层级、各节点局部属性与曲线 (已按统一时间采样)"""
+
+    def __init__(self):
+        self.names = {}         # uid -> 名字
+        self.props = {}         # uid -> Properties70
+        self.parents = {}       # uid -> 父节点 uid
+        self.bind = {}          # uid -> (4, 4) 绑定姿态全局矩阵
+        self.channels = {}      # uid -> {"T" / "R" / "S": (F, 3)}
+        self.seconds = np.zeros(0)
+        self.settings = {}
+
+    @property
+    def fps(self):
+        """文件自身的帧率 (导入器据此设置场景帧率并换算关键帧时间)"""
+        custom = float(self.settings.get(b"CustomFrameRate", (DEFAULT_FRAME_RATE,))[0])
+        rate = FRAME_RATES.get(int(self.settings.get(b"TimeMode", (0,))[0]), custom)
+        return rate if rate > 0.0 else DEFAULT_FRAME_RATE
+
+def parse_clip(path):
+    try:
+        from io_scene_fbx import parse_fbx
+    except ImportError as e:
+        raise FBXAnimError("io_scene_fbx is not available") from e
+    try:
+        root, _version = parse_fbx.parse(path)
+    except Exception as e:
+        # ASCII FBX 或损坏的文件
+        raise FBXAnimError(f"Cannot parse {path}: {e}") from e
+
+    clip = Clip()
+    settings = child(root, b"GlobalSettings")
+    clip.settings = properties(settings) if settings is not None else {}
+    objects = child(root, b"Objects")
+    connections = child(root, b"Connections")
+    if objects is None or connections is None:
+        raise FBXAnimError("Missing Objects / Connections")
+
+    node_defaults = {}
+    curves = {}
+    for elem in objects.elems:
+        uid = elem.props[0]
+        if elem.id == b"Model":
+            clip.names[uid] = object_name(elem)
+            clip.props[uid] = properties(elem)
+        elif elem.id == b"AnimationCurveNode":
+            node_defaults[uid] = properties(elem)
+        elif elem.id == b"AnimationCurve":
+            times, values = child(elem, b"KeyTime"), child(elem, b"KeyValueFloat")
+            if times is not None and values is not None:
+                curves[uid] = (np.asarray(times.props[0], dtype=np.int64),
+                               np.asarray(values.props[0], dtype=np.float64))
+        elif elem.id == b"Pose" and len(elem.props) > 2 and elem.props[2] == b"BindPose":
+            for pose_node in elem.elems:
+                if pose_node.id == b"PoseNode":
+                    node, matrix = child(pose_node, b"Node"), child(pose_node, b"Matrix")
+                    # FBX 矩阵按列存放
+                    clip.bind[node.props[0]] = np.array(matrix.props[0], dtype=np.float64).reshape(4, 4).T
+
+    node_target = {}        # 曲线节点 uid -> (模型 uid, "T" / "R" / "S")
+    curve_target = {}       # 曲线 uid -> (曲线节点 uid, 轴)
+    for c in connections.elems:
+        if c.id != b"C":
+            continue
+        kind, src, dst = c.props[0], c.props[1], c.props[2]
+        if kind == b"OO" and src in clip.names and dst in clip.names:
+            clip.parents[src] = dst
+        elif kind == b"OP" and src in node_defaults and dst in clip.names and c.props[3] in CHANNELS:
+            node_target[src] = (dst, CHANNELS[c.props[3]])
+        elif kind == b"OP" and src in curves and c.props[3] in (b"d|X", b"d|Y", b"d|Z"):
+            curve_target[src] = (dst, "XYZ".index(c.props[3][-1:].decode()))
+    if not curve_target:
+        raise FBXAnimError("No animation curves")
+
+    ticks = np.unique(np.concatenate([curves[uid][0] for uid in curve_target]))
+    clip.seconds = ticks / FBX_KTIME
+    sampled = {}
+    for uid, (node, axis) in curve_target.items():
+        times, values = curves[uid]
+        sampled.setdefault(node, {})[axis] = np.interp(ticks, times, values)
+
+    for node, (model, channel) in node_target.items():
+        axes = sampled.get(node)
+        if not axes:
+            continue
+        defaults = node_defaults[node]
+        columns = []
+        for axis, label in enumerate((b"d|X", b"d|Y", b"d|Z")):
+            if axis in axes:
+                columns.append(axes[axis])
+            else:
+                columns.append(np.full(len(ticks), float(defaults.get(label, (0.0,))[0])))
+        clip.channels.setdefault(model, {})[channel] = np.stack(columns, axis=1)
+    return clip
+
+# ------------------------------------------------------------------------
+#    换算到骨骼空间
+# ------------------------------------------------------------------------
+
+def global_matrices(clip, uids, animated=True):
+    """{uid: (F, 4, 4) 或 (1, 4, 4)} 全局矩阵；animated=False 时只用节点默认属性 (静止)"""
+    count = len(clip.seconds)
+    result = {}
+
+    def compute(uid):
+        if uid in result:
+            return result[uid]
+        props = clip.props[uid]
+        channels = clip.channels.get(uid, {}) if animated else {}
+        frames = count if channels else 1
+        values = []
+        for channel, name, default in (("T", b"Lcl Translation", (0, 0, 0)),
+                                       ("R", b"Lcl Rotation", (0, 0, 0)),
+                                       ("S", b"Lcl Scaling", (1, 1, 1))):
+            values.append(channels[channel] if channel in channels
+                          else np.tile(vector(props, name, default), (frames, 1)))
+        local = local_matrices(props, *values)
+        parent = clip.parents.get(uid)
+        result[uid] = compute(parent) @ local if parent in clip.props else local
+        return result[uid]
+
+    for uid in uids:
+        compute(uid)
+    return result
+
+def check_bind_pose(clip, rest, mapped, still, conversion):
+    """
+    绑定姿态是否与骨架静止姿态来自同一角色：比较父子骨骼头部间距 (FBX 一侧按最小二乘缩放到骨架尺度，
+    与轴向 / 单位无关)，相对最长骨骼的差超过 BIND_TOLERANCE 时抛出 FBXAnimError。
+    """
+    names = [name for name in mapped if rest[name].parent in mapped]
+    if not names:
+        return
+
+    def head(name):
+        bind = clip.bind.get(mapped[name], still[mapped[name]][0])
+        return (conversion @ bind)[:3, 3]
+
+    fbx = np.array([np.linalg.norm(head(name) - head(rest[name].parent)) for name in names])
+    armature = np.array([np.linalg.norm(rest[name].matrix[:3, 3] - rest[rest[name].parent].matrix[:3, 3])
+                         for name in names])
+    longest = armature.max()
+    if longest <= 0.0 or not fbx.any():
+        return
+    scale = np.dot(fbx, armature) / np.dot(fbx, fbx)
+    error = np.abs(fbx * scale - armature).max() / longest
+    if error > BIND_TOLERANCE:
+        raise FBXAnimError(f"Bind pose does not match the armature (bone length error {error:.2%})")
+
+def bone_channels(clip, rest, prefix="mixamorig:", scene_unit_factor=100.0):
+    """
+    rest: {骨骼名: retarget.RestBone} (目标骨架)。
+    返回 {骨骼名: (location (F, 3), quaternion (F, 4), scale (F, 3))}，只包含 FBX 中有曲线的骨骼。
+    """
+    by_name = {name.replace(prefix, "") if prefix else name: uid for uid, name in clip.names.items()}
+    mapped = {name: uid for name, uid in by_name.items() if name in rest}
+    animated = [name for name, uid in mapped.items() if uid in clip.channels]
+    if not animated:
+        raise FBXAnimError("No animated bones match the armature")
+
+    conversion = axis_conversion_matrix(clip.settings, scene_unit_factor)
+    conversion_inv = np.linalg.inv(conversion)
+    posed = global_matrices(clip, mapped.values())
+    still = global_matrices(clip, mapped.values(), animated=False)
+    check_bind_pose(clip, rest, mapped, still, conversion)
+
+    deltas = {}
+
+    def delta(name):
+        """D(f) = C @ G(f) @ G_rest⁻¹ @ C⁻¹"""
+        if name not in deltas:
+            uid = mapped[name]
+            bind = clip.bind.get(uid, still[uid][0])
+            deltas[name] = conversion @ posed[uid] @ np.linalg.inv(bind) @ conversion_inv
+        return deltas[name]
+
+    result = {}
+    for name in animated:
+        matrix = rest[name].matrix
+        parent = rest[name].parent
+        relative = delta(name)
+        if parent in mapped:
+            relative = np.linalg.inv(delta(parent)) @ relative
+        basis = np.linalg.inv(matrix) @ relative @ matrix
+        basis = np.broadcast_to(basis, (len(clip.seconds), 4, 4))
+        scale = np.linalg.norm(basis[:, :3, :3], axis=1)
+        rotation = quat.make_continuous(quat.from_matrix(basis[:, :3, :3] / scale[:, None, :]))
+        result[name] = (basis[:, :3, 3].copy(), rotation, scale)
+    return result
+
+# ------------------------------------------------------------------------
+#    bpy 入口
+# ------------------------------------------------------------------------
+
+def scene_unit_factor(scene):
+    """与 io_scene_fbx 的 units_blender_to_fbx_factor 相同"""
+    units = scene.unit_settings
+    return 1.0 if units.system == 'NONE' else 100.0 * units.scale_length
+
+def load_action(path, armature, prefix="mixamorig:", name=None, frame_offset=0.0):
+    """
+    把 FBX 的动画读成 armature 的新动作 (不创建任何对象)，返回 (动作, 文件帧率)。
+    无法处理 (含绑定姿态与 armature 不一致) 时抛出 FBXAnimError，调用方回退到 bpy.ops.import_scene.fbx。
+    """
+    import os
+    import bpy
+    from .retarget import rest_from_armature
+
+    clip = parse_clip(path)
+    channels = bone_channels(clip, rest_from_armature(armature.data), prefix,
+                             scene_unit_factor(bpy.context.scene))
+    fps = clip.fps
+    frames = clip.seconds * fps + frame_offset
+
+    action = bpy.data.actions.new(name or os.path.splitext(os.path.basename(path))[0])
+    curves = animdata.FCurveIndex(action, armature)
+    for bone_name, (location, rotation, scale) in channels.items():
+        for values, prop, count in ((location, "location", 3), (rotation, "rotation_quaternion", 4),
+                                    (scale, "scale", 3)):
+            for i, fc in enumerate(curves.ensure_bone(bone_name, prop, count, bone_name)):
+                # 新曲线的关键帧默认是 Bezier；导入器写入的是 LINEAR
+                animdata.write_curve(fc, frames, values[:, i], update=False)
+                animdata.set_interpolation(fc, 'LINEAR')
+    return action, fps
@@ -0,0 +1,126 @@
+"""
+导入账本：记录每次导入新建了哪些 ID，逐文件修正与最终清理只处理这些 ID，
+不再在每个文件前后对 bpy.data.objects 做整集快照 (批量导入时为 O(文件数 × 对象数))。
+
+    ledger = ImportLedger()
+    with ledger.record(fbx_path):
+        bpy.ops.import_scene.fbx(...)
+    ledger.objects(fbx_path)
+
+新对象：导入时把一个空的暂存集合设为活动集合，导入器把新对象链接进去，
+结束后它们就是暂存集合中的对象，再移回原来的活动集合 (开销只与新对象数量有关)。
+
+水位线：session_uid 在一次会话中单调递增。导入前新建并删除一个临时 Text 得到当前水位 (O(1))，
+从新对象出发收集的数据块 (网格 / 骨架 / 材质 / 图像 / 动作) 只有 session_uid 高于水位线的才记账，
+导入器复用的已有数据块 (例如同名图像) 不会被误删。
+"""
+
+from contextlib import contextmanager
+
+import bpy
+
+STAGING_NAME = "__mixamo_import_staging__"
+
+KINDS = ("objects", "meshes", "armatures", "materials", "images", "actions")
+
+def watermark():
+    """当前 session_uid 水位：之后新建的 ID 都大于它"""
+    probe = bpy.data.texts.new(STAGING_NAME)
+    uid = probe.session_uid
+    bpy.data.texts.remove(probe)
+    return uid
+
+def find_layer_collection(layer_collection, collection):
+    if layer_collection.collection == collection:
+        return layer_collection
+    for child in layer_collection.children:
+        found = find_layer_collection(child, collection)
+        if found is not None:
+            return found
+    return None
+
+def material_images(material):
+    if not material or not material.node_tree:
+        return
+    for node in material.node_tree.nodes:
+        if node.type in {'TEX_IMAGE', 'TEX_ENVIRONMENT'} and node.image:
+            yield node.image
+
+class ImportLedger:
+    """{导入键 (文件路径): {kind: [ID]}}"""
+
+    def __init__(self):
+        self.entries = {}
+
+    @contextmanager
+    def record(self, key, context=None):
+        context = context or bpy.context
+        view_layer = context.view_layer
+        previous = view_layer.active_layer_collection
+        staging = bpy.data.collections.new(STAGING_NAME)
+        context.scene.collection.children.link(staging)
+        view_layer.active_layer_collection = find_layer_collection(view_layer.layer_collection, staging)
+        mark = watermark()
+        entry = self.entries[key] = {kind: [] for kind in KINDS}
+        try:
+            yield entry
+        finally:
+            view_layer.active_layer_collection = previous
+            target = previous.collection
+            new_objects = list(staging.objects)
+            for obj in new_objects:
+                target.objects.link(obj)
+                staging.objects.unlink(obj)
+            bpy.data.collections.remove(staging)
+            self.collect(entry, new_objects, mark)
+
+    def collect(self, entry, new_objects, mark):
+        seen = set()
+
+        def add(kind, id_data):
+            if id_data is not None and id_data.session_uid > mark and id_data.session_uid not in seen:
+                seen.add(id_data.session_uid)
+                entry[kind].append(id_data)
+
+        for obj in new_objects:
+            add("objects", obj)
+            if obj.type == 'MESH':
+                add("meshes", obj.data)
+                for material in obj.data.materials:
+                    add("materials", material)
+                    for image in material_images(material):
+                        add("images", image)
+            elif obj.type == 'ARMATURE':
+                add("armatures", obj.data)
+            if obj.animation_data:
+                add("actions", obj.animation_data.action)
+
+    def ids(self, kind, key=None):
+        """某一类 ID (已被删除的跳过)；key 为 None 时返回所有导入的"""
+        entries = [self.entries[key]] if key is not None else self.entries.values()
+        result = []
+        for entry in entries:
+            for id_data in entry[kind]:
+                try:
+                    id_data.name
+                except ReferenceError:
+                    continue
+                result.append(id_data)
+        return result
+
+    def objects(self, key=None):
+        return self.ids("objects", key)
+
+    def remove_objects(self, objects):
+        """删除对象，并删除账本中因此不再有用户的网格 / 骨架 / 材质 / 图像 (动作保留)"""
+        if not objects:
+            return 0
+        bpy.data.batch_remove(ids=objects)
+        removed = len(objects)
+        # 网格删除后材质的用户数才减少，材质之后才是图像，按层依次清理
+        for kinds in (("meshes", "armatures"), ("materials",), ("images",)):
+            orphans = [id_data for kind in kinds for id_data in self.ids(kind) if id_data.users == 0]
+            if orphans:
+                bpy.data.batch_remove(ids=orphans)
+                removed += len(orphans)
+        return removed
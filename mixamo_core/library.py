@@ -0,0 +1,178 @@
+"""
+动作库分片：把动作写入独立的库 .blend (每个动作一个，或每个来源文件夹一个)，
+工作文件只通过 bpy.data.libraries.load(link=True) 按需链接，
+打开 / 保存工作文件的耗时不再随动作库增长。
+
+    <dir>/library_index.json    {"actions": {name: {"file", "hash"}}}
+    <dir>/<shard>.blend         该分片的动作 (fake user)
+
+内容哈希未变的分片不会重写。链接进来的动作是只读的：
+Root Motion 等修改动作的步骤要在分片之前完成。
+"""
+
+import os
+import re
+import json
+
+import bpy
+
+from .export import action_content_hash
+
+INDEX_NAME = "library_index.json"
+
+SHARD_MODES = {"ACTION", "FOLDER"}
+
+def shard_key(action, mode):
+    """ACTION: 动作名；FOLDER: 导入时记录的 FBX 所在文件夹名 (没有则为 misc)"""
+    if mode == "ACTION":
+        return action.name
+    source = action.get("mixamo_source", "")
+    return os.path.basename(os.path.dirname(source)) or "misc"
+
+def shard_file(key):
+    return re.sub(r'[^\w\-. ]', "_", key).strip() + ".blend"
+
+def load_index(library_dir):
+    path = os.path.join(library_dir, INDEX_NAME)
+    if not os.path.exists(path):
+        return {"actions": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_index(library_dir, index):
+    path = os.path.join(library_dir, INDEX_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+def library_for_path(path):
+    path = os.path.normcase(os.path.abspath(path))
+    for lib in bpy.data.libraries:
+        if os.path.normcase(os.path.abspath(bpy.path.abspath(lib.filepath))) == path:
+            return lib
+    return None
+
+# ------------------------------------------------------------------------
+#    写入分片
+# ------------------------------------------------------------------------
+
+def write_shard(path, actions, keep_names=()):
+    """
+    写一个分片文件。keep_names 是索引中属于此分片、但当前不在本地的动作，
+    先从旧文件追加进来一起写回，避免被覆盖掉。
+    """
+    appended = []
+    if keep_names and os.path.exists(path):
+        with bpy.data.libraries.load(path, link=False) as (data_from, data_to):
+            data_to.actions = [n for n in data_from.actions if n in keep_names]
+        appended = [a for a in data_to.actions if a is not None]
+    try:
+        bpy.data.libraries.write(path, set(actions) | set(appended),
+                                 path_remap='RELATIVE_ALL', fake_user=True, compress=True)
+    finally:
+        if appended:
+            bpy.data.batch_remove(ids=appended)
+    lib = library_for_path(path)
+    if lib is not None:
+        lib.reload()
+
+def shard_actions(actions, library_dir, mode="FOLDER", replace=True, force=False):
+    """
+    把本地动作写入分片。replace=True 时本地动作随后被链接版本替换 (user_remap) 并删除。
+    返回 {"shards_written", "shards_skipped", "actions", "replaced"}。
+    """
+    if mode not in SHARD_MODES:
+        raise ValueError(f"Invalid shard mode: {mode}")
+    library_dir = os.path.abspath(bpy.path.abspath(library_dir))
+    os.makedirs(library_dir, exist_ok=True)
+    index = load_index(library_dir)
+    entries = index["actions"]
+
+    groups = {}
+    for action in actions:
+        if action.library:
+            continue
+        groups.setdefault(shard_file(shard_key(action, mode)), []).append(action)
+
+    written = skipped = 0
+    for file_name, members in groups.items():
+        path = os.path.join(library_dir, file_name)
+        hashes = {a.name: action_content_hash(a) for a in members}
+        unchanged = all(entries.get(n, {}).get("file") == file_name and entries[n]["hash"] == h
+                        for n, h in hashes.items())
+        if unchanged and os.path.exists(path) and not force:
+            skipped += 1
+            continue
+        local = set(hashes)
+        keep = {n for n, e in entries.items() if e["file"] == file_name and n not in local}
+        write_shard(path, members, keep)
+        for name, digest in hashes.items():
+            entries[name] = {"file": file_name, "hash": digest}
+        written += 1
+    save_index(library_dir, index)
+
+    replaced = 0
+    if replace:
+        for members in groups.values():
+            for action in members:
+                replace_with_linked(action, library_dir, entries[action.name]["file"])
+                replaced += 1
+    return {"shards_written": written, "shards_skipped": skipped,
+            "actions": sum(len(m) for m in groups.values()), "replaced": replaced}
+
+def replace_with_linked(action, library_dir, file_name):
+    """本地动作 -> 链接动作：所有使用者重映射后删除本地副本"""
+    name = action.name
+    linked = link_action(library_dir, name, file_name)
+    if linked is None:
+        return None
+    action.user_remap(linked)
+    bpy.data.actions.remove(action)
+    return linked
+
+# ------------------------------------------------------------------------
+#    按需链接
+# ------------------------------------------------------------------------
+
+def linked_action(path, name):
+    lib = library_for_path(path)
+    if lib is None:
+        return None
+    for action in bpy.data.actions:
+        if action.library == lib and action.name == name:
+            return action
+    return None
+
+def link_action(library_dir, name, file_name=None):
+    """链接库中的动作 (已链接则直接返回)"""
+    library_dir = os.path.abspath(bpy.path.abspath(library_dir))
+    if file_name is None:
+        entry = load_index(library_dir)["actions"].get(name)
+        if entry is None:
+            return None
+        file_name = entry["file"]
+    path = os.path.join(library_dir, file_name)
+    action = linked_action(path, name)
+    if action is not None:
+        return action
+    with bpy.data.libraries.load(path, link=True, relative=bool(bpy.data.filepath)) as (data_from, data_to):
+        data_to.actions = [name] if name in data_from.actions else []
+    return data_to.actions[0] if data_to.actions else None
+
+def unlink_unused(library_dir):
+    """删除没有用户的链接动作，以及因此变空的库"""
+    library_dir = os.path.normcase(os.path.abspath(bpy.path.abspath(library_dir)))
+    libs = [lib for lib in bpy.data.libraries
+            if os.path.normcase(os.path.dirname(os.path.abspath(bpy.path.abspath(lib.filepath)))) == library_dir]
+    unused = [a for a in bpy.data.actions if a.library in libs and a.users == 0]
+    if unused:
+        bpy.data.batch_remove(ids=unused)
+    empty = [lib for lib in libs if not any(a.library == lib for a in bpy.data.actions)]
+    for lib in empty:
+        bpy.data.libraries.remove(lib)
+    return len(unused)
+
+def index_names(library_dir):
+    library_dir = os.path.abspath(bpy.path.abspath(library_dir))
+    return sorted(load_index(library_dir)["actions"])
@@ -0,0 +1,135 @@
+"""
+自动判断动作的 Root Motion 设置 (transfer_mode / transfer_rotation)：位移动作还是原地动作。
+
+每个动作的 Hips 位置 / 旋转曲线整条读出，按时间均匀重采样为固定的 S 个样本，
+整个动作库堆成 (A, S, 3) / (A, S, 4) 数组后一次性计算统计量：
+
+    travel  首尾水平位移 / Hips 高度
+    speed   水平路径长度 / 时长 / Hips 高度       (原地转圈的走路 travel 很小，但 speed 高)
+    rise    首尾垂直位移 / Hips 高度             (爬升 / 跌落需要 XYZ)
+    yaw     首尾朝向变化 (Hips 局部 Y 轴，与 Root Motion 的旋转拆分一致)
+
+各统计量除以阈值得到 score，score >= 1 即判定成立；
+置信度 = 0.5 + 0.5 * tanh(k * |ln score|)，越接近阈值越接近 0.5。
+
+已经做过 Root Motion 的动作会把 Root 曲线叠加回来 (Hips 是 Root 的子骨骼)，重新分类结果不变。
+"""
+
+import numpy as np
+
+from . import animdata, quat
+from .resample import FPS_KEY
+
+SAMPLES = 64
+
+THRESHOLDS = {
+    "travel": 0.5,              # Hips 高度的倍数
+    "speed": 0.5,               # Hips 高度 / 秒
+    "rise": 0.3,                # Hips 高度的倍数
+    "yaw": np.radians(45.0),
+}
+
+SHARPNESS = 2.0
+
+# ------------------------------------------------------------------------
+#    采样
+# ------------------------------------------------------------------------
+
+def sample_channels(curves, bone_name, prop, count, times, default):
+    """(S, count)；没有曲线的分量取 default"""
+    values = np.tile(np.asarray(default, dtype=np.float64), (len(times), 1))
+    found = False
+    for i, fc in enumerate(curves.bone(bone_name, prop, count)):
+        if fc is None:
+            continue
+        co = animdata.read_curve(fc)
+        if len(co):
+            values[:, i] = np.interp(times, co[:, 0], co[:, 1])
+            found = True
+    return values, found
+
+def hips_samples(action, obj=None, hips="Hips", root="Root", samples=SAMPLES):
+    """
+    (location (S, 3), rotation (S, 4))，Hips 与 Root 叠加后的结果；
+    动作没有 Hips 曲线时返回 None。
+    """
+    curves = animdata.FCurveIndex(action, obj)
+    start, end = action.frame_range
+    times = np.linspace(start, end, samples)
+    loc, has_loc = sample_channels(curves, hips, "location", 3, times, (0.0, 0.0, 0.0))
+    rot, has_rot = sample_channels(curves, hips, "rotation_quaternion", 4, times, (1.0, 0.0, 0.0, 0.0))
+    if not (has_loc or has_rot):
+        return None
+    root_loc, has_root_loc = sample_channels(curves, root, "location", 3, times, (0.0, 0.0, 0.0))
+    root_rot, has_root_rot = sample_channels(curves, root, "rotation_quaternion", 4, times, (1.0, 0.0, 0.0, 0.0))
+    if has_root_loc:
+        loc = loc + root_loc
+    if has_root_rot:
+        rot = quat.multiply(quat.normalize(root_rot), quat.normalize(rot))
+    return loc, quat.normalize(rot)
+
+# ------------------------------------------------------------------------
+#    统计与分类 (整个动作库一次计算)
+# ------------------------------------------------------------------------
+
+def features(locations, rotations, durations, heights):
+    """
+    locations (A, S, 3)，rotations (A, S, 4)，durations / heights (A,)。
+    返回 {名称: (A,) 数组}。
+    """
+    horizontal = locations[:, :, [0, 2]]
+    path = np.linalg.norm(np.diff(horizontal, axis=1), axis=2).sum(axis=1)
+    travel = np.linalg.norm(horizontal[:, -1] - horizontal[:, 0], axis=1)
+    rise = locations[:, -1, 1] - locations[:, 0, 1]
+
+    # 与 transfer_y_rotation_legacy_logic 相同：只保留 W / Y 分量作为朝向。
+    # q / -q 的符号跳变使角度相差 2π，由 unwrap 消除
+    yaw = np.unwrap(2.0 * np.arctan2(rotations[:, :, 2], rotations[:, :, 0]), axis=1)
+
+    return {
+        "travel": travel / heights,
+        "speed": path / np.maximum(durations, 1e-6) / heights,
+        "rise": rise / heights,
+        "yaw": yaw[:, -1] - yaw[:, 0],
+    }
+
+def confidence(score):
+    return 0.5 + 0.5 * np.tanh(SHARPNESS * np.abs(np.log(np.maximum(score, 1e-6))))
+
+def classify(stats, thresholds=None):
+    """返回 (modes (A,) 字符串数组, rotation (A,) bool, confidence (A,))"""
+    t = dict(THRESHOLDS, **(thresholds or {}))
+    moving = np.maximum(stats["travel"] / t["travel"], stats["speed"] / t["speed"])
+    rising = np.abs(stats["rise"]) / t["rise"]
+    turning = np.abs(stats["yaw"]) / t["yaw"]
+
+    modes = np.where(rising >= 1.0, "XYZ", np.where(moving >= 1.0, "XZ", "NONE"))
+    mode_confidence = np.where(rising >= 1.0, confidence(rising),
+                               np.minimum(confidence(moving), confidence(rising)))
+    return modes, turning >= 1.0, np.minimum(mode_confidence, confidence(turning))
+
+def classify_actions(actions, obj=None, height=1.0, fps=30.0, samples=SAMPLES, thresholds=None):
+    """
+    分类一批动作 (不修改它们)。height 是 Hips 的静止高度 (与 Hips 位置曲线同单位)；
+    动作记录了 "mixamo_fps" 时用它换算时长，否则用 fps。
+    返回 [(action, mode, rotation, confidence, {统计量})]，没有 Hips 曲线的动作不在其中。
+    """
+    sampled = []
+    for action in actions:
+        result = hips_samples(action, obj, samples=samples)
+        if result is not None:
+            sampled.append((action, result))
+    if not sampled:
+        return []
+
+    locations = np.stack([loc for _a, (loc, _rot) in sampled])
+    rotations = np.stack([rot for _a, (_loc, rot) in sampled])
+    durations = np.array([(a.frame_range[1] - a.frame_range[0]) / float(a.get(FPS_KEY, fps))
+                          for a, _r in sampled])
+    heights = np.full(len(sampled), max(float(height), 1e-6))
+
+    stats = features(locations, rotations, durations, heights)
+    modes, rotation, scores = classify(stats, thresholds)
+    return [(action, str(modes[i]), bool(rotation[i]), float(scores[i]),
+             {key: float(value[i]) for key, value in stats.items()})
+            for i, (action, _r) in enumerate(sampled)]
@@ -0,0 +1,107 @@
+"""
+后台预读：主线程处理当前 FBX 时，线程池先把接下来的 K 个文件读一遍 (进入操作系统页缓存)，
+同时计算内容哈希并检查文件头。网络盘 (NFS) 上的读取等待与主线程的解析 / 修正重叠。
+
+    with prefetch.Prefetcher(paths, depth=4) as files:
+        for item in files:          # 按 paths 的顺序
+            if item.error: ...
+            bpy.ops.import_scene.fbx(filepath=item.path)
+
+同一时刻最多有 depth 个文件在预读 (有界窗口)，内容按块读取后丢弃，不在内存中保留：
+FBX 导入器与 parse_fbx 都只接受文件路径，页缓存命中就足够了。
+后台线程只做两件事：页缓存预热 (按块读完整个文件) 与 SHA-1 (hashlib)。
+读文件与对整块数据做 SHA-1 时都会释放 GIL，线程只在每个块的循环本身上短暂持有 GIL，
+所以几乎不占用主线程的 Python 执行时间。
+"""
+
+import os
+import time
+import hashlib
+from collections import deque
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+
+CHUNK_SIZE = 1 << 20
+
+FBX_BINARY_MAGIC = b"Kaydara FBX Binary  \x00"
+
+@dataclass
+class PrefetchedFile:
+    path: str
+    size: int = 0
+    sha1: str = ""
+    binary: bool = False
+    seconds: float = 0.0        # 后台读取耗时
+    error: str = ""
+
+def read_file(path):
+    """读取整个文件 (填充页缓存)，返回 PrefetchedFile"""
+    item = PrefetchedFile(path)
+    t0 = time.perf_counter()
+    digest = hashlib.sha1()
+    try:
+        with open(path, "rb") as f:
+            head = f.read(len(FBX_BINARY_MAGIC))
+            digest.update(head)
+            item.binary = head == FBX_BINARY_MAGIC
+            item.size = len(head)
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                item.size += len(chunk)
+    except OSError as e:
+        item.error = str(e)
+    else:
+        if item.size == 0:
+            item.error = "empty file"
+        elif not item.binary and not head.lstrip().startswith(b";"):
+            # ASCII FBX 以 "; FBX" 注释开头；两者都不是则不是 FBX
+            item.error = "not an FBX file"
+    item.sha1 = digest.hexdigest()
+    item.seconds = time.perf_counter() - t0
+    return item
+
+class Prefetcher:
+    """按顺序产出 PrefetchedFile；depth = 0 时不预读 (只有路径，不计算哈希也不检查)"""
+
+    def __init__(self, paths, depth=4, workers=None):
+        self.paths = list(paths)
+        self.depth = max(0, depth)
+        self.workers = workers or min(self.depth, 4, os.cpu_count() or 1)
+        self.executor = None
+        self.waited = 0.0       # 主线程等待预读的总时间
+
+    def __enter__(self):
+        if self.depth and self.workers:
+            self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="mixamo_prefetch")
+        return self
+
+    def __exit__(self, *exc):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+        return False
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __iter__(self):
+        if self.executor is None:
+            for path in self.paths:
+                yield PrefetchedFile(path)
+            return
+
+        pending = deque()
+        remaining = iter(self.paths)
+        for path in remaining:
+            pending.append(self.executor.submit(read_file, path))
+            if len(pending) >= self.depth:
+                break
+        while pending:
+            t0 = time.perf_counter()
+            item = pending.popleft().result()
+            self.waited += time.perf_counter() - t0
+            # 取走一个就补一个，窗口大小保持 depth
+            path = next(remaining, None)
+            if path is not None:
+                pending.append(self.executor.submit(read_file, path))
+            yield item
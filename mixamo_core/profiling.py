@@ -0,0 +1,222 @@
+"""
+各插件共享的可选性能分析：
+
+    from mixamo_core import profiling
+
+    with profiling.run("Import Mixamo FBX"):
+        with profiling.stage("fbx import", 1, "files"):
+            ...
+        with profiling.stage("keyframe inserts") as st:
+            ...
+            st.add(count, "keys")
+
+关闭时 run()/stage() 直接返回同一个空对象，开销只有一次函数调用。
+开启后每次 run 结束在控制台打印汇总表 (并保存供面板显示)，
+可选用 cProfile 为每次运行写一个 .pstats 文件。
+"""
+
+import os
+import time
+import cProfile
+import tempfile
+
+import bpy
+
+class _State:
+    enabled = os.environ.get("MIXAMO_PROFILE", "") not in ("", "0")
+    cprofile = False
+    pstats_dir = os.environ.get("MIXAMO_PROFILE_DIR", "")
+    runs = []           # 当前正在进行的 run 栈
+    last_results = {}   # run 名称 -> 汇总行，供面板显示
+
+def is_enabled():
+    return _State.enabled
+
+def enable(enabled=True, cprofile=False, pstats_dir=""):
+    """脚本 / 命令行入口直接开关 (面板通过 WindowManager 属性开关)"""
+    _State.enabled = enabled
+    _State.cprofile = cprofile
+    _State.pstats_dir = pstats_dir
+
+class _NullStage:
+    """关闭时返回的空对象"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add(self, count, unit=""):
+        pass
+
+_NULL = _NullStage()
+
+class _StageRecord:
+    __slots__ = ("seconds", "calls", "counts")
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.calls = 0
+        self.counts = {}
+
+class _Stage:
+    __slots__ = ("record", "t0")
+
+    def __init__(self, record, count, unit):
+        self.record = record
+        if count:
+            self.add(count, unit)
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.record.seconds += time.perf_counter() - self.t0
+        self.record.calls += 1
+        return False
+
+    def add(self, count, unit=""):
+        counts = self.record.counts
+        counts[unit] = counts.get(unit, 0) + count
+
+class _Run:
+    def __init__(self, name):
+        self.name = name
+        self.stages = {}
+        self.profile = None
+
+    def __enter__(self):
+        _State.runs.append(self)
+        # cProfile 同一时刻只能开一个：只给最外层 run
+        if _State.cprofile and len(_State.runs) == 1:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        total = time.perf_counter() - self.t0
+        if self.profile:
+            self.profile.disable()
+            self.dump_pstats()
+        _State.runs.pop()
+        rows = summarize(self.stages, total)
+        _State.last_results[self.name] = rows
+        print_summary(self.name, rows)
+        return False
+
+    def stage(self, name, count, unit):
+        record = self.stages.get(name)
+        if record is None:
+            record = self.stages[name] = _StageRecord()
+        return _Stage(record, count, unit)
+
+    def dump_pstats(self):
+        folder = bpy.path.abspath(_State.pstats_dir) if _State.pstats_dir else tempfile.gettempdir()
+        os.makedirs(folder, exist_ok=True)
+        safe = "".join(c if c.isalnum() else "_" for c in self.name)
+        path = os.path.join(folder, f"{safe}_{time.strftime('%Y%m%d_%H%M%S')}.pstats")
+        self.profile.dump_stats(path)
+        print(f"[profile] cProfile stats written to {path}")
+
+def run(name):
+    """一次操作符执行的外层计时"""
+    if not _State.enabled:
+        return _NULL
+    return _Run(name)
+
+def stage(name, count=0, unit=""):
+    """阶段计时；count/unit 为本阶段处理的数量 (例如 1, "files")"""
+    if not _State.enabled or not _State.runs:
+        return _NULL
+    return _State.runs[-1].stage(name, count, unit)
+
+def summarize(stages, total):
+    """[(stage, calls, seconds, percent, counts_text, rate_text)]，最后一行为 total"""
+    rows = []
+    for name, record in sorted(stages.items(), key=lambda kv: -kv[1].seconds):
+        counts = ", ".join(f"{n} {unit}" for unit, n in record.counts.items())
+        rates = ", ".join(f"{n / record.seconds:.1f} {unit}/s"
+                          for unit, n in record.counts.items() if record.seconds > 0)
+        percent = 100.0 * record.seconds / total if total > 0 else 0.0
+        rows.append((name, record.calls, record.seconds, percent, counts, rates))
+    rows.append(("total", 1, total, 100.0, "", ""))
+    return rows
+
+def print_summary(name, rows):
+    print(f"[profile] {name}")
+    print(f"    {'stage':28s} {'calls':>7s} {'seconds':>9s} {'%':>6s}  counts / throughput")
+    for stage_name, calls, seconds, percent, counts, rates in rows:
+        detail = f"{counts}  ({rates})" if rates else counts
+        print(f"    {stage_name:28s} {calls:7d} {seconds:9.3f} {percent:5.1f}%  {detail}")
+
+# ------------------------------------------------------------------------
+#    UI (面板开关与汇总表)
+# ------------------------------------------------------------------------
+
+def _sync_settings(self, context):
+    enable(self.enabled, self.cprofile, self.pstats_dir)
+
+class MIXAMO_ProfilingSettings(bpy.types.PropertyGroup):
+    enabled: bpy.props.BoolProperty(
+        name="Profile",
+        description="记录每个阶段的耗时并在控制台 / 面板显示汇总",
+        default=_State.enabled,
+        update=_sync_settings,
+    )
+    cprofile: bpy.props.BoolProperty(
+        name="cProfile",
+        description="每次运行写出 .pstats 文件",
+        default=False,
+        update=_sync_settings,
+    )
+    pstats_dir: bpy.props.StringProperty(
+        name="Stats Folder",
+        description=".pstats 输出目录 (留空使用系统临时目录)",
+        subtype='DIR_PATH',
+        default=_State.pstats_dir,
+        update=_sync_settings,
+    )
+
+_register_count = 0
+
+def register():
+    """多个插件共用，按引用计数注册"""
+    global _register_count
+    _register_count += 1
+    if _register_count == 1:
+        bpy.utils.register_class(MIXAMO_ProfilingSettings)
+        bpy.types.WindowManager.mixamo_profiling = bpy.props.PointerProperty(type=MIXAMO_ProfilingSettings)
+
+def unregister():
+    global _register_count
+    _register_count -= 1
+    if _register_count == 0:
+        del bpy.types.WindowManager.mixamo_profiling
+        bpy.utils.unregister_class(MIXAMO_ProfilingSettings)
+
+def draw_panel(layout, context, run_names, max_rows=8):
+    """在插件面板末尾画开关与最近一次运行的汇总"""
+    settings = context.window_manager.mixamo_profiling
+    box = layout.box()
+    row = box.row(align=True)
+    row.prop(settings, "enabled", icon='TIME')
+    row.prop(settings, "cprofile")
+    if not settings.enabled:
+        return
+    if settings.cprofile:
+        box.prop(settings, "pstats_dir")
+    for run_name in run_names:
+        rows = _State.last_results.get(run_name)
+        if not rows:
+            continue
+        box.label(text=run_name, icon='SORTTIME')
+        col = box.column(align=True)
+        for stage_name, calls, seconds, percent, counts, _rates in rows[:-1][:max_rows] + rows[-1:]:
+            line = col.row()
+            line.label(text=stage_name)
+            line.label(text=f"{seconds:.3f}s  {percent:.0f}%")
+            line.label(text=counts)
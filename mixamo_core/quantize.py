@@ -0,0 +1,215 @@
+"""
+关键帧量化：把 Root Motion 输出 (默认 Root / Hips) 的逐帧曲线压缩成紧凑的二进制轨道，供引擎直接读取。
+
+    旋转  smallest-three：去掉绝对值最大的分量 (保证其为正)，其余三个分量 15 位定点，
+          最大分量的下标 (2 位) 放在前两个分量的最高位 -> 每帧 3 x uint16 = 6 字节
+    位移  按本动作的最小 / 最大值做 16 位定点 -> 每帧 3 x uint16 = 6 字节
+
+每条轨道编码后立即解码比对，误差超过上限 (旋转按角度，位移按距离) 的轨道改存 float32，
+所以解码误差一定不超过上限。
+
+文件格式 (小端)：
+    header  "MXQA" u16 版本 u32 帧数 u16 轨道数 f32 帧率 f32 起始帧
+    轨道    u16 名字长度 + UTF-8 骨骼名, u8 类型, 数据
+            ROT_Q15    F x 3 u16
+            POS_Q16    f32[3] 最小值, f32[3] 最大值, F x 3 u16
+            ROT_RAW    F x 4 f32
+            POS_RAW    F x 3 f32
+"""
+
+import os
+import struct
+
+import numpy as np
+
+from . import animdata
+
+MAGIC = b"MXQA"
+VERSION = 1
+HEADER = struct.Struct("<4sHIHff")
+
+ROT_Q15, POS_Q16, ROT_RAW, POS_RAW = range(4)
+
+ROTATION_BITS = 15
+TRANSLATION_BITS = 16
+
+DEFAULT_BONES = ("Root", "Hips")
+
+_ROT_MAX = (1 << ROTATION_BITS) - 1
+_POS_MAX = (1 << TRANSLATION_BITS) - 1
+_SQRT2 = np.sqrt(2.0)
+
+# ------------------------------------------------------------------------
+#    编码 / 解码 (整条轨道向量化)
+# ------------------------------------------------------------------------
+
+def encode_rotations(q):
+    """(F, 4) 单位四元数 (w, x, y, z) -> (F, 3) uint16"""
+    q = np.asarray(q, dtype=np.float64)
+    q = q / np.linalg.norm(q, axis=1, keepdims=True)
+    largest = np.argmax(np.abs(q), axis=1)
+    rows = np.arange(len(q))
+    q = q * np.where(q[rows, largest] < 0.0, -1.0, 1.0)[:, None]
+    keep = np.ones_like(q, dtype=bool)
+    keep[rows, largest] = False
+    rest = q[keep].reshape(len(q), 3)
+    # 其余分量在 [-1/√2, 1/√2]
+    packed = np.rint((np.clip(rest * _SQRT2, -1.0, 1.0) + 1.0) * 0.5 * _ROT_MAX).astype(np.uint16)
+    packed[:, 0] |= ((largest & 1) << ROTATION_BITS).astype(np.uint16)
+    packed[:, 1] |= ((largest >> 1) << ROTATION_BITS).astype(np.uint16)
+    return packed
+
+def decode_rotations(packed):
+    packed = np.asarray(packed, dtype=np.uint16)
+    largest = ((packed[:, 0] >> ROTATION_BITS) | ((packed[:, 1] >> ROTATION_BITS) << 1)).astype(np.intp)
+    rest = (packed & _ROT_MAX).astype(np.float64) / _ROT_MAX * 2.0 - 1.0
+    rest /= _SQRT2
+    q = np.empty((len(packed), 4))
+    rows = np.arange(len(packed))
+    q[rows, largest] = np.sqrt(np.maximum(0.0, 1.0 - np.sum(rest * rest, axis=1)))
+    keep = np.ones_like(q, dtype=bool)
+    keep[rows, largest] = False
+    q[keep] = rest.ravel()
+    return q
+
+def encode_positions(p):
+    """(F, 3) -> (最小值 (3,), 最大值 (3,), (F, 3) uint16)"""
+    p = np.asarray(p, dtype=np.float64).reshape(-1, 3)
+    if not len(p):
+        return np.zeros(3, dtype=np.float32), np.zeros(3, dtype=np.float32), np.empty((0, 3), dtype=np.uint16)
+    low, high = p.min(axis=0), p.max(axis=0)
+    span = np.where(high - low > 0.0, high - low, 1.0)
+    packed = np.rint((p - low) / span * _POS_MAX).astype(np.uint16)
+    return low.astype(np.float32), high.astype(np.float32), packed
+
+def decode_positions(low, high, packed):
+    low = np.asarray(low, dtype=np.float64)
+    span = np.asarray(high, dtype=np.float64) - low
+    return low + packed.astype(np.float64) / _POS_MAX * span
+
+def rotation_error(a, b):
+    """逐帧夹角 (弧度)，q 与 -q 视为相同"""
+    dots = np.abs(np.sum(a * b, axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1)))
+    return 2.0 * np.arccos(np.clip(dots, 0.0, 1.0))
+
+def position_error(a, b):
+    return np.linalg.norm(a - b, axis=1)
+
+# ------------------------------------------------------------------------
+#    动作 -> 二进制
+# ------------------------------------------------------------------------
+
+def action_tracks(action, bones=DEFAULT_BONES, obj=None):
+    """{骨骼名: {"location": (F, 3) 或 None, "rotation": (F, 4) 或 None}}，以及帧号"""
+    curves = animdata.FCurveIndex(action, obj)
+    frames = animdata.frame_numbers(action)
+    tracks = {}
+    for bone in bones:
+        entry = {}
+        for key, prop, count in (("location", "location", 3), ("rotation", "rotation_quaternion", 4)):
+            fcurves = curves.bone(bone, prop, count)
+            if not any(fcurves):
+                entry[key] = None
+                continue
+            columns = []
+            for i, fc in enumerate(fcurves):
+                if fc is not None:
+                    columns.append(animdata.evaluate_curve(fc, frames).astype(np.float64))
+                else:
+                    # 缺失的通道取静止值 (四元数 w = 1)
+                    columns.append(np.full(len(frames), 1.0 if key == "rotation" and i == 0 else 0.0))
+            entry[key] = np.stack(columns, axis=1)
+        if entry["location"] is not None or entry["rotation"] is not None:
+            tracks[bone] = entry
+    return tracks, frames
+
+def pack_name(name):
+    data = name.encode("utf-8")
+    return struct.pack("<H", len(data)) + data
+
+def encode_tracks(tracks, frame_count, fps=30.0, start=1.0,
+                  max_rotation_error=np.radians(0.01), max_translation_error=0.0005):
+    """
+    返回 (bytes, report)。report = {"raw_bytes", "bytes", "max_rotation_error", "max_translation_error", "fallbacks",
+    "tracks"}，误差为解码后的实测值 (旋转为弧度)。没有帧的轨道不写入。
+    """
+    chunks = []
+    count = 0
+    rot_err = pos_err = 0.0
+    fallbacks = []
+    raw_bytes = HEADER.size
+    for bone, entry in tracks.items():
+        rotation, location = entry.get("rotation"), entry.get("location")
+        if rotation is not None and not len(rotation):
+            rotation = None
+        if location is not None and not len(location):
+            location = None
+        if rotation is not None:
+            raw_bytes += len(pack_name(bone)) + 1 + rotation.size * 4
+            packed = encode_rotations(rotation)
+            error = float(rotation_error(rotation, decode_rotations(packed)).max(initial=0.0))
+            if error <= max_rotation_error:
+                chunks += [pack_name(bone), bytes([ROT_Q15]), packed.tobytes()]
+                rot_err = max(rot_err, error)
+            else:
+                chunks += [pack_name(bone), bytes([ROT_RAW]), rotation.astype("<f4").tobytes()]
+                fallbacks.append(f"{bone}.rotation")
+            count += 1
+        if location is not None:
+            raw_bytes += len(pack_name(bone)) + 1 + location.size * 4
+            low, high, packed = encode_positions(location)
+            error = float(position_error(location, decode_positions(low, high, packed)).max(initial=0.0))
+            if error <= max_translation_error:
+                chunks += [pack_name(bone), bytes([POS_Q16]), low.tobytes(), high.tobytes(), packed.tobytes()]
+                pos_err = max(pos_err, error)
+            else:
+                chunks += [pack_name(bone), bytes([POS_RAW]), location.astype("<f4").tobytes()]
+                fallbacks.append(f"{bone}.location")
+            count += 1
+    data = HEADER.pack(MAGIC, VERSION, frame_count, count, fps, start) + b"".join(chunks)
+    return data, {"raw_bytes": raw_bytes, "bytes": len(data), "max_rotation_error": rot_err,
+                  "max_translation_error": pos_err, "fallbacks": fallbacks, "tracks": count}
+
+def decode(data):
+    """bytes -> ({骨骼名: {"location": (F, 3), "rotation": (F, 4)}}, 帧数, 帧率, 起始帧)"""
+    magic, version, frames, count, fps, start = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a compressed action (MXQA v1)")
+    offset = HEADER.size
+    tracks = {}
+
+    def take(dtype, n):
+        nonlocal offset
+        array = np.frombuffer(data, dtype=dtype, count=n, offset=offset)
+        offset += array.nbytes
+        return array
+
+    for _ in range(count):
+        (length,) = struct.unpack_from("<H", data, offset)
+        name = data[offset + 2:offset + 2 + length].decode("utf-8")
+        kind = data[offset + 2 + length]
+        offset += 3 + length
+        entry = tracks.setdefault(name, {})
+        if kind == ROT_Q15:
+            entry["rotation"] = decode_rotations(take("<u2", frames * 3).reshape(frames, 3))
+        elif kind == POS_Q16:
+            low, high = take("<f4", 3), take("<f4", 3)
+            entry["location"] = decode_positions(low, high, take("<u2", frames * 3).reshape(frames, 3))
+        elif kind == ROT_RAW:
+            entry["rotation"] = take("<f4", frames * 4).reshape(frames, 4).astype(np.float64)
+        elif kind == POS_RAW:
+            entry["location"] = take("<f4", frames * 3).reshape(frames, 3).astype(np.float64)
+        else:
+            raise ValueError(f"Unknown track type {kind}")
+    return tracks, frames, fps, start
+
+def compress_action(action, path, bones=DEFAULT_BONES, obj=None, fps=30.0, **bounds):
+    """把动作的轨道压缩写入 path，返回 report ("tracks" 为写入的轨道数)"""
+    tracks, frames = action_tracks(action, bones, obj)
+    start = float(frames[0]) if len(frames) else 0.0
+    data, report = encode_tracks(tracks, len(frames), fps, start, **bounds)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return report
@@ -0,0 +1,101 @@
+"""
+NumPy 向量化四元数运算，分量顺序与 Blender 一致 (w, x, y, z)，形状 (..., 4)。
+"""
+
+import numpy as np
+
+def normalize(q):
+    q = np.asarray(q, dtype=np.float64)
+    norm = np.linalg.norm(q, axis=-1, keepdims=True)
+    return q / np.where(norm > 0.0, norm, 1.0)
+
+def conjugate(q):
+    return np.asarray(q) * np.array([1.0, -1.0, -1.0, -1.0])
+
+def inverse(q):
+    """与 mathutils.Quaternion.inverted() 一致：共轭 / |q|²"""
+    q = np.asarray(q, dtype=np.float64)
+    return conjugate(q) / np.sum(q * q, axis=-1, keepdims=True)
+
+def multiply(a, b):
+    """Hamilton 积 a @ b (mathutils 的 @ 运算)"""
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    aw, ax, ay, az = np.moveaxis(a, -1, 0)
+    bw, bx, by, bz = np.moveaxis(b, -1, 0)
+    return np.stack([
+        aw * bw - ax * bx - ay * by - az * bz,
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+    ], axis=-1)
+
+def slerp(a, b, t):
+    """逐元素球面插值，t 形状为 (...)；走最短弧 (点积为负时翻转 b)"""
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    t = np.asarray(t, dtype=np.float64)
+    dot = np.sum(a * b, axis=-1)
+    b = np.where((dot < 0.0)[..., None], -b, b)
+    dot = np.clip(np.abs(dot), 0.0, 1.0)
+    theta = np.arccos(dot)
+    sin_theta = np.sin(theta)
+    # 夹角很小时退化为线性插值，避免除以 0
+    small = sin_theta < 1e-6
+    safe = np.where(small, 1.0, sin_theta)
+    wa = np.where(small, 1.0 - t, np.sin((1.0 - t) * theta) / safe)
+    wb = np.where(small, t, np.sin(t * theta) / safe)
+    return wa[..., None] * a + wb[..., None] * b
+
+def to_matrix(q):
+    """(..., 4) -> (..., 3, 3) 旋转矩阵 (先归一化)"""
+    w, x, y, z = np.moveaxis(normalize(q), -1, 0)
+    return np.stack([
+        np.stack([1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)], axis=-1),
+        np.stack([2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)], axis=-1),
+        np.stack([2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)], axis=-1),
+    ], axis=-2)
+
+def from_matrix(m):
+    """(..., 3, 3) 旋转矩阵 -> (..., 4)，按最大对角分量选分支保证数值稳定"""
+    m = np.asarray(m, dtype=np.float64)
+    m00, m11, m22 = m[..., 0, 0], m[..., 1, 1], m[..., 2, 2]
+    trace = m00 + m11 + m22
+    s0 = np.sqrt(np.maximum(trace + 1.0, 1e-12)) * 2.0
+    q0 = np.stack([0.25 * s0, (m[..., 2, 1] - m[..., 1, 2]) / s0,
+                   (m[..., 0, 2] - m[..., 2, 0]) / s0, (m[..., 1, 0] - m[..., 0, 1]) / s0], axis=-1)
+    s1 = np.sqrt(np.maximum(1.0 + m00 - m11 - m22, 1e-12)) * 2.0
+    q1 = np.stack([(m[..., 2, 1] - m[..., 1, 2]) / s1, 0.25 * s1,
+                   (m[..., 0, 1] + m[..., 1, 0]) / s1, (m[..., 0, 2] + m[..., 2, 0]) / s1], axis=-1)
+    s2 = np.sqrt(np.maximum(1.0 + m11 - m00 - m22, 1e-12)) * 2.0
+    q2 = np.stack([(m[..., 0, 2] - m[..., 2, 0]) / s2, (m[..., 0, 1] + m[..., 1, 0]) / s2,
+                   0.25 * s2, (m[..., 1, 2] + m[..., 2, 1]) / s2], axis=-1)
+    s3 = np.sqrt(np.maximum(1.0 + m22 - m00 - m11, 1e-12)) * 2.0
+    q3 = np.stack([(m[..., 1, 0] - m[..., 0, 1]) / s3, (m[..., 0, 2] + m[..., 2, 0]) / s3,
+                   (m[..., 1, 2] + m[..., 2, 1]) / s3, 0.25 * s3], axis=-1)
+    q = np.where((trace > 0.0)[..., None], q0,
+        np.where(((m00 >= m11) & (m00 >= m22))[..., None], q1,
+        np.where((m11 >= m22)[..., None], q2, q3)))
+    return normalize(q)
+
+def make_continuous(q):
+    """沿第一个轴翻转符号，使相邻四元数点积非负 (避免曲线在 q / -q 之间跳变)"""
+    q = np.asarray(q, dtype=np.float64)
+    if len(q) < 2:
+        return q
+    dots = np.sum(q[1:] * q[:-1], axis=-1)
+    signs = np.concatenate([[1.0], np.cumprod(np.where(dots < 0.0, -1.0, 1.0))])
+    return q * signs[:, None]
+
+def split_heading(hips, initial):
+    """
+    transfer_y_rotation_legacy_logic 的四元数分解 (复刻 4.2 插件)：
+    Root 只保留 Hips 局部旋转的 W / Y 分量 (绕局部 Y 轴的朝向)，
+    Hips = Hips_Old @ Root⁻¹，再把 X / Z 分量强制恢复为 initial (第一帧) 的值。
+    hips (F, 4)，initial (4,)；返回 (root (F, 4), hips (F, 4))
+    """
+    root = normalize(np.asarray(hips, dtype=np.float64) * np.array([1.0, 0.0, 1.0, 0.0]))
+    new_hips = normalize(multiply(hips, inverse(root)))
+    new_hips[:, 1] = initial[1]
+    new_hips[:, 3] = initial[3]
+    return root, new_hips
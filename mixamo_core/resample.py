@@ -0,0 +1,101 @@
+"""
+批量帧率重采样：Mixamo 导出为 30 fps，项目可能是 60 / 24 fps。
+
+每条曲线一次 foreach_get 读出，在 NumPy 中插值到目标帧率，再一次 foreach_set 写回。
+旋转四元数 (rotation_quaternion 的 4 条曲线) 按组做球面插值 (slerp)，其余通道线性插值。
+时间以动作起始帧为锚点缩放：f' = start + (f - start) * dst / src。
+重采样后在动作上记录 "mixamo_fps"，再次运行时以它为源帧率，不会重复缩放。
+"""
+
+import numpy as np
+
+from . import animdata, quat
+
+FPS_KEY = "mixamo_fps"
+
+def target_frames(start, end, src_fps, dst_fps):
+    """(新的整数帧, 对应的源时间)"""
+    scale = dst_fps / src_fps
+    new_end = start + (end - start) * scale
+    frames = np.arange(start, np.floor(new_end + 1e-6) + 1.0, dtype=np.float64)
+    return frames, start + (frames - start) / scale
+
+def interp_linear(times, key_frames, key_values):
+    if len(key_frames) == 1:
+        return np.full(len(times), key_values[0])
+    return np.interp(times, key_frames, key_values)
+
+def interp_quaternions(times, curves):
+    """4 条四元数分量曲线 -> (N, 4) 的 slerp 结果 (分量关键帧不对齐时先对齐到并集)"""
+    keys = [animdata.read_curve(fc).astype(np.float64) for fc in curves]
+    frames = np.unique(np.concatenate([k[:, 0] for k in keys]))
+    q = np.stack([interp_linear(frames, k[:, 0], k[:, 1]) for k in keys], axis=1)
+    if len(frames) == 1:
+        return np.repeat(q, len(times), axis=0)
+    idx = np.clip(np.searchsorted(frames, times, side="right") - 1, 0, len(frames) - 2)
+    span = frames[idx + 1] - frames[idx]
+    u = np.clip((times - frames[idx]) / span, 0.0, 1.0)
+    return quat.slerp(q[idx], q[idx + 1], u)
+
+def resample_action(action, src_fps, dst_fps):
+    """
+    把动作从 src_fps 重采样到 dst_fps。返回 (curves, keys_before, keys_after)。
+    """
+    if src_fps <= 0 or dst_fps <= 0:
+        raise ValueError("Frame rates must be positive")
+    curves = animdata.FCurveIndex(action)
+    fcurves = [fc for fc in curves if len(fc.keyframe_points)]
+    if not fcurves or src_fps == dst_fps:
+        action[FPS_KEY] = float(dst_fps)
+        return 0, 0, 0
+
+    start, end = action.frame_range
+    frames, times = target_frames(float(start), float(end), src_fps, dst_fps)
+    keys_before = sum(len(fc.keyframe_points) for fc in fcurves)
+
+    # 四元数按 data_path 分组，4 个分量齐全才走 slerp
+    quat_groups = {}
+    for fc in fcurves:
+        if fc.data_path.endswith("rotation_quaternion"):
+            quat_groups.setdefault(fc.data_path, {})[fc.array_index] = fc
+    grouped = set()
+    results = []
+    for path, members in quat_groups.items():
+        if len(members) != 4:
+            continue
+        group = [members[i] for i in range(4)]
+        values = interp_quaternions(times, group)
+        for i, fc in enumerate(group):
+            results.append((fc, values[:, i]))
+            grouped.add(fc)
+
+    for fc in fcurves:
+        if fc in grouped:
+            continue
+        co = animdata.read_curve(fc).astype(np.float64)
+        results.append((fc, interp_linear(times, co[:, 0], co[:, 1])))
+
+    for fc, values in results:
+        animdata.write_curve(fc, frames, values)
+
+    if getattr(action, "use_frame_range", False):
+        scale = dst_fps / src_fps
+        action.frame_end = start + (action.frame_end - start) * scale
+    action[FPS_KEY] = float(dst_fps)
+    return len(results), keys_before, len(results) * len(frames)
+
+def resample_actions(actions, dst_fps, default_src_fps=30.0):
+    """批量重采样：源帧率取动作上记录的 mixamo_fps，没有则为 default_src_fps"""
+    totals = {"actions": 0, "curves": 0, "keys_before": 0, "keys_after": 0}
+    for action in actions:
+        if action.library:
+            continue
+        src = float(action.get(FPS_KEY, default_src_fps))
+        if src == dst_fps:
+            continue
+        curves, before, after = resample_action(action, src, dst_fps)
+        totals["actions"] += 1
+        totals["curves"] += curves
+        totals["keys_before"] += before
+        totals["keys_after"] += after
+    return totals
@@ -0,0 +1,209 @@
+"""
+批量重定向：把 Mixamo 动作转换到生产骨架 (骨骼名映射 + 两套静止姿态矩阵)。
+
+对每个骨骼按层级顺序、对所有帧一次性做 (F, 4, 4) 矩阵运算，不调用 frame_set：
+
+    源姿态 (骨架空间)   P_s = P_parent @ L_s @ B_s        L = parent_rest⁻¹ @ rest
+    旋转增量            D   = rot(P_s) @ rot(rest_s)⁻¹
+    目标期望姿态        P_t = D @ rot(rest_t)，平移骨骼 (Hips / Root) 的头部位置按身高比例缩放
+    目标 Basis          B_t = (P_t_parent @ L_t)⁻¹ @ P_t
+
+两套骨架需在同一骨架空间朝向下 (Mixamo 导入后已 transform_apply)。
+源动作只读取四元数旋转 (Mixamo 导入的默认旋转模式)。
+"""
+
+import json
+from dataclasses import dataclass
+
+import numpy as np
+
+from . import animdata, quat
+
+TRANSLATION_BONES = ("Hips", "Root")
+
+@dataclass
+class RestBone:
+    matrix: np.ndarray      # (4, 4) 骨架空间静止矩阵 (bone.matrix_local)
+    parent: str = ""
+
+# ------------------------------------------------------------------------
+#    静止姿态与骨骼映射
+# ------------------------------------------------------------------------
+
+def rest_from_armature(armature_data):
+    """bpy Armature 数据 -> {骨骼名: RestBone}"""
+    return {bone.name: RestBone(np.array(bone.matrix_local, dtype=np.float64),
+                                bone.parent.name if bone.parent else "")
+            for bone in armature_data.bones}
+
+def rest_from_json(path):
+    """{"bones": {name: {"parent": str, "matrix": 4x4 行优先}}} -> {骨骼名: RestBone}"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {name: RestBone(np.array(b["matrix"], dtype=np.float64), b.get("parent") or "")
+            for name, b in data["bones"].items()}
+
+def load_bone_map(path, strip_prefix=""):
+    """
+    JSON {源骨骼: 目标骨骼}，或每行 "源 = 目标" 的文本 (# 开头为注释)。
+    导入时源骨骼名已去掉前缀 (bone_name_prefix_to_remove)，strip_prefix 给出时从源骨骼名中去掉同样的前缀，
+    所以 "mixamorig:Hips" 与 "Hips" 两种写法都能匹配。
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if path.lower().endswith(".json"):
+        mapping = dict(json.loads(text))
+    else:
+        mapping = {}
+        for line in text.splitlines():
+            line = line.split("#", 1)[0].strip()
+            if "=" in line:
+                src, dst = (part.strip() for part in line.split("=", 1))
+                if src and dst:
+                    mapping[src] = dst
+    if strip_prefix:
+        mapping = {src.replace(strip_prefix, "", 1) if src.startswith(strip_prefix) else src: dst
+                   for src, dst in mapping.items()}
+    return mapping
+
+def mapped_source_bones(bone_map, source_rest):
+    """映射中在源骨架上确实存在的源骨骼名"""
+    return [name for name in bone_map if name in source_rest]
+
+def hierarchy_order(rest):
+    """父骨骼在前的骨骼名列表"""
+    depth = {}
+
+    def depth_of(name):
+        if name not in depth:
+            parent = rest[name].parent
+            depth[name] = depth_of(parent) + 1 if parent in rest else 0
+        return depth[name]
+
+    return sorted(rest, key=depth_of)
+
+def local_rest(rest, name):
+    bone = rest[name]
+    if bone.parent in rest:
+        return np.linalg.inv(rest[bone.parent].matrix) @ bone.matrix
+    return bone.matrix
+
+def translation_scale(source_rest, target_rest, bone_map, translation_bones):
+    """平移缩放 = 目标 / 源 平移骨骼的静止高度 (没有可比较的骨骼时为 1)"""
+    for name in translation_bones:
+        if name in source_rest and bone_map.get(name) in target_rest:
+            src = source_rest[name].matrix[2, 3]
+            dst = target_rest[bone_map[name]].matrix[2, 3]
+            if abs(src) > 1e-6 and abs(dst) > 1e-6:
+                return dst / src
+    return 1.0
+
+# ------------------------------------------------------------------------
+#    姿态计算
+# ------------------------------------------------------------------------
+
+def read_basis(curves, bone_name, frames):
+    """(F, 4, 4) 的 Basis 矩阵；没有曲线的通道取静止值"""
+    count = len(frames)
+    loc = np.zeros((count, 3))
+    rot = np.tile([1.0, 0.0, 0.0, 0.0], (count, 1))
+    scale = np.ones((count, 3))
+    animated = False
+    for values, prop, size in ((loc, "location", 3), (rot, "rotation_quaternion", 4), (scale, "scale", 3)):
+        for i, fc in enumerate(curves.bone(bone_name, prop, size)):
+            if fc is not None and len(fc.keyframe_points):
+                values[:, i] = animdata.evaluate_curve(fc, frames)
+                animated = True
+    if not animated:
+        return None
+    basis = np.zeros((count, 4, 4))
+    basis[:, :3, :3] = quat.to_matrix(rot) * scale[:, None, :]
+    basis[:, :3, 3] = loc
+    basis[:, 3, 3] = 1.0
+    return basis
+
+def source_poses(curves, rest, frames):
+    """{骨骼名: (F, 4, 4) 骨架空间姿态矩阵}"""
+    poses = {}
+    for name in hierarchy_order(rest):
+        parent = rest[name].parent
+        chain = local_rest(rest, name)
+        if parent in poses:
+            chain = poses[parent] @ chain
+        basis = read_basis(curves, name, frames)
+        poses[name] = chain @ basis if basis is not None else np.broadcast_to(chain, (len(frames), 4, 4))
+    return poses
+
+def retarget_channels(src_poses, source_rest, target_rest, bone_map, frame_count,
+                      translation_bones=TRANSLATION_BONES, scale=None):
+    """
+    计算目标骨骼的 Basis 通道。返回 {目标骨骼: (quaternion (F, 4), location (F, 3) 或 None)}。
+    """
+    if scale is None:
+        scale = translation_scale(source_rest, target_rest, bone_map, translation_bones)
+    inverse_map = {dst: src for src, dst in bone_map.items() if src in src_poses}
+    translating = set(translation_bones)
+    identity = np.broadcast_to(np.eye(4), (frame_count, 4, 4))
+
+    poses = {}
+    channels = {}
+    for name in hierarchy_order(target_rest):
+        parent = target_rest[name].parent
+        base = (poses[parent] if parent in poses else identity) @ local_rest(target_rest, name)
+        src = inverse_map.get(name)
+        if src is None:
+            poses[name] = base
+            continue
+
+        src_pose = src_poses[src]
+        src_rest = source_rest[src].matrix
+        dst_rest = target_rest[name].matrix
+        delta = src_pose[:, :3, :3] @ src_rest[:3, :3].T
+        desired = np.zeros((frame_count, 4, 4))
+        desired[:, :3, :3] = delta @ dst_rest[:3, :3]
+        if src in translating:
+            desired[:, :3, 3] = dst_rest[:3, 3] + (src_pose[:, :3, 3] - src_rest[:3, 3]) * scale
+        else:
+            desired[:, :3, 3] = base[:, :3, 3]
+        desired[:, 3, 3] = 1.0
+
+        basis = np.linalg.inv(base) @ desired
+        rotation = quat.make_continuous(quat.from_matrix(basis[:, :3, :3]))
+        location = basis[:, :3, 3] if src in translating else None
+        channels[name] = (rotation, location)
+        poses[name] = desired
+    return channels
+
+# ------------------------------------------------------------------------
+#    bpy 入口
+# ------------------------------------------------------------------------
+
+def retarget_action(action, source_rest, target_rest, bone_map, target_obj=None, name=None,
+                    translation_bones=TRANSLATION_BONES, scale=None):
+    """把 action 重定向为一个新的目标骨架动作，返回新动作"""
+    import bpy
+
+    frames = animdata.frame_numbers(action)
+    channels = retarget_channels(source_poses(animdata.FCurveIndex(action), source_rest, frames),
+                                 source_rest, target_rest, bone_map, len(frames), translation_bones, scale)
+
+    result = bpy.data.actions.new(name or f"{action.name}_retarget")
+    # 没有对象使用它，清理孤立数据或保存时不能被丢掉
+    result.use_fake_user = True
+    for key in ("mixamo_source", "mixamo_fps"):
+        if key in action:
+            result[key] = action[key]
+    curves = animdata.FCurveIndex(result, target_obj)
+    for bone_name, (rotation, location) in channels.items():
+        for i, fc in enumerate(curves.ensure_bone(bone_name, "rotation_quaternion", 4, bone_name)):
+            animdata.write_curve(fc, frames, rotation[:, i])
+        if location is not None:
+            for i, fc in enumerate(curves.ensure_bone(bone_name, "location", 3, bone_name)):
+                animdata.write_curve(fc, frames, location[:, i])
+
+    if target_obj is not None and target_obj.pose:
+        for bone_name in channels:
+            pose_bone = target_obj.pose.bones.get(bone_name)
+            if pose_bone and pose_bone.rotation_mode != 'QUATERNION':
+                pose_bone.rotation_mode = 'QUATERNION'
+    return result
@@ -0,0 +1,145 @@
+"""
+动作搜索索引：名称 / 标签 / 来源文件夹的前缀与模糊 (trigram + 子序列) 查询。
+
+只依赖动作的 name / aal_tags / session_uid / 自定义属性，不导入 bpy
+(默认数据源 bpy.data.actions 在用到时才导入)，可以在 Blender 之外用模拟动作测试与计时。
+"""
+
+import os
+import re
+import bisect
+
+def _blend_actions():
+    import bpy
+    return bpy.data.actions
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def action_search_text(action):
+    """名称 + 标签 + 来源文件夹 (导入插件写入的 mixamo_source)"""
+    source = action.get("mixamo_source", "")
+    folder = os.path.basename(os.path.dirname(source)) if source else ""
+    return " ".join((action.name, action.aal_tags, folder)).lower()
+
+def trigrams(text):
+    text = f" {text} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def subsequence_score(query, text):
+    """fzf 风格的子序列匹配：连续命中加分，匹配失败返回 0"""
+    score = 0
+    pos = 0
+    streak = 0
+    for ch in query:
+        found = text.find(ch, pos)
+        if found < 0:
+            return 0
+        streak = streak + 1 if found == pos else 1
+        score += streak
+        pos = found + 1
+    return score
+
+class ActionSearchIndex:
+    """
+    以 session_uid 为键的内存索引 (改名不失效)：
+      - tokens: 排好序的 (token, uid) 列表，前缀查询用 bisect
+      - grams:  trigram -> uid 集合，模糊查询只对候选打分
+    首次搜索时构建一次，之后由 depsgraph / 属性回调增量更新。
+    source 返回被索引的动作集合，默认 bpy.data.actions。
+    """
+    def __init__(self, source=None):
+        self.source = source or _blend_actions
+        self.clear()
+
+    def clear(self):
+        self.records = {}
+        self.grams = {}
+        self.tokens = []
+        self.tokens_dirty = False
+        self.stale = True
+
+    def add(self, action):
+        uid = action.session_uid
+        self.remove(uid)
+        text = action_search_text(action)
+        names = action.name.lower()
+        record = (action.name, names, text, set(TOKEN_RE.findall(text)), trigrams(text))
+        self.records[uid] = record
+        for gram in record[4]:
+            self.grams.setdefault(gram, set()).add(uid)
+        self.tokens_dirty = True
+
+    def remove(self, uid):
+        record = self.records.pop(uid, None)
+        if record is None:
+            return
+        for gram in record[4]:
+            bucket = self.grams.get(gram)
+            if bucket:
+                bucket.discard(uid)
+        self.tokens_dirty = True
+
+    def sync(self):
+        """增删对账：只在动作数量变化或首次使用时执行"""
+        live = {a.session_uid: a for a in self.source()}
+        for uid in [uid for uid in self.records if uid not in live]:
+            self.remove(uid)
+        for uid, action in live.items():
+            if uid not in self.records:
+                self.add(action)
+        self.stale = False
+
+    def ensure(self):
+        if self.stale or len(self.source()) != len(self.records):
+            self.sync()
+        if self.tokens_dirty:
+            self.tokens = sorted((tok, uid) for uid, rec in self.records.items() for tok in rec[3])
+            self.tokens_dirty = False
+
+    def search(self, query, limit=30):
+        """返回 [(action_name, score), ...]，按分数降序"""
+        self.ensure()
+        query = query.strip().lower()
+        if not query:
+            return []
+        scores = {}
+
+        def bump(uid, score):
+            if score > scores.get(uid, 0):
+                scores[uid] = score
+
+        # 1. 前缀：每个查询词在 token 表里二分定位
+        words = TOKEN_RE.findall(query)
+        for word in words:
+            i = bisect.bisect_left(self.tokens, (word,))
+            while i < len(self.tokens) and self.tokens[i][0].startswith(word):
+                tok, uid = self.tokens[i]
+                bump(uid, 300 + 100 * (tok == word) - (len(tok) - len(word)))
+                i += 1
+
+        # 2. 模糊：trigram 重合度筛选候选，再做子序列打分
+        grams = trigrams(query)
+        if len(query) >= 3:
+            overlap = {}
+            for gram in grams:
+                for uid in self.grams.get(gram, ()):
+                    overlap[uid] = overlap.get(uid, 0) + 1
+            need = max(1, int(len(grams) * 0.3))
+            for uid, hits in overlap.items():
+                if hits < need:
+                    continue
+                fuzzy = subsequence_score(query, self.records[uid][2])
+                if fuzzy:
+                    bump(uid, int(200 * hits / len(grams)) + fuzzy)
+
+        # 3. 名称整体匹配优先
+        results = []
+        for uid, score in scores.items():
+            name, names = self.records[uid][:2]
+            if names == query:
+                score += 1000
+            elif names.startswith(query):
+                score += 500
+            results.append((score, name))
+        results.sort(key=lambda r: (-r[0], r[1]))
+        return [(name, score) for score, name in results[:limit]]
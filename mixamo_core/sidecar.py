@@ -0,0 +1,98 @@
+"""
+Root Motion 附属轨道 (.rmtrack)：把 Root Motion 转移后 Root 骨骼的逐帧增量预先算好写成定长二进制，
+运行时直接内存映射，不必每次加载动画都从 Root 曲线重建。
+
+数据来源就是 transfer_motion_all_axes / transfer_motion_xz_axes / transfer_y_rotation_legacy_logic
+写入 Root 的曲线：location (局部空间，Y 向上，与 Hips 局部空间一致) 与 rotation_quaternion (只含 W / Y 的朝向)。
+
+文件格式 (小端，48 字节头 + F x 4 float32，行 16 字节对齐)：
+    header  "MXRM" u16 版本 u16 保留 u32 帧数 f32 帧率 f32 起始帧
+            f32[3] 总位移 (末帧 - 首帧) f32 路径长度 f32 平均速度 (单位/秒) f32 总转向 (弧度) 4 字节填充
+    数据    每帧 (dx, dy, dz, dyaw)：相对上一帧的位移与朝向增量，首帧为 0
+
+    header, track = sidecar.load(path)     # track 是只读 np.memmap
+"""
+
+import os
+import struct
+
+import numpy as np
+
+from . import animdata
+
+MAGIC = b"MXRM"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIff3ffff4x")
+EXTENSION = ".rmtrack"
+
+FIELDS = ("frames", "fps", "start", "displacement", "distance", "average_speed", "total_yaw")
+
+def root_channels(action, obj=None, root="Root"):
+    """(location (F, 3), yaw (F,)，帧号)；动作没有 Root 位移曲线 (未转移) 时返回 None"""
+    curves = animdata.FCurveIndex(action, obj)
+    frames = animdata.frame_numbers(action)
+    loc_curves = curves.bone(root, "location", 3)
+    if not any(loc_curves):
+        return None
+    location = np.stack([animdata.evaluate_curve(fc, frames) if fc else np.zeros(len(frames), dtype=np.float32)
+                         for fc in loc_curves], axis=1).astype(np.float64)
+    rot_curves = curves.bone(root, "rotation_quaternion", 4)
+    if rot_curves[0] and rot_curves[2]:
+        w = animdata.evaluate_curve(rot_curves[0], frames).astype(np.float64)
+        y = animdata.evaluate_curve(rot_curves[2], frames).astype(np.float64)
+        # Root 只绕局部 Y 轴旋转 (W / Y 分量)；展开避免 ±π 处跳变
+        yaw = np.unwrap(2.0 * np.arctan2(y, w))
+    else:
+        yaw = np.zeros(len(frames))
+    return location, yaw, frames
+
+def track(location, yaw, fps):
+    """(header 字段 dict, (F, 4) float32 逐帧增量)"""
+    deltas = np.zeros((len(location), 4), dtype=np.float32)
+    if len(location) > 1:
+        deltas[1:, :3] = np.diff(location, axis=0)
+        deltas[1:, 3] = np.diff(yaw)
+    distance = float(np.linalg.norm(deltas[:, :3], axis=1).sum())
+    duration = (len(location) - 1) / fps if fps > 0 else 0.0
+    header = {
+        "frames": len(location),
+        "fps": float(fps),
+        "displacement": tuple(float(v) for v in (location[-1] - location[0])) if len(location) else (0.0,) * 3,
+        "distance": distance,
+        "average_speed": distance / duration if duration > 0 else 0.0,
+        "total_yaw": float(yaw[-1] - yaw[0]) if len(yaw) else 0.0,
+    }
+    return header, deltas
+
+def write(path, header, deltas):
+    data = HEADER.pack(MAGIC, VERSION, 0, header["frames"], header["fps"], header["start"],
+                       *header["displacement"], header["distance"], header["average_speed"], header["total_yaw"])
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.write(np.ascontiguousarray(deltas, dtype="<f4").tobytes())
+    os.replace(tmp, path)
+
+def write_action(action, path, obj=None, fps=30.0):
+    """计算并写入一个动作的附属轨道，返回 header dict；没有 Root 曲线时返回 None"""
+    channels = root_channels(action, obj)
+    if channels is None:
+        return None
+    location, yaw, frames = channels
+    header, deltas = track(location, yaw, fps)
+    header["start"] = float(frames[0]) if len(frames) else 0.0
+    write(path, header, deltas)
+    return header
+
+def load(path):
+    """(header dict, (F, 4) 只读 memmap)"""
+    with open(path, "rb") as f:
+        values = HEADER.unpack(f.read(HEADER.size))
+    magic, version, _reserved, frames, fps, start, dx, dy, dz, distance, speed, yaw = values
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a root motion track (MXRM v1)")
+    header = dict(zip(FIELDS, (frames, fps, start, (dx, dy, dz), distance, speed, yaw)))
+    if frames == 0:
+        return header, np.empty((0, 4), dtype="<f4")
+    deltas = np.memmap(path, dtype="<f4", mode="r", offset=HEADER.size, shape=(frames, 4))
+    return header, deltas
@@ -0,0 +1,366 @@
+"""
+外部动作库：每个动作的曲线以压缩 NumPy 数组 (.npz) 存在磁盘上，
+需要时才物化 (materialize) 为 bpy.data.actions 中的动作，用完按 LRU 淘汰。
+
+    <root>/index.json    {name: {"file", "frame_range", "curves", "keys", "bytes", "hash", "tags", "source",
+                                 "lossless", "lost"}}
+    <root>/<name>.npz    paths / indices / groups / counts / co / frame_range
+                         interpolation / easing / handle_left_type / handle_right_type / handle_left / handle_right
+                         back / amplitude / period (逐关键帧), extrapolation / mute (逐曲线),
+                         settings (use_frame_range, use_cyclic, frame_start, frame_end), props (自定义属性 JSON)
+
+物化出来的动作带有自定义属性 "mixamo_store" (库中的名字)，视为只读副本：
+修改后需要重新 add() 写回库，否则被淘汰时修改丢失。
+
+曲线修改器、采样点以及无法写成 JSON 的自定义属性不入库，这样的动作 "lossless" 为 False，
+打包后不会从文件中删除 (lost 列出丢失的内容)。
+"""
+
+import os
+import re
+import json
+import hashlib
+from collections import OrderedDict
+
+import bpy
+import numpy as np
+
+from . import animdata, trajectory
+
+INDEX_NAME = "index.json"
+STORE_KEY = "mixamo_store"
+# 不入库的自定义属性：库内名字，以及转移前的逐帧轨迹快照 (只在 Verify Transfer 之前有意义)
+SKIPPED_PROPS = (STORE_KEY, trajectory.SNAPSHOT_KEY)
+
+def _file_name(name):
+    safe = re.sub(r'[^\w\-. ]', "_", name).strip() or "action"
+    # 不同名字清洗后可能相同，附加短哈希避免冲突
+    return f"{safe}_{hashlib.sha1(name.encode('utf-8')).hexdigest()[:8]}.npz"
+
+# ------------------------------------------------------------------------
+#    打包 / 解包
+# ------------------------------------------------------------------------
+
+# 逐关键帧的枚举 (foreach 按整数下标读写) 与浮点属性，以及二维手柄坐标
+KEY_ENUMS = ("interpolation", "easing", "handle_left_type", "handle_right_type")
+KEY_FLOATS = ("back", "amplitude", "period")
+KEY_VECTORS = ("handle_left", "handle_right")
+
+def _read_keys(fc, attr, dtype, width=1):
+    count = len(fc.keyframe_points)
+    values = np.empty(count * width, dtype=dtype)
+    fc.keyframe_points.foreach_get(attr, values)
+    return values.reshape(count, width) if width > 1 else values
+
+def _plain(value):
+    """ID 属性 -> 可写成 JSON 的值，无法转换时返回 None"""
+    if hasattr(value, "to_dict"):
+        value = value.to_dict()
+    elif hasattr(value, "to_list"):
+        value = value.to_list()
+    try:
+        json.dumps(value)
+    except (TypeError, ValueError):
+        return None
+    return value
+
+def action_properties(action):
+    """(自定义属性 dict，无法入库的属性名列表)；包括 transfer_mode 等以 bpy.props 注册的属性"""
+    props, lost = {}, []
+    for key in action.keys():
+        if key in SKIPPED_PROPS:
+            continue
+        value = _plain(action[key])
+        if value is None:
+            lost.append(key)
+        else:
+            props[key] = value
+    return props, lost
+
+def lost_state(action):
+    """物化后无法还原的内容 (曲线修改器 / 采样点 / 自定义属性)"""
+    lost = []
+    for fc in animdata.iter_fcurves(action):
+        if len(fc.modifiers):
+            lost.append(f"{fc.data_path}[{fc.array_index}] modifiers")
+        if len(fc.sampled_points):
+            lost.append(f"{fc.data_path}[{fc.array_index}] sampled points")
+    lost += [f"property {key}" for key in action_properties(action)[1]]
+    return lost
+
+def pack_action(action):
+    """动作 -> 数组字典 (曲线按 data_path / index 排序，关键帧首尾相接存放)"""
+    curves = sorted(animdata.iter_fcurves(action), key=lambda f: (f.data_path, f.array_index))
+    co = [animdata.read_curve(fc) for fc in curves]
+
+    def keys(attr, dtype, width=1):
+        shape = (0, width) if width > 1 else (0,)
+        columns = [_read_keys(fc, attr, dtype, width) for fc in curves]
+        return np.concatenate(columns) if columns else np.empty(shape, dtype=dtype)
+
+    arrays = {
+        "paths": np.array([fc.data_path for fc in curves], dtype=np.str_),
+        "indices": np.array([fc.array_index for fc in curves], dtype=np.int32),
+        "groups": np.array([fc.group.name if fc.group else "" for fc in curves], dtype=np.str_),
+        "counts": np.array([len(c) for c in co], dtype=np.int64),
+        "co": np.concatenate(co) if co else np.empty((0, 2), dtype=np.float32),
+        "frame_range": np.asarray(action.frame_range, dtype=np.float32),
+        "extrapolation": np.array([fc.extrapolation for fc in curves], dtype=np.str_),
+        "mute": np.array([fc.mute for fc in curves], dtype=bool),
+        "settings": np.array([action.use_frame_range, action.use_cyclic,
+                              action.frame_start, action.frame_end], dtype=np.float32),
+        "props": np.array(json.dumps(action_properties(action)[0], sort_keys=True), dtype=np.str_),
+    }
+    for attr in KEY_ENUMS:
+        arrays[attr] = keys(attr, np.int32)
+    for attr in KEY_FLOATS:
+        arrays[attr] = keys(attr, np.float32)
+    for attr in KEY_VECTORS:
+        arrays[attr] = keys(attr, np.float32, 2)
+    return arrays
+
+def arrays_hash(arrays):
+    h = hashlib.sha1()
+    for key in sorted(arrays):
+        h.update(key.encode("utf-8"))
+        h.update(np.ascontiguousarray(arrays[key]).tobytes())
+    return h.hexdigest()
+
+def unpack_into_action(arrays, name, slot_name="Legacy Slot"):
+    """
+    数组字典 -> 新建的分层动作 (每条曲线每个属性一次 foreach_set)。
+    插值 / 手柄类型先写，手柄坐标在 update() 之后写，保证与入库时逐位一致。
+    旧版库文件没有的数组跳过，相应属性保持默认值。
+    """
+    action = bpy.data.actions.new(name)
+    if hasattr(action, "slots"):
+        action.slots.new(id_type='OBJECT', name=slot_name)
+    curves = animdata.FCurveIndex(action)
+    co = arrays["co"]
+    offsets = np.concatenate([[0], np.cumsum(arrays["counts"])])
+    for i, (path, index, group) in enumerate(zip(arrays["paths"], arrays["indices"], arrays["groups"])):
+        fc = curves.ensure(str(path), int(index), str(group) or None)
+        span = slice(offsets[i], offsets[i + 1])
+        keys = co[span]
+        animdata.write_curve(fc, keys[:, 0], keys[:, 1], update=False)
+        points = fc.keyframe_points
+        for attr in KEY_ENUMS + KEY_FLOATS:
+            if attr in arrays:
+                points.foreach_set(attr, arrays[attr][span])
+        fc.update()
+        for attr in KEY_VECTORS:
+            if attr in arrays:
+                points.foreach_set(attr, arrays[attr][span].ravel())
+        if "extrapolation" in arrays:
+            fc.extrapolation = str(arrays["extrapolation"][i])
+        if "mute" in arrays:
+            fc.mute = bool(arrays["mute"][i])
+
+    if "settings" in arrays:
+        use_frame_range, use_cyclic, start, end = arrays["settings"].tolist()
+        if use_frame_range:
+            action.frame_start, action.frame_end = start, end
+            action.use_frame_range = True
+        action.use_cyclic = bool(use_cyclic)
+    if "props" in arrays:
+        for key, value in json.loads(str(arrays["props"])).items():
+            action[key] = value
+    return action
+
+# ------------------------------------------------------------------------
+#    动作库
+# ------------------------------------------------------------------------
+
+class ActionStore:
+    """
+    一个库目录。resident 记录当前物化在 bpy 中的动作 (库名 -> bpy 动作名)，
+    按最近使用排序；超过 capacity 时淘汰最久未用且没有其他用户的动作。
+    """
+    def __init__(self, root, capacity=16):
+        self.root = os.path.abspath(bpy.path.abspath(root))
+        self.capacity = capacity
+        self.resident = OrderedDict()
+        self.index = self.load_index()
+
+    # --- 索引 ---
+
+    def load_index(self):
+        path = os.path.join(self.root, INDEX_NAME)
+        if not os.path.exists(path):
+            return {}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_index(self):
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, INDEX_NAME)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+
+    def names(self):
+        return sorted(self.index)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def total_bytes(self):
+        return sum(e["bytes"] for e in self.index.values())
+
+    # --- 写入 ---
+
+    def add(self, action, name=None, save_index=True):
+        """把动作写入库 (同名覆盖)，返回索引条目"""
+        name = name or action.get(STORE_KEY) or action.name
+        arrays = pack_action(action)
+        entry = {
+            "file": _file_name(name),
+            "frame_range": [float(v) for v in arrays["frame_range"]],
+            "curves": int(len(arrays["counts"])),
+            "keys": int(arrays["counts"].sum()),
+            "hash": arrays_hash(arrays),
+            "tags": getattr(action, "aal_tags", ""),
+            "source": action.get("mixamo_source", ""),
+        }
+        lost = lost_state(action)
+        entry["lossless"] = not lost
+        entry["lost"] = lost
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, entry["file"])
+        old = self.index.get(name)
+        if not (old and old["hash"] == entry["hash"] and os.path.exists(path)):
+            tmp = path + ".tmp.npz"
+            np.savez_compressed(tmp, **arrays)
+            os.replace(tmp, path)
+        entry["bytes"] = os.path.getsize(path)
+        self.index[name] = entry
+        if save_index:
+            self.save_index()
+        return entry
+
+    def add_many(self, actions):
+        entries = [self.add(action, save_index=False) for action in actions]
+        self.save_index()
+        return entries
+
+    def remove(self, name):
+        entry = self.index.pop(name, None)
+        if entry:
+            path = os.path.join(self.root, entry["file"])
+            if os.path.exists(path):
+                os.remove(path)
+            self.save_index()
+
+    # --- 物化与淘汰 ---
+
+    def load_arrays(self, name):
+        with np.load(os.path.join(self.root, self.index[name]["file"]), allow_pickle=False) as data:
+            return {key: data[key] for key in data.files}
+
+    def resident_action(self, name):
+        """当前已物化的动作 (撤销 / 改名后按自定义属性重新找回)"""
+        action = bpy.data.actions.get(self.resident.get(name, ""))
+        if action is not None and action.get(STORE_KEY) == name:
+            return action
+        for action in bpy.data.actions:
+            if action.get(STORE_KEY) == name and not action.library:
+                self.resident[name] = action.name
+                return action
+        self.resident.pop(name, None)
+        return None
+
+    def materialize(self, name, slot_name=None):
+        """取得库中动作对应的 bpy 动作，没有则从 .npz 创建；标记为最近使用"""
+        if name not in self.index:
+            raise KeyError(f"Action not in store: {name}")
+        action = self.resident_action(name)
+        if action is None:
+            action = unpack_into_action(self.load_arrays(name), name, slot_name or name)
+            action[STORE_KEY] = name
+            entry = self.index[name]
+            if entry.get("tags") and hasattr(action, "aal_tags"):
+                action.aal_tags = entry["tags"]
+            if entry.get("source"):
+                action["mixamo_source"] = entry["source"]
+            self.resident[name] = action.name
+        self.resident.move_to_end(name)
+        self.evict(keep={name})
+        return action
+
+    def in_use(self, action):
+        return in_use(action)
+
+    def removable(self, action):
+        """已入库且物化副本与原动作等价 (可以从文件中删除)"""
+        name = action.get(STORE_KEY) or action.name
+        entry = self.index.get(name)
+        return bool(entry and entry.get("lossless", False)) and not in_use(action)
+
+    def evict(self, keep=(), capacity=None):
+        """淘汰最久未用、没有被任何对象 / NLA 使用的物化动作，直到不超过 capacity"""
+        capacity = self.capacity if capacity is None else capacity
+        removed = []
+        for name in list(self.resident):
+            if len(self.resident) <= capacity:
+                break
+            if name in keep:
+                continue
+            action = self.resident_action(name)
+            if action is None:
+                continue
+            if self.in_use(action):
+                continue
+            self.resident.pop(name)
+            removed.append(action)
+        if removed:
+            bpy.data.batch_remove(ids=removed)
+        return len(removed)
+
+    def release_all(self):
+        """淘汰所有未被使用的物化动作"""
+        return self.evict(capacity=0)
+
+# ------------------------------------------------------------------------
+#    使用者
+# ------------------------------------------------------------------------
+
+def _strip_uses(strips, action):
+    for strip in strips:
+        if strip.action == action or _strip_uses(strip.strips, action):
+            return True
+    return False
+
+def owners(action):
+    """
+    真正播放这个动作的数据块：animation_data.action 或 NLA 片段引用了它。
+    action.users 还会计入 PointerProperty (搜索结果、target_action 等) 的引用，不能据此判断。
+    """
+    result = []
+    for id_data in bpy.data.user_map(subset=[action]).get(action, ()):
+        anim = getattr(id_data, "animation_data", None)
+        if anim is None:
+            continue
+        if anim.action == action or any(_strip_uses(track.strips, action) for track in anim.nla_tracks):
+            result.append(id_data)
+    return result
+
+def in_use(action):
+    return bool(owners(action))
+
+_stores = {}
+
+def get_store(root, capacity=16):
+    """每个目录共享一个 ActionStore，LRU 状态跨操作符保留"""
+    key = os.path.abspath(bpy.path.abspath(root))
+    store = _stores.get(key)
+    if store is None:
+        store = _stores[key] = ActionStore(key, capacity)
+    store.capacity = capacity
+    return store
+
+def clear_stores():
+    _stores.clear()
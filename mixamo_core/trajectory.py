@@ -0,0 +1,120 @@
+"""
+Root Motion 转移前后的 Hips 世界轨迹校验：所有帧一次性在 NumPy 中由 Root / Hips 的局部变换组合出
+Hips 的世界位置与朝向，不用 frame_set，整个动作库几秒内完成。
+
+    P_root = Root_rest @ B_root
+    P_hips = P_root @ Root_rest⁻¹ @ Hips_rest @ B_hips     (Hips 的父骨骼是 Root 时)
+    W_hips = obj.matrix_world @ P_hips
+
+B 为曲线给出的 location / rotation_quaternion / scale 组成的局部矩阵，Rest 为骨架空间的静止矩阵 (bone.matrix_local)。
+朝向取 Hips 局部 Z 轴在世界 XY 平面上的投影角 (展开，避免 ±π 跳变)。
+
+转移前调用 record(action, armature) 把轨迹存到动作上 (SNAPSHOT_KEY，每帧 帧号 / x / y / z / 朝向)，
+转移后 verify(action, armature) 重新计算并比较，帧号不同 (之后做过重采样) 时按帧号插值对齐。
+快照是逐帧数据，只在需要校验时记录 (场景选项 Record Trajectory)，比较后用 discard(action) 删除。
+"""
+
+import numpy as np
+
+from . import animdata, quat
+
+SNAPSHOT_KEY = "mixamo_trajectory"
+SNAPSHOT_COLUMNS = 5
+
+POSITION_TOLERANCE = 0.01
+HEADING_TOLERANCE = np.radians(2.0)
+
+def rest_matrix(armature, name):
+    bone = armature.data.bones.get(name) if armature else None
+    return np.array(bone.matrix_local, dtype=np.float64) if bone is not None else None
+
+def channel(curves, bone_name, prop, count, frames, default):
+    """(F, count)；没有曲线的分量取 default"""
+    values = np.tile(np.asarray(default, dtype=np.float64), (len(frames), 1))
+    for i, fc in enumerate(curves.bone(bone_name, prop, count)):
+        if fc is not None:
+            values[:, i] = animdata.evaluate_curve(fc, frames)
+    return values
+
+def basis_matrices(curves, bone_name, frames):
+    """(F, 4, 4) 局部变换 T @ R @ S"""
+    loc = channel(curves, bone_name, "location", 3, frames, (0.0, 0.0, 0.0))
+    rot = channel(curves, bone_name, "rotation_quaternion", 4, frames, (1.0, 0.0, 0.0, 0.0))
+    scale = channel(curves, bone_name, "scale", 3, frames, (1.0, 1.0, 1.0))
+    basis = np.zeros((len(frames), 4, 4))
+    basis[:, :3, :3] = quat.to_matrix(rot) * scale[:, None, :]
+    basis[:, :3, 3] = loc
+    basis[:, 3, 3] = 1.0
+    return basis
+
+def hips_world(action, armature, frames=None, hips="Hips", root="Root"):
+    """(帧号 (F,), 位置 (F, 3), 朝向 (F,) 弧度)；骨架没有 Hips 时返回 None"""
+    hips_rest = rest_matrix(armature, hips)
+    if hips_rest is None:
+        return None
+    if frames is None:
+        frames = animdata.frame_numbers(action)
+    curves = animdata.FCurveIndex(action, armature)
+    pose = hips_rest @ basis_matrices(curves, hips, frames)
+    root_rest = rest_matrix(armature, root)
+    parent = armature.data.bones[hips].parent
+    if root_rest is not None and parent is not None and parent.name == root:
+        root_pose = root_rest @ basis_matrices(curves, root, frames)
+        pose = root_pose @ np.linalg.inv(root_rest) @ pose
+    world = np.array(armature.matrix_world, dtype=np.float64) @ pose
+    forward = world[:, :3, 2]
+    heading = np.unwrap(np.arctan2(forward[:, 1], forward[:, 0]))
+    return np.asarray(frames, dtype=np.float64), world[:, :3, 3], heading
+
+def record(action, armature):
+    """转移前调用：把当前 Hips 世界轨迹存到动作上，返回帧数 (没有 Hips 时为 0)"""
+    result = hips_world(action, armature)
+    if result is None:
+        return 0
+    frames, positions, heading = result
+    snapshot = np.column_stack([frames, positions, heading])
+    action[SNAPSHOT_KEY] = snapshot.ravel().tolist()
+    return len(frames)
+
+def snapshot(action):
+    """(帧号, 位置, 朝向) 或 None"""
+    data = action.get(SNAPSHOT_KEY)
+    if data is None or len(data) < SNAPSHOT_COLUMNS:
+        return None
+    table = np.asarray(data, dtype=np.float64).reshape(-1, SNAPSHOT_COLUMNS)
+    return table[:, 0], table[:, 1:4], table[:, 4]
+
+def discard(action):
+    """删除动作上的转移前快照"""
+    action.pop(SNAPSHOT_KEY, None)
+
+def drift(before, after):
+    """两条轨迹 (帧号, 位置, 朝向) 的逐帧偏差：(位置距离 (F,), 朝向差 (F,) 弧度，已折叠到 [0, π])"""
+    frames_b, pos_b, head_b = before
+    frames_a, pos_a, head_a = after
+    if len(frames_b) != len(frames_a) or not np.array_equal(frames_b, frames_a):
+        pos_b = np.column_stack([np.interp(frames_a, frames_b, pos_b[:, i]) for i in range(3)])
+        head_b = np.interp(frames_a, frames_b, head_b)
+    position = np.linalg.norm(pos_a - pos_b, axis=1)
+    heading = np.abs((head_a - head_b + np.pi) % (2.0 * np.pi) - np.pi)
+    return position, heading
+
+def verify(action, armature, position_tolerance=POSITION_TOLERANCE, heading_tolerance=HEADING_TOLERANCE):
+    """
+    返回 {"position", "heading", "frame", "ok"} (最大偏差与出现的帧)；
+    动作没有转移前快照或骨架没有 Hips 时返回 None。
+    """
+    before = snapshot(action)
+    if before is None:
+        return None
+    after = hips_world(action, armature)
+    if after is None:
+        return None
+    position, heading = drift(before, after)
+    if not len(position):
+        return {"position": 0.0, "heading": 0.0, "frame": None, "ok": True}
+    worst = int(np.argmax(np.maximum(position / max(position_tolerance, 1e-12),
+                                      heading / max(heading_tolerance, 1e-12))))
+    result = {"position": float(position.max()), "heading": float(heading.max()), "frame": float(after[0][worst])}
+    result["ok"] = bool(result["position"] <= position_tolerance and result["heading"] <= heading_tolerance)
+    return result
@@ -0,0 +1,722 @@
+"""
+数值等价校验：同一份输入分别交给参考实现 (4.2 版逐关键帧 / 逐帧 frame_set 的逻辑) 与 5.0 的批量实现，
+逐条比较结果曲线的关键帧数组，防止提速时悄悄改变输出。
+
+用法:
+    blender -b [library.blend] -P mixamo_equivalence.py -- [--real] [--armature NAME]
+        [--synthetic 3] [--bones 65] [--frames 60] [--seed 0] [--fbx PATH ...] [--prefix mixamorig:]
+        [--atol 1e-5] [--rtol 1e-5] [--strict] [--output report.json]
+
+  --real       对打开的 .blend 中的动作运行 (骨架取 --armature 或第一个骨架)，在合成数据之前进行
+  --synthetic  合成 N 个 Mixamo 形态的动作 (见 mixamo_benchmark.py；会清空当前数据)，0 = 不生成
+  --fbx        FBX 文件或文件夹：fbxanim.load_action 的快速读取与完整导入 (import_scene.fbx + 修正) 对比，
+               在合成数据之后进行
+
+参考实现移植自 root_motion_transfer_.py / mixamo2blender.py (4.2)，只把 action.fcurves 的查找 / 新建
+换成 animdata.FCurveIndex (5.0 分层动作没有 action.fcurves)，其余保持逐关键帧 / 逐帧的原始写法。
+root_motion_transfer.py 与 root_motion_transfer_.py 的旋转转移只差 Hips 关键帧的插入方式，数值相同。
+与 4.2 行为不同的用例另有第二个参考：提速前的 5.0 逐帧实现 (基线提交中的 root_motion_transfer_for_blender_5.py /
+mixamo2blender_for_blender_5.py)，结果记为 "<用例> (5.0 baseline)"，它们必须完全一致。
+基线用 obj.keyframe_insert(frame=0) 新建曲线 (会多出第 0 帧的关键帧)，移植时同样换成 FCurveIndex。
+rename_bones 的参考是 4.2 的逐骨骼改名 (动作绑定着，由 Blender 逐次修正路径)；
+重采样没有 4.2 版本，参考是逐帧线性插值 / mathutils slerp 再逐个 insert 的写法。
+
+每个用例在源动作的两份副本上分别运行 (rename_bones 在骨架副本上)，比较所有曲线的关键帧 (帧, 值)、
+手柄位置 (同样按 --atol / --rtol)、插值与手柄类型 (必须一致) 以及通道组名。
+已知的 4.2 / 5.0 行为差异 (KNOWN_DIFFERENCES) 记为 KNOWN，不算失败；--strict 时也算失败。
+快速读取抛出 FBXAnimError (导入时会回退到完整导入) 的文件记为 SKIP。有失败时退出码为 1。
+"""
+
+import bpy
+import os
+import sys
+import json
+import bisect
+import argparse
+import mathutils
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import mixamo2blender_for_blender_5 as mixamo_import
+import root_motion_transfer_for_blender_5 as root_motion
+import mixamo_benchmark as bench
+from mixamo_core import animdata, fbxanim, ledger, resample
+
+ROOT_NOT_NORMALIZED = "4.2 版 Root 四元数 (w, 0, y, 0) 不归一化，5.0 归一化"
+
+# 只针对 4.2 参考；与 5.0 基线的比较 ("... (5.0 baseline)") 没有已知差异
+KNOWN_DIFFERENCES = {
+    "adjust_hips_location": "4.2 版把动作中所有 location 曲线都乘 0.01，5.0 只缩放 Hips 的位移曲线",
+    "apply NONE": "4.2 版把 NONE 当作 XZ 转移，5.0 把 Root 位移填 0、Hips 保持不变",
+    "transfer_y_rotation_legacy_logic": ROOT_NOT_NORMALIZED,
+    "apply XZ+rotation": ROOT_NOT_NORMALIZED,
+    "apply XYZ+rotation": ROOT_NOT_NORMALIZED,
+}
+
+def log(message):
+    print(f"[equiv] {message}", flush=True)
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(prog="mixamo_equivalence.py")
+    parser.add_argument("--real", action="store_true", help="校验当前 .blend 中的动作")
+    parser.add_argument("--armature", help="--real 使用的骨架 (默认第一个骨架)")
+    parser.add_argument("--synthetic", type=int, default=3, help="合成动作数 (0 = 不生成)")
+    parser.add_argument("--bones", type=int, default=65)
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fbx", nargs="+", default=[], help="FBX 文件或文件夹 (快速读取 vs 完整导入)")
+    parser.add_argument("--prefix", default="mixamorig:", help="要移除的骨骼名前缀")
+    parser.add_argument("--atol", type=float, default=1e-5)
+    parser.add_argument("--rtol", type=float, default=1e-5)
+    parser.add_argument("--strict", action="store_true", help="已知差异也算失败")
+    parser.add_argument("--output", help="JSON 报告文件")
+    args = parser.parse_args(argv)
+    # generate_library 需要的基准参数
+    args.actions = args.synthetic
+    return args
+
+# ------------------------------------------------------------------------
+#    参考实现 (4.2 逻辑)
+# ------------------------------------------------------------------------
+
+def bone_path(bone_name, prop):
+    return f'pose.bones["{bone_name}"].{prop}'
+
+def ref_transfer_keyframes(source_fcurve, target_fcurve):
+    if source_fcurve and target_fcurve:
+        target_fcurve.keyframe_points.clear()
+        for keyframe in source_fcurve.keyframe_points:
+            target_fcurve.keyframe_points.insert(keyframe.co.x, keyframe.co.y, options={'FAST'})
+
+def ref_zero_out_keyframes(fcurve):
+    if fcurve:
+        for keyframe in fcurve.keyframe_points:
+            keyframe.co[1] = 0
+
+def ref_transfer_motion_all_axes(hips_fcurves, root_fcurves, action):
+    frame_1_value = 0
+    if hips_fcurves[1]:
+        frame_1_value = hips_fcurves[1].evaluate(1)
+
+    if hips_fcurves[1] and frame_1_value < 0:
+        for keyframe in hips_fcurves[1].keyframe_points:
+            keyframe.co[1] -= frame_1_value
+        hips_fcurves[1].update()
+
+    for i in range(3):
+        if hips_fcurves[i]:
+            ref_transfer_keyframes(hips_fcurves[i], root_fcurves[i])
+
+    if hips_fcurves[1]:
+        frame_start, frame_end = action.frame_range
+        for frame in range(int(frame_start), int(frame_end) + 1):
+            if frame_1_value < 0:
+                hips_fcurves[1].keyframe_points.insert(frame, frame_1_value, options={'FAST'})
+            else:
+                hips_fcurves[1].keyframe_points.insert(frame, 0, options={'FAST'})
+        hips_fcurves[1].update()
+
+def ref_transfer_motion_xz_axes(hips_fcurves, root_fcurves, action):
+    for i in [0, 2]:
+        if hips_fcurves[i]:
+            ref_transfer_keyframes(hips_fcurves[i], root_fcurves[i])
+
+    if root_fcurves[1]:
+        frame_start, frame_end = action.frame_range
+        for frame in range(int(frame_start), int(frame_end) + 1):
+            root_fcurves[1].keyframe_points.insert(frame, 0, options={'FAST'})
+
+def ref_insert_quaternion_keyframes(curves, bone_name, group_name, frame, quaternion):
+    for i in range(4):
+        fcurve = curves.ensure(bone_path(bone_name, "rotation_quaternion"), i, group_name)
+        fcurve.keyframe_points.insert(frame, quaternion[i], options={'FAST'})
+
+def ref_transfer_y_rotation(hips_bone, root_bone, action, curves):
+    scene = bpy.context.scene
+    scene.frame_set(1)
+    hips_initial_quaternion = hips_bone.rotation_quaternion.copy()
+
+    for frame in range(int(action.frame_range[0]), int(action.frame_range[1]) + 1):
+        scene.frame_set(frame)
+
+        hips_original_quaternion = hips_bone.rotation_quaternion.copy()
+        root_new_quaternion = mathutils.Quaternion((hips_original_quaternion.w, 0, hips_original_quaternion.y, 0))
+
+        root_bone.rotation_quaternion = root_new_quaternion
+        ref_insert_quaternion_keyframes(curves, root_bone.name, "Root", frame, root_new_quaternion)
+
+        hips_new_quaternion = (hips_original_quaternion @ root_new_quaternion.inverted()).normalized()
+        hips_new_quaternion.x = hips_initial_quaternion.x
+        hips_new_quaternion.z = hips_initial_quaternion.z
+
+        hips_bone.rotation_quaternion = hips_new_quaternion
+        ref_insert_quaternion_keyframes(curves, hips_bone.name, "Hips", frame, hips_new_quaternion)
+
+def ref_adjust_hips_location(obj):
+    action = obj.animation_data.action
+    for bone in obj.pose.bones:
+        if "hips" in bone.name.lower():
+            for fcurve in animdata.iter_fcurves(action):
+                if fcurve.data_path.endswith('location'):
+                    for keyframe in fcurve.keyframe_points:
+                        keyframe.co[1] *= 0.01
+
+def ref_apply(obj, action):
+    """4.2 ApplyTransferOperator 对单个动作的处理"""
+    curves = animdata.FCurveIndex(action, obj)
+    hips_fcurves = curves.bone("Hips", "location")
+    if not any(hips_fcurves):
+        return
+    root_fcurves = curves.ensure_bone("Root", "location", group_name="Root")
+
+    if action.transfer_mode == "XYZ":
+        ref_transfer_motion_all_axes(hips_fcurves, root_fcurves, action)
+    else:
+        ref_transfer_motion_xz_axes(hips_fcurves, root_fcurves, action)
+
+    for i in [0, 2]:
+        if hips_fcurves[i]:
+            ref_zero_out_keyframes(hips_fcurves[i])
+
+    if action.transfer_rotation:
+        hips_bone = obj.pose.bones.get("Hips")
+        root_bone = obj.pose.bones.get("Root")
+        if hips_bone and root_bone:
+            ref_transfer_y_rotation(hips_bone, root_bone, action, curves)
+    else:
+        frame_start, frame_end = action.frame_range
+        for frame in range(int(frame_start), int(frame_end) + 1):
+            ref_insert_quaternion_keyframes(curves, "Root", "Root", frame, mathutils.Quaternion((1, 0, 0, 0)))
+
+# ------------------------------------------------------------------------
+#    参考实现 (5.0 基线的逐帧逻辑)
+# ------------------------------------------------------------------------
+
+def base_adjust_hips_location(obj):
+    action = obj.animation_data.action
+    hips_bone_name = None
+    for bone in obj.data.bones:
+        if "hips" in bone.name.lower():
+            hips_bone_name = bone.name
+            break
+    if not hips_bone_name:
+        return
+    target_path = bone_path(hips_bone_name, "location")
+    for fcurve in animdata.iter_fcurves(action):
+        if fcurve.data_path == target_path:
+            for keyframe in fcurve.keyframe_points:
+                keyframe.co[1] *= 0.01
+            fcurve.update()
+
+def base_fill_root_location_with_zero(root_fcurves, action):
+    frame_start, frame_end = action.frame_range
+    for i in range(3):
+        if root_fcurves[i]:
+            for frame in range(int(frame_start), int(frame_end) + 1):
+                root_fcurves[i].keyframe_points.insert(frame, 0, options={'FAST'})
+            root_fcurves[i].update()
+
+def base_transfer_y_rotation(hips_bone, root_bone, action, curves):
+    scene = bpy.context.scene
+    view_layer = bpy.context.view_layer
+    original_frame = scene.frame_current
+    frame_start, frame_end = map(int, action.frame_range)
+
+    scene.frame_set(1)
+    view_layer.update()
+    hips_initial_quaternion = hips_bone.rotation_quaternion.copy()
+
+    for frame in range(frame_start, frame_end + 1):
+        scene.frame_set(frame)
+        view_layer.update()
+
+        hips_original_quaternion = hips_bone.rotation_quaternion.copy()
+        root_new_quaternion = mathutils.Quaternion((
+            hips_original_quaternion.w, 0, hips_original_quaternion.y, 0)).normalized()
+
+        root_bone.rotation_quaternion = root_new_quaternion
+        ref_insert_quaternion_keyframes(curves, "Root", "Root", frame, root_new_quaternion)
+
+        hips_new_quaternion = (hips_original_quaternion @ root_new_quaternion.inverted()).normalized()
+        hips_new_quaternion.x = hips_initial_quaternion.x
+        hips_new_quaternion.z = hips_initial_quaternion.z
+
+        hips_bone.rotation_quaternion = hips_new_quaternion
+        ref_insert_quaternion_keyframes(curves, "Hips", "Hips", frame, hips_new_quaternion)
+
+    scene.frame_set(original_frame)
+
+def base_apply(obj, action):
+    """5.0 基线 ApplyTransferOperator 对单个动作的处理"""
+    bpy.context.view_layer.update()
+    curves = animdata.FCurveIndex(action, obj)
+    hips_fcurves = curves.bone("Hips", "location")
+    root_fcurves = curves.ensure_bone("Root", "location", group_name="Root")
+
+    mode = action.transfer_mode
+    if mode == "XYZ":
+        ref_transfer_motion_all_axes(hips_fcurves, root_fcurves, action)
+    elif mode == "XZ":
+        ref_transfer_motion_xz_axes(hips_fcurves, root_fcurves, action)
+    elif mode == "NONE":
+        base_fill_root_location_with_zero(root_fcurves, action)
+
+    if mode in {"XZ", "XYZ"}:
+        for i in [0, 2]:
+            if hips_fcurves[i]:
+                ref_zero_out_keyframes(hips_fcurves[i])
+
+    if action.transfer_rotation:
+        hips_bone = obj.pose.bones.get("Hips")
+        root_bone = obj.pose.bones.get("Root")
+        if hips_bone and root_bone:
+            base_transfer_y_rotation(hips_bone, root_bone, action, curves)
+    else:
+        frame_start, frame_end = action.frame_range
+        for fc in curves.bone("Root", "rotation_quaternion", 4):
+            if fc:
+                fc.keyframe_points.clear()
+        for frame in range(int(frame_start), int(frame_end) + 1):
+            ref_insert_quaternion_keyframes(curves, "Root", "Root", frame, (1, 0, 0, 0))
+
+def ref_rename_bones(obj, target_string):
+    """4.2 rename_bones，只处理传入的骨架"""
+    for bone in obj.data.bones:
+        if target_string in bone.name:
+            new_name = bone.name.replace(target_string, "")
+            bone.name = new_name
+
+def ref_resample(action, src_fps, dst_fps):
+    """逐帧求源时间上的值 (位移 / 缩放线性插值，四元数 mathutils slerp) 再逐个 insert"""
+    start, end = action.frame_range
+    scale = dst_fps / src_fps
+    last = int(start + (end - start) * scale + 1e-6)
+    frames = list(range(int(start), last + 1))
+    times = [start + (frame - start) / scale for frame in frames]
+
+    def bracket(key_frames, t):
+        i = min(max(bisect.bisect_right(key_frames, t) - 1, 0), max(len(key_frames) - 2, 0))
+        if len(key_frames) < 2:
+            return i, i, 0.0
+        u = (t - key_frames[i]) / (key_frames[i + 1] - key_frames[i])
+        return i, i + 1, min(max(u, 0.0), 1.0)
+
+    def key_value(fc, frame):
+        for keyframe in fc.keyframe_points:
+            if keyframe.co.x == frame:
+                return keyframe.co.y
+        return fc.evaluate(frame)
+
+    fcurves = [fc for fc in animdata.iter_fcurves(action) if len(fc.keyframe_points)]
+    quat_groups = {}
+    for fc in fcurves:
+        if fc.data_path.endswith("rotation_quaternion"):
+            quat_groups.setdefault(fc.data_path, {})[fc.array_index] = fc
+
+    new_values = {}
+    for members in quat_groups.values():
+        if len(members) != 4:
+            continue
+        group = [members[i] for i in range(4)]
+        key_frames = sorted({kp.co.x for fc in group for kp in fc.keyframe_points})
+        rows = []
+        for t in times:
+            i, j, u = bracket(key_frames, t)
+            q0 = mathutils.Quaternion([key_value(fc, key_frames[i]) for fc in group])
+            q1 = mathutils.Quaternion([key_value(fc, key_frames[j]) for fc in group])
+            rows.append(q0.slerp(q1, u))
+        for i, fc in enumerate(group):
+            new_values[fc] = [q[i] for q in rows]
+
+    for fc in fcurves:
+        if fc in new_values:
+            continue
+        keys = [(kp.co.x, kp.co.y) for kp in fc.keyframe_points]
+        key_frames = [k[0] for k in keys]
+        values = []
+        for t in times:
+            i, j, u = bracket(key_frames, t)
+            values.append(keys[i][1] + (keys[j][1] - keys[i][1]) * u)
+        new_values[fc] = values
+
+    for fc, values in new_values.items():
+        # 新关键帧保持曲线原来的插值与手柄类型
+        first = fc.keyframe_points[0]
+        types = (first.interpolation, first.handle_left_type, first.handle_right_type)
+        fc.keyframe_points.clear()
+        for frame, value in zip(frames, values):
+            keyframe = fc.keyframe_points.insert(frame, value, options={'FAST'})
+            keyframe.interpolation, keyframe.handle_left_type, keyframe.handle_right_type = types
+        fc.update()
+
+    if action.use_frame_range:
+        action.frame_end = start + (action.frame_end - start) * scale
+
+# ------------------------------------------------------------------------
+#    用例：(名称, 参考, 5.0 实现)，均为 f(obj, action)，动作已绑定到 obj
+# ------------------------------------------------------------------------
+
+def ref_adjust_hips(obj, action):
+    ref_adjust_hips_location(obj)
+
+def fast_adjust_hips(obj, action):
+    mixamo_import.adjust_hips_location(obj)
+
+def location_curves(obj, action):
+    curves = animdata.FCurveIndex(action, obj)
+    return curves, curves.bone("Hips", "location"), curves.ensure_bone("Root", "location", group_name="Root")
+
+def ref_all_axes(obj, action):
+    _curves, hips, root = location_curves(obj, action)
+    ref_transfer_motion_all_axes(hips, root, action)
+
+def fast_all_axes(obj, action):
+    _curves, hips, root = location_curves(obj, action)
+    root_motion.transfer_motion_all_axes(hips, root, action)
+
+def ref_xz_axes(obj, action):
+    _curves, hips, root = location_curves(obj, action)
+    ref_transfer_motion_xz_axes(hips, root, action)
+
+def fast_xz_axes(obj, action):
+    _curves, hips, root = location_curves(obj, action)
+    root_motion.transfer_motion_xz_axes(hips, root, action)
+
+def ref_rotation(obj, action):
+    ref_transfer_y_rotation(obj.pose.bones["Hips"], obj.pose.bones["Root"], action,
+                            animdata.FCurveIndex(action, obj))
+
+def fast_rotation(obj, action):
+    root_motion.transfer_y_rotation_legacy_logic(obj, obj.pose.bones["Hips"], obj.pose.bones["Root"], action)
+
+def base_adjust_hips(obj, action):
+    base_adjust_hips_location(obj)
+
+def base_rotation(obj, action):
+    base_transfer_y_rotation(obj.pose.bones["Hips"], obj.pose.bones["Root"], action,
+                             animdata.FCurveIndex(action, obj))
+
+def apply_case(mode, rotation):
+    def prepare(action):
+        action.transfer_mode = mode
+        action.transfer_rotation = rotation
+
+    def reference(obj, action):
+        prepare(action)
+        ref_apply(obj, action)
+
+    def baseline(obj, action):
+        prepare(action)
+        base_apply(obj, action)
+
+    def fast(obj, action):
+        prepare(action)
+        root_motion.transfer_action(obj, action)
+
+    name = f"apply {mode}" + ("+rotation" if rotation else "")
+    BASELINES[name] = baseline
+    return name, reference, fast
+
+# 5.0 基线参考：{用例名: f(obj, action)}；transfer_motion_all_axes / xz_axes 的基线代码与 4.2 相同，不重复比较
+BASELINES = {
+    "adjust_hips_location": base_adjust_hips,
+    "transfer_y_rotation_legacy_logic": base_rotation,
+}
+
+def resample_case(src_fps, dst_fps):
+    def reference(obj, action):
+        ref_resample(action, src_fps, dst_fps)
+
+    def fast(obj, action):
+        resample.resample_action(action, src_fps, dst_fps)
+
+    return f"resample {src_fps:g}->{dst_fps:g}", reference, fast
+
+def fast_rename_bones(obj, target_string):
+    mixamo_import.rename_bones(obj, target_string)
+
+CASES = [
+    ("adjust_hips_location", ref_adjust_hips, fast_adjust_hips),
+    ("transfer_motion_all_axes", ref_all_axes, fast_all_axes),
+    ("transfer_motion_xz_axes", ref_xz_axes, fast_xz_axes),
+    ("transfer_y_rotation_legacy_logic", ref_rotation, fast_rotation),
+    apply_case("XZ", False),
+    apply_case("XZ", True),
+    apply_case("XYZ", False),
+    apply_case("XYZ", True),
+    apply_case("NONE", False),
+    resample_case(30.0, 60.0),
+    resample_case(30.0, 24.0),
+]
+
+# 骨架用例：f(骨架副本, 前缀)，骨架副本的骨骼名已加上前缀 (与刚导入时一样)，动作绑定在它上面
+ARMATURE_CASES = [
+    ("rename_bones", ref_rename_bones, fast_rename_bones),
+]
+
+# ------------------------------------------------------------------------
+#    比较
+# ------------------------------------------------------------------------
+
+def curve_table(action):
+    """{(data_path, index): {"co", "handle_left", "handle_right": (N, 2), 插值 / 手柄类型: (N,), "group"}}"""
+    table = {}
+    for fc in animdata.iter_fcurves(action):
+        count = len(fc.keyframe_points)
+        entry = {"co": animdata.read_curve(fc), "group": fc.group.name if fc.group else None}
+        for attr in ("handle_left", "handle_right"):
+            entry[attr] = np.empty((count, 2), dtype=np.float32)
+            fc.keyframe_points.foreach_get(attr, entry[attr].ravel())
+        entry.update(animdata.read_key_types(fc))
+        table[(fc.data_path, fc.array_index)] = entry
+    return table
+
+def compare(reference, fast, atol, rtol):
+    """返回 (最大绝对误差, 最差曲线, [问题描述])"""
+    problems = []
+    for key in sorted(set(reference) ^ set(fast)):
+        problems.append(f"{key[0]}[{key[1]}] only in {'reference' if key in reference else 'fast'}")
+    worst, worst_key = 0.0, None
+    for key in sorted(set(reference) & set(fast)):
+        ref, new = reference[key], fast[key]
+        name = f"{key[0]}[{key[1]}]"
+        if ref["group"] != new["group"]:
+            problems.append(f"{name}: group {ref['group']!r} vs {new['group']!r}")
+        if ref["co"].shape != new["co"].shape or not np.array_equal(ref["co"][:, 0], new["co"][:, 0]):
+            problems.append(f"{name}: keyframes differ ({len(ref['co'])} vs {len(new['co'])})")
+            continue
+        if not len(ref["co"]):
+            continue
+        frames = ref["co"][:, 0]
+        for attr in animdata.KEY_TYPES:
+            bad = ref[attr] != new[attr]
+            if bad.any():
+                i = int(np.argmax(bad))
+                problems.append(f"{name}: {int(bad.sum())} keys with different {attr}, first at frame {frames[i]:g}")
+        error = np.abs(ref["co"][:, 1].astype(np.float64) - new["co"][:, 1])
+        if error.max() > worst:
+            worst, worst_key = float(error.max()), name
+        bad = error > atol + rtol * np.abs(ref["co"][:, 1])
+        if bad.any():
+            i = int(np.argmax(error))
+            problems.append(f"{name}: {int(bad.sum())} keys off, max {error[i]:.3g} at frame {frames[i]:g}")
+        for attr in ("handle_left", "handle_right"):
+            error = np.abs(ref[attr].astype(np.float64) - new[attr]).max(axis=1)
+            bad = error > atol + rtol * np.abs(ref[attr]).max(axis=1)
+            if bad.any():
+                i = int(np.argmax(error))
+                problems.append(f"{name}: {int(bad.sum())} {attr}s off, max {error[i]:.3g} at frame {frames[i]:g}")
+    return worst, worst_key, problems
+
+def result_row(name, source_name, reference, fast, args):
+    worst, worst_key, problems = compare(reference, fast, args.atol, args.rtol)
+    if not problems:
+        status = "PASS"
+    elif name in KNOWN_DIFFERENCES and not args.strict:
+        status = "KNOWN"
+    else:
+        status = "FAIL"
+    row = {"action": source_name, "case": name, "status": status, "max_abs_error": worst,
+           "worst_curve": worst_key, "problems": problems}
+    log(f"{status:5s} {name:34s} {source_name:30s} max {worst:.3g}"
+        + (f"  ({len(problems)} issues)" if problems else ""))
+    if status == "FAIL":
+        for problem in problems[:5]:
+            log(f"      {problem}")
+    return row
+
+def run_case(obj, source, case, args):
+    """返回行列表：与 4.2 参考比较，用例有 5.0 基线时再与基线比较"""
+    name, reference, fast = case
+    runs = [("reference", reference), ("fast", fast)]
+    if name in BASELINES:
+        runs.append(("baseline", BASELINES[name]))
+    results = {}
+    for label, func in runs:
+        action = source.copy()
+        action.name = f"{source.name}.{label}"
+        animdata.assign_action(obj, action)
+        func(obj, action)
+        results[label] = curve_table(action)
+        bpy.data.actions.remove(action)
+    animdata.assign_action(obj, source)
+    rows = [result_row(name, source.name, results["reference"], results["fast"], args)]
+    if "baseline" in results:
+        rows.append(result_row(f"{name} (5.0 baseline)", source.name, results["baseline"], results["fast"], args))
+    return rows
+
+def prefixed_armature(obj, source, label, prefix):
+    """骨架 (对象与数据) 与动作的副本；骨骼名加上前缀，动作绑定着，Blender 同步改写曲线路径"""
+    arm = obj.copy()
+    arm.data = obj.data.copy()
+    arm.name = f"{obj.name}.{label}"
+    bpy.context.scene.collection.objects.link(arm)
+    action = source.copy()
+    action.name = f"{source.name}.{label}"
+    animdata.assign_action(arm, action)
+    for bone in arm.data.bones:
+        bone.name = prefix + bone.name
+    return arm, action
+
+def run_armature_case(obj, source, case, args):
+    name, reference, fast = case
+    results = {}
+    bone_names = {}
+    for label, func in (("reference", reference), ("fast", fast)):
+        arm, action = prefixed_armature(obj, source, label, args.prefix)
+        func(arm, args.prefix)
+        results[label] = curve_table(action)
+        bone_names[label] = sorted(bone.name for bone in arm.data.bones)
+        data = arm.data
+        bpy.data.objects.remove(arm)
+        bpy.data.armatures.remove(data)
+        bpy.data.actions.remove(action)
+    row = result_row(name, source.name, results["reference"], results["fast"], args)
+    if bone_names["reference"] != bone_names["fast"]:
+        row["problems"].append("bone names differ")
+        row["status"] = "FAIL"
+        log("      bone names differ")
+    return row
+
+def run_actions(obj, actions, args, source_kind):
+    root_motion.add_root_bone(obj, bench._Reporter())
+    for pbone in obj.pose.bones:
+        pbone.rotation_mode = 'QUATERNION'
+    rows = []
+    for source in actions:
+        for case in CASES:
+            for row in run_case(obj, source, case, args):
+                row["source"] = source_kind
+                rows.append(row)
+        for case in ARMATURE_CASES:
+            row = run_armature_case(obj, source, case, args)
+            row["source"] = source_kind
+            rows.append(row)
+    return rows
+
+def real_actions(args):
+    if args.armature:
+        obj = bpy.data.objects.get(args.armature)
+    else:
+        obj = next((o for o in bpy.data.objects if o.type == 'ARMATURE'), None)
+    if obj is None or obj.type != 'ARMATURE':
+        raise RuntimeError(f"Armature not found: {args.armature!r}")
+    actions = [a for a in bpy.data.actions if not a.library
+               and any(animdata.FCurveIndex(a, obj).bone("Hips", "location"))]
+    return obj, actions
+
+def synthetic_actions(args):
+    """合成数据；一半动作的 Hips Y 整体下移，覆盖 XYZ 中首帧为负的分支"""
+    obj = bench.generate_library(args)
+    actions = list(bpy.data.actions)
+    for action in actions[::2]:
+        fc = animdata.FCurveIndex(action, obj).get(bone_path("Hips", "location"), 1)
+        animdata.transform_values(fc, offset=-150.0)
+    return obj, actions
+
+# ------------------------------------------------------------------------
+#    FBX：快速读取 vs 完整导入
+# ------------------------------------------------------------------------
+
+def fbx_paths(args):
+    paths = []
+    for path in args.fbx:
+        if os.path.isdir(path):
+            paths += sorted(os.path.join(path, f) for f in os.listdir(path) if f.lower().endswith(".fbx"))
+        else:
+            paths.append(path)
+    return paths
+
+def full_import(path, import_ledger, prefix):
+    """与 ImportMixamoFBX 相同的完整导入与修正，返回骨架对象 (没有时为 None)"""
+    with import_ledger.record(path):
+        bpy.ops.import_scene.fbx(filepath=path, ignore_leaf_bones=True, automatic_bone_orientation=True,
+                                 anim_offset=0.0)
+    armature = None
+    for obj in import_ledger.objects(path):
+        if obj.type == 'ARMATURE':
+            if obj.animation_data and obj.animation_data.action:
+                obj.animation_data.action.name = os.path.splitext(os.path.basename(path))[0]
+            mixamo_import.rename_bones(obj, prefix)
+            mixamo_import.normalize_object(obj)
+            mixamo_import.adjust_hips_location(obj)
+            armature = armature or obj
+        elif obj.type == 'MESH' and obj.parent and obj.parent.type == 'ARMATURE':
+            mixamo_import.normalize_object(obj)
+    return armature
+
+def discard_import(path, import_ledger):
+    import_ledger.remove_objects(import_ledger.objects(path))
+    actions = import_ledger.ids("actions", path)
+    if actions:
+        bpy.data.batch_remove(ids=actions)
+
+def run_fbx(args):
+    """第一个文件完整导入作为参考骨架，每个文件的快速读取结果与它自己完整导入的动作比较"""
+    paths = fbx_paths(args)
+    if not paths:
+        raise RuntimeError(f"No FBX files in {args.fbx}")
+    import_ledger = ledger.ImportLedger()
+    reference = full_import(paths[0], import_ledger, args.prefix)
+    if reference is None:
+        raise RuntimeError(f"No armature in {paths[0]}")
+    rows = []
+    for path in paths:
+        name = os.path.basename(path)
+        imported = reference if path == paths[0] else full_import(path, import_ledger, args.prefix)
+        expected = imported.animation_data.action if imported and imported.animation_data else None
+        try:
+            action, _fps = fbxanim.load_action(path, reference, args.prefix, f"{name}.fast")
+        except fbxanim.FBXAnimError as e:
+            row = {"action": name, "case": "fbx load_action", "status": "SKIP", "max_abs_error": 0.0,
+                   "worst_curve": None, "problems": [str(e)]}
+            log(f"SKIP  {'fbx load_action':34s} {name:30s} {e}")
+        else:
+            row = result_row("fbx load_action", name, curve_table(expected) if expected else {},
+                             curve_table(action), args)
+            bpy.data.actions.remove(action)
+        row["source"] = "fbx"
+        rows.append(row)
+        if imported is not reference:
+            discard_import(path, import_ledger)
+    discard_import(paths[0], import_ledger)
+    return rows
+
+def main():
+    args = parse_args()
+    for module in (mixamo_import, root_motion):
+        try:
+            module.register()
+        except ValueError:
+            pass
+
+    rows = []
+    if args.real:
+        obj, actions = real_actions(args)
+        log(f"real: {len(actions)} actions on {obj.name}")
+        rows += run_actions(obj, actions, args, "real")
+    if args.synthetic:
+        obj, actions = synthetic_actions(args)
+        log(f"synthetic: {len(actions)} actions, {args.bones} bones, {args.frames} frames")
+        rows += run_actions(obj, actions, args, "synthetic")
+    if args.fbx:
+        log(f"fbx: {len(fbx_paths(args))} files")
+        rows += run_fbx(args)
+
+    counts = {status: sum(1 for r in rows if r["status"] == status) for status in ("PASS", "KNOWN", "FAIL", "SKIP")}
+    log(f"{counts['PASS']} passed, {counts['KNOWN']} known differences, {counts['FAIL']} failed, "
+        f"{counts['SKIP']} skipped")
+    for name in sorted({r["case"] for r in rows if r["status"] == "KNOWN"}):
+        log(f"  known: {name}: {KNOWN_DIFFERENCES[name]}")
+    report = {"config": {k: v for k, v in vars(args).items() if k != "output"},
+              "known_differences": KNOWN_DIFFERENCES, "counts": counts, "results": rows}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    sys.exit(1 if counts["FAIL"] else 0)
+
+if __name__ == "__main__":
+    main()
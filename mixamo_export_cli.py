@@ -0,0 +1,80 @@
+"""
+批量导出动作到 FBX / glTF (多进程)
+
+用法:
+    blender -b library.blend -P mixamo_export_cli.py -- --output /out/anims [--format FBX|GLB|GLTF_SEPARATE]
+        [--single-file] [--armature NAME] [--jobs N] [--no-meshes] [--force] [--store DIR]
+
+每个动作导出为一个文件；--single-file 时导出一个包含全部动作的 glTF。
+工作分片给 N 个无界面 Blender 进程 (默认 CPU 核数)。输出目录中的 export_manifest.json
+记录每个动作的内容哈希，未改动的动作直接跳过；--force 忽略 manifest 全部重新导出。
+--store 指向外部动作库时，库中的动作在工作进程里逐个物化、导出、淘汰。
+"""
+
+import bpy
+import os
+import sys
+import json
+import argparse
+import traceback
+
+# 插件脚本与本文件放在同一目录
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mixamo_core import export
+
+def log(message):
+    print(f"[export] {message}", flush=True)
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(prog="mixamo_export_cli.py")
+    parser.add_argument("--output", required=True, help="输出目录")
+    parser.add_argument("--format", default="FBX", choices=sorted(export.FORMAT_EXTENSIONS))
+    parser.add_argument("--single-file", action="store_true", help="所有动作导出到一个 glTF")
+    parser.add_argument("--armature", help="默认使用场景中的第一个骨架")
+    parser.add_argument("--jobs", type=int, default=0, help="工作进程数 (0 = CPU 核数)")
+    parser.add_argument("--no-meshes", action="store_true", help="只导出骨架与动画")
+    parser.add_argument("--force", action="store_true", help="忽略 manifest，全部重新导出")
+    parser.add_argument("--store", default="", help="同时导出外部动作库 (mixamo_core.store) 中的动作")
+    parser.add_argument("--summary-json", help="把导出汇总写到此文件")
+    return parser.parse_args(argv)
+
+def find_armature(name):
+    if name:
+        obj = bpy.data.objects.get(name)
+        if obj is None or obj.type != 'ARMATURE':
+            raise ValueError(f"Armature not found: {name!r}")
+        return obj
+    obj = next((o for o in bpy.context.scene.objects if o.type == 'ARMATURE'), None)
+    if obj is None:
+        raise RuntimeError("No armature in scene")
+    return obj
+
+def main():
+    args = parse_args()
+    armature = find_armature(args.armature)
+    summary = export.run_export(
+        armature,
+        args.output,
+        fmt=args.format,
+        single_file=args.single_file,
+        include_meshes=not args.no_meshes,
+        jobs=args.jobs,
+        force=args.force,
+        store_dir=args.store,
+        log=log,
+    )
+    if args.summary_json:
+        with open(args.summary_json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    if summary["failed"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        traceback.print_exc()
+        log(f"FAILED: {e}")
+        sys.exit(1)
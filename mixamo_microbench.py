@@ -0,0 +1,296 @@
+"""
+微基准：不依赖 bpy 的纯 Python / NumPy 部分 (指纹聚类、循环点搜索、动作搜索、重定向、分类、量化、
+四元数分解)，用内存中的模拟曲线驱动，直接调用插件实际使用的 mixamo_core 函数。
+不需要 Blender，普通 Python 环境即可运行：
+
+    python mixamo_microbench.py [--bones 65] [--frames 120] [--actions 50]
+        [--repeat 3] [--seed 0] [--output results.json]
+
+mixamo_benchmark.py 的 --suite micro / all 也会运行这里的基准，并共用合成数据与结果格式。
+结果以 JSON 输出 (stdout 末尾或 --output)。
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mixamo_core import analysis, animdata, locomotion, quantize, quat, retarget, search
+
+# Mixamo 标准骨架 (已去掉 mixamorig: 前缀)：(骨骼, 父骨骼)
+MIXAMO_BONES = [
+    ("Hips", None), ("Spine", "Hips"), ("Spine1", "Spine"), ("Spine2", "Spine1"),
+    ("Neck", "Spine2"), ("Head", "Neck"), ("HeadTop_End", "Head"),
+    ("LeftShoulder", "Spine2"), ("LeftArm", "LeftShoulder"), ("LeftForeArm", "LeftArm"), ("LeftHand", "LeftForeArm"),
+    ("RightShoulder", "Spine2"), ("RightArm", "RightShoulder"), ("RightForeArm", "RightArm"), ("RightHand", "RightForeArm"),
+    ("LeftUpLeg", "Hips"), ("LeftLeg", "LeftUpLeg"), ("LeftFoot", "LeftLeg"), ("LeftToeBase", "LeftFoot"),
+    ("RightUpLeg", "Hips"), ("RightLeg", "RightUpLeg"), ("RightFoot", "RightLeg"), ("RightToeBase", "RightFoot"),
+]
+
+FINGERS = ("Thumb", "Index", "Middle", "Ring", "Pinky")
+
+def log(message):
+    print(f"[bench] {message}", flush=True)
+
+def add_arguments(parser):
+    """两个基准脚本共用的合成数据参数"""
+    parser.add_argument("--bones", type=int, default=65)
+    parser.add_argument("--frames", type=int, default=120)
+    parser.add_argument("--actions", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON 结果文件")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="mixamo_microbench.py")
+    add_arguments(parser)
+    return parser.parse_args(argv)
+
+# ------------------------------------------------------------------------
+#    计时 (Timing)
+# ------------------------------------------------------------------------
+
+class Results:
+    def __init__(self, args, blender=None):
+        self.rows = []
+        self.meta = {
+            "blender": blender,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {k: v for k, v in vars(args).items() if k != "output"},
+        }
+
+    def add(self, suite, name, times, count, unit):
+        best = min(times)
+        row = {
+            "suite": suite,
+            "name": name,
+            "seconds_min": round(best, 6),
+            "seconds_median": round(statistics.median(times), 6),
+            "runs": len(times),
+            "count": count,
+            "unit": unit,
+            "ms_per_unit": round(best * 1000.0 / count, 4) if count else None,
+        }
+        self.rows.append(row)
+        log(f"{suite:5s} {name:40s} {best:9.4f}s  {count:8d} {unit:8s} {row['ms_per_unit'] or 0:10.4f} ms/{unit}")
+
+    def dump(self, path=None):
+        data = {"meta": self.meta, "results": self.rows}
+        text = json.dumps(data, indent=2)
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        print(text)
+
+def timed(func, *args):
+    t0 = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - t0
+
+# ------------------------------------------------------------------------
+#    合成数据 (Synthetic Mixamo curves)
+# ------------------------------------------------------------------------
+
+def mixamo_bone_list(count):
+    """标准骨架不够时用手指骨补齐 (与 Mixamo 65 骨一致的层级形态)"""
+    bones = list(MIXAMO_BONES)
+    for side in ("Left", "Right"):
+        for finger in FINGERS:
+            parent = f"{side}Hand"
+            for segment in range(1, 5):
+                name = f"{side}Hand{finger}{segment}"
+                bones.append((name, parent))
+                parent = name
+    while len(bones) < count:
+        bones.append((f"Extra{len(bones)}", "Spine2"))
+    return bones[:max(count, 1)]
+
+def synthetic_curves(bone_names, frame_count, rng):
+    """
+    生成 Mixamo 形态的曲线：Hips 位移为厘米 (导入修正前)，带前进与起伏；
+    所有骨骼为小幅正弦摆动的单位四元数，其余骨骼位移为常量。
+    返回 [(data_path, index, values ndarray)]
+    """
+    t = np.arange(frame_count, dtype=np.float32)
+    period = rng.uniform(20.0, 60.0)
+    phase = 2.0 * np.pi * t / period
+    curves = []
+    for bone in bone_names:
+        if bone == "Hips":
+            loc = np.stack([
+                np.sin(phase) * 3.0,
+                100.0 + np.sin(2.0 * phase) * 2.0,
+                t * rng.uniform(0.0, 3.0),
+            ])
+        else:
+            loc = np.tile(np.array([[0.0], [rng.uniform(5.0, 20.0)], [0.0]]), (1, frame_count))
+        for i in range(3):
+            curves.append((f'pose.bones["{bone}"].location', i, loc[i]))
+
+        axis = rng.normal(size=3)
+        axis /= np.linalg.norm(axis)
+        angle = rng.uniform(0.05, 0.6) * np.sin(phase + rng.uniform(0, np.pi))
+        if bone == "Hips":
+            angle = angle + np.linspace(0.0, rng.uniform(-np.pi, np.pi), frame_count)
+        quat = np.stack([np.cos(angle / 2.0)] + [axis[k] * np.sin(angle / 2.0) for k in range(3)])
+        for i in range(4):
+            curves.append((f'pose.bones["{bone}"].rotation_quaternion', i, quat[i]))
+    return curves
+
+# ------------------------------------------------------------------------
+#    微基准 (Micro benchmarks, no bpy)
+# ------------------------------------------------------------------------
+
+class MockKeyframes:
+    def __init__(self, values):
+        self.co = np.empty(len(values) * 2, dtype=np.float32)
+        self.co[0::2] = np.arange(1, len(values) + 1)
+        self.co[1::2] = values
+
+    def __len__(self):
+        return len(self.co) // 2
+
+    def foreach_get(self, attr, out):
+        out[:] = self.co
+
+class MockFCurve:
+    def __init__(self, data_path, index, values):
+        self.data_path = data_path
+        self.array_index = index
+        self.keyframe_points = MockKeyframes(values)
+
+class MockAction(dict):
+    """提供分析函数所需的最小 Action 接口"""
+    def __init__(self, name, curves, frame_count):
+        super().__init__()
+        self.name = name
+        self.fcurves = [MockFCurve(*c) for c in curves]
+        self.frame_range = (1.0, float(frame_count))
+        self.curve_frame_range = self.frame_range
+        self.session_uid = id(self)
+        self.aal_tags = ""
+        self.users = 1
+        self.library = None
+
+def mock_library(args):
+    rng = np.random.default_rng(args.seed)
+    bone_names = [b for b, _p in mixamo_bone_list(args.bones)]
+    return [MockAction(f"Synthetic_{a:04d}", synthetic_curves(bone_names, args.frames, rng), args.frames)
+            for a in range(args.actions)]
+
+def bench_fingerprints(args, results, actions):
+    times = [timed(analysis.find_duplicate_clusters, actions) for _ in range(args.repeat)]
+    results.add("micro", "find_duplicate_clusters", times, len(actions), "actions")
+
+def bench_loop_search(args, results, actions):
+    def run():
+        for action in actions:
+            analysis.analyze_action_loop(action)
+    times = [timed(run) for _ in range(args.repeat)]
+    results.add("micro", "analyze_action_loop", times, len(actions), "actions")
+
+def bench_search_index(args, results, actions):
+    words = ("run", "walk", "idle", "jump", "turn", "strafe", "crouch", "attack")
+    rnd = random.Random(args.seed)
+    for action in actions:
+        action.name = " ".join(rnd.sample(words, 2)) + f" {action.name}"
+    index = search.ActionSearchIndex(source=lambda: actions)
+
+    def build():
+        index.clear()
+        index.ensure()
+
+    times = [timed(build) for _ in range(args.repeat)]
+    results.add("micro", "search_index_build", times, len(actions), "actions")
+
+    queries = ["run", "wlk", "idle jump", "strafe 00", "crouh", "at"]
+
+    def query():
+        for q in queries:
+            index.search(q)
+
+    times = [timed(query) for _ in range(args.repeat)]
+    results.add("micro", "search_index_query", times, len(queries), "queries")
+
+def bench_classify(args, results, actions):
+    """整个动作库一次分类 (Hips 曲线读取 + 统计量)"""
+    times = [timed(locomotion.classify_actions, actions) for _ in range(args.repeat)]
+    results.add("micro", "classify_actions", times, len(actions), "actions")
+
+def synthetic_rest(bone_list, rng, prefix=""):
+    rest = {}
+    for name, parent in bone_list:
+        matrix = np.eye(4)
+        matrix[:3, :3] = quat.to_matrix(quat.normalize(rng.normal(size=4)))
+        matrix[:3, 3] = rng.normal(size=3) + (0.0, 0.0, 1.0)
+        rest[prefix + name] = retarget.RestBone(matrix, prefix + parent if parent else "")
+    return rest
+
+def bench_retarget(args, results, actions):
+    """source_poses + retarget_channels (不含写回 bpy)，目标骨架静止姿态与源不同"""
+    rng = np.random.default_rng(args.seed)
+    bone_list = mixamo_bone_list(args.bones)
+    source_rest = synthetic_rest(bone_list, rng)
+    target_rest = synthetic_rest(bone_list, rng, prefix="DEF-")
+    bone_map = {name: "DEF-" + name for name, _parent in bone_list}
+    frames = np.arange(1, args.frames + 1, dtype=np.float32)
+
+    def run():
+        for action in actions:
+            poses = retarget.source_poses(animdata.FCurveIndex(action), source_rest, frames)
+            retarget.retarget_channels(poses, source_rest, target_rest, bone_map, len(frames))
+
+    times = [timed(run) for _ in range(args.repeat)]
+    results.add("micro", "retarget_channels", times, len(actions), "actions")
+
+def bench_quantize(args, results, actions):
+    """Hips 轨道读取 + smallest-three / 定点量化编码与误差校验 (不写文件)"""
+    reports = []
+
+    def run():
+        reports.clear()
+        for action in actions:
+            tracks, frames = quantize.action_tracks(action, ("Hips",))
+            reports.append(quantize.encode_tracks(tracks, len(frames))[1])
+
+    times = [timed(run) for _ in range(args.repeat)]
+    results.add("micro", "quantize_tracks", times, len(actions), "actions")
+    ratio = sum(r["bytes"] for r in reports) / max(sum(r["raw_bytes"] for r in reports), 1)
+    print(f"  quantize: {ratio:.0%} of float32 size, "
+          f"max rot {np.degrees(max(r['max_rotation_error'] for r in reports)):.5f}°, "
+          f"max loc {max(r['max_translation_error'] for r in reports):.6f}")
+
+def bench_quaternion_split(args, results):
+    """transfer_y_rotation_legacy_logic 的四元数分解 (quat.split_heading，不含曲线读写)，所有动作的帧"""
+    rng = np.random.default_rng(args.seed)
+    hips = quat.normalize(rng.random((args.frames * args.actions, 4)))
+    times = [timed(quat.split_heading, hips, hips[0]) for _ in range(args.repeat)]
+    results.add("micro", "quaternion_heading_split", times, len(hips), "frames")
+
+def run_micro_suite(args, results):
+    actions = mock_library(args)
+    bench_fingerprints(args, results, actions)
+    bench_loop_search(args, results, actions)
+    bench_search_index(args, results, actions)
+    bench_retarget(args, results, actions)
+    bench_classify(args, results, actions)
+    bench_quantize(args, results, actions)
+    bench_quaternion_split(args, results)
+
+def main():
+    args = parse_args()
+    results = Results(args)
+    run_micro_suite(args, results)
+    results.dump(args.output)
+
+if __name__ == "__main__":
+    main()
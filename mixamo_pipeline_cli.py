@@ -0,0 +1,303 @@
+"""
+无界面批处理入口：导入 -> Root Motion -> 清理 -> 保存
+
+用法:
+    blender -b -P mixamo_pipeline_cli.py -- --config pipeline.json [--output out.blend]
+
+配置文件 (JSON，Python 3.11+ 也支持 .toml):
+    {
+        "folder": "/assets/mixamo/locomotion",
+        "prefix": "mixamorig:",
+        "fast_anim_import": false,
+        "prefetch": 4,
+        "base_blend": null,
+        "target_armature": null,
+        "resample": {"source_fps": 30, "target_fps": 60},
+        "transfer": [
+            {"pattern": "*Idle*", "mode": "NONE", "rotation": false},
+            {"pattern": "*Turn*", "mode": "XZ",   "rotation": true},
+            {"pattern": "*",      "mode": "AUTO"}
+        ],
+        "verify": {"position_tolerance": 0.01, "heading_tolerance": 2.0, "fail": false},
+        "sidecar": {"dir": null},
+        "retarget": {"rig": null, "bone_map": "bone_map.json", "rest_json": null, "suffix": "_retarget"},
+        "cleanup": {"enabled": true, "purge_orphans": true},
+        "library": {"dir": null, "mode": "FOLDER"},
+        "output": "/out/locomotion.blend",
+        "compress": true,
+        "timings_json": "/out/locomotion_timings.json",
+        "profile": false,
+        "pstats_dir": null
+    }
+
+transfer 规则按顺序匹配动作名 (fnmatch，不区分大小写)，第一条命中的生效。
+mode 为 AUTO 的动作根据 Hips 曲线自动判断 mode 与 rotation (一次分析所有命中的动作)。
+target_armature 为空时使用导入后场景中的第一个骨架。
+fast_anim_import 为 true 时 (实验性，默认 false)只有第一个文件完整导入，其余文件只读取动画曲线。
+prefetch 为后台预读的文件数 (默认 4，0 = 不预读)。
+导入器按每个 FBX 的帧率 (TimeMode) 设置场景帧率，动作记录的就是该帧率；
+resample.source_fps 只用于没有记录帧率的已有动作 (默认 30)；
+resample.target_fps 给出时导入阶段把每个动作重采样到该帧率，并设置场景帧率。
+verify 给出时，Root Motion 之后比较每个动作转移前后 Hips 的世界位置 / 朝向 (度)，
+列出超出容差的动作；fail 为 true 时有超差动作则中止。
+sidecar.dir 给出时，Root Motion 之后为每个动作写 .rmtrack 附属轨道 (逐帧位移 / 朝向增量)。
+retarget.rig 给出时 (需在 base_blend 中)，Root Motion 之后把所有动作重定向到该骨架。
+library.dir 给出时，保存前把动作分片写入独立的库 .blend (mode: FOLDER / ACTION)，
+输出文件只链接这些动作。
+profile 为 true 时各操作符打印分阶段耗时表；给出 pstats_dir 时额外写 cProfile 文件。
+"""
+
+import bpy
+import os
+import sys
+import json
+import math
+import time
+import fnmatch
+import argparse
+import traceback
+
+# 插件脚本与本文件放在同一目录
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import mixamo2blender_for_blender_5 as mixamo_import
+import root_motion_transfer_for_blender_5 as root_motion
+import blender_cleanup_for_blender_5 as cleanup
+from mixamo_core import library, profiling, retarget
+
+ADDONS = (mixamo_import, root_motion, cleanup)
+
+TRANSFER_MODES = {"XZ", "XYZ", "NONE", "AUTO"}
+
+def log(message):
+    print(f"[pipeline] {message}", flush=True)
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(prog="mixamo_pipeline_cli.py")
+    parser.add_argument("--config", required=True, help="JSON / TOML 配置文件")
+    parser.add_argument("--output", help="覆盖配置中的 output")
+    return parser.parse_args(argv)
+
+def load_config(path):
+    if path.lower().endswith(".toml"):
+        import tomllib
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def validate_config(config):
+    if not config.get("folder") or not os.path.isdir(config["folder"]):
+        raise ValueError(f"Invalid folder: {config.get('folder')!r}")
+    if not config.get("output"):
+        raise ValueError("Missing output path")
+    for rule in config.get("transfer", []):
+        if rule.get("mode", "XZ") not in TRANSFER_MODES:
+            raise ValueError(f"Invalid transfer mode in rule {rule}")
+    if config.get("library", {}).get("mode", "FOLDER") not in library.SHARD_MODES:
+        raise ValueError(f"Invalid library mode: {config['library']['mode']}")
+
+def register_addons():
+    for module in ADDONS:
+        try:
+            module.register()
+        except ValueError:
+            # 已作为插件启用
+            pass
+
+def run_operator(op, **kwargs):
+    result = op(**kwargs)
+    if 'FINISHED' not in result:
+        raise RuntimeError(f"{op.idname_py()} returned {result}")
+
+class StageTimer:
+    """记录每个阶段的耗时与处理数量 (带单位)"""
+    def __init__(self):
+        self.stages = []
+
+    def run(self, name, func, *args):
+        log(f"{name} ...")
+        t0 = time.perf_counter()
+        counts = func(*args) or {}
+        elapsed = time.perf_counter() - t0
+        self.stages.append({"stage": name, "seconds": round(elapsed, 3), **counts})
+        detail = ", ".join(f"{v} {k}" for k, v in counts.items())
+        log(f"{name}: {elapsed:.2f}s" + (f" ({detail})" if detail else ""))
+
+    def summary(self):
+        total = sum(s["seconds"] for s in self.stages)
+        log(f"total: {total:.2f}s")
+        return {"stages": self.stages, "total_seconds": round(total, 3)}
+
+# --- 各阶段 ---
+
+def stage_prepare(config):
+    base = config.get("base_blend")
+    if base:
+        bpy.ops.wm.open_mainfile(filepath=base)
+    else:
+        bpy.ops.wm.read_factory_settings(use_empty=True)
+    register_addons()
+
+def stage_import(config):
+    props = bpy.context.scene.mixamo_fix_import_properties
+    props.mixamo_import_folder = config["folder"]
+    props.bone_name_prefix_to_remove = config.get("prefix", "mixamorig:")
+    props.fast_anim_import = bool(config.get("fast_anim_import", False))
+    props.prefetch_depth = int(config.get("prefetch", 4))
+    resample_options = config.get("resample") or {}
+    props.target_fps = resample_options.get("target_fps") or 0
+    # 导入的动作按文件自身帧率记录；source_fps 只是没有记录帧率时的默认值
+    props.source_fps = float(resample_options.get("source_fps", 30.0))
+    files = [f for f in os.listdir(config["folder"]) if f.lower().endswith(".fbx")]
+    actions_before = len(bpy.data.actions)
+    # "import" 是关键字，只能 getattr
+    run_operator(getattr(bpy.ops, "import").mixamo_fbx)
+    return {"files": len(files), "actions": len(bpy.data.actions) - actions_before}
+
+def target_armature_name(config):
+    name = config.get("target_armature")
+    if not name:
+        armature = next((o for o in bpy.context.scene.objects if o.type == 'ARMATURE'), None)
+        if armature is None:
+            raise RuntimeError("No armature found after import")
+        name = armature.name
+    return name
+
+def stage_transfer_settings(config):
+    rules = config.get("transfer", [])
+    matched = 0
+    auto = []
+    for action in bpy.data.actions:
+        name = action.name.lower()
+        for rule in rules:
+            if fnmatch.fnmatchcase(name, rule.get("pattern", "*").lower()):
+                if rule.get("mode", "XZ") == "AUTO":
+                    auto.append(action)
+                else:
+                    action.transfer_mode = rule.get("mode", "XZ")
+                    action.transfer_rotation = bool(rule.get("rotation", False))
+                matched += 1
+                break
+    if not auto:
+        return {"actions": matched}
+    render = bpy.context.scene.render
+    armature = bpy.data.objects[target_armature_name(config)]
+    results = root_motion.classify_all(auto, armature, render.fps / render.fps_base)
+    review = sum(1 for _a, _m, _r, score, _s in results if score < root_motion.REVIEW_CONFIDENCE)
+    return {"actions": matched, "classified": len(results), "low confidence": review}
+
+def stage_root_motion(config):
+    bpy.context.scene.target_armature = target_armature_name(config)
+    # 只有要做轨迹校验时才记录转移前快照
+    bpy.context.scene.record_trajectory = bool(config.get("verify"))
+    frames = sum(int(a.frame_range[1] - a.frame_range[0]) + 1 for a in bpy.data.actions)
+    run_operator(bpy.ops.object.apply_transfer)
+    return {"actions": len(bpy.data.actions), "frames": frames}
+
+def stage_verify(config):
+    options = config.get("verify")
+    if not options:
+        return {"skipped": 1}
+    armature = bpy.data.objects[bpy.context.scene.target_armature]
+    results = root_motion.verify_all(bpy.data.actions, armature,
+                                     options.get("position_tolerance", 0.01),
+                                     math.radians(options.get("heading_tolerance", 2.0)))
+    flagged = [(action, r) for action, r in results if not r["ok"]]
+    for action, r in flagged:
+        log(f"  drift {action.name}: position {r['position']:.4f}, "
+            f"heading {math.degrees(r['heading']):.2f} deg (frame {r['frame']:.0f})")
+    if flagged and options.get("fail"):
+        raise RuntimeError(f"{len(flagged)} actions exceed the trajectory tolerance")
+    return {"actions": len(results), "flagged": len(flagged)}
+
+def stage_sidecar(config):
+    options = config.get("sidecar") or {}
+    if not options.get("dir"):
+        return {"skipped": 1}
+    scene = bpy.context.scene
+    armature = bpy.data.objects.get(scene.target_armature or "")
+    written = root_motion.write_sidecars(os.path.abspath(options["dir"]), armature,
+                                         scene.render.fps / scene.render.fps_base)
+    return {"actions": len(written)}
+
+def stage_retarget(config):
+    options = config.get("retarget") or {}
+    if not options.get("rig"):
+        return {"skipped": 1}
+    target = bpy.data.objects.get(options["rig"])
+    if target is None or target.type != 'ARMATURE':
+        raise RuntimeError(f"Retarget rig not found: {options['rig']!r}")
+    source = bpy.data.objects[bpy.context.scene.target_armature]
+    bone_map = retarget.load_bone_map(options["bone_map"], config.get("prefix", "mixamorig:"))
+    target_rest = retarget.rest_from_json(options["rest_json"]) if options.get("rest_json") else None
+    results = mixamo_import.retarget_all(source, target, bone_map, target_rest, options.get("suffix", "_retarget"))
+    return {"actions": len(results)}
+
+def stage_cleanup(config):
+    options = config.get("cleanup", {})
+    if not options.get("enabled", True):
+        return {"skipped": 1}
+    ids_before = sum(len(c) for c in (bpy.data.meshes, bpy.data.materials, bpy.data.armatures,
+                                      bpy.data.actions, bpy.data.images, bpy.data.node_groups))
+    run_operator(bpy.ops.object.cleanup_unused_data, purge_orphans=options.get("purge_orphans", True))
+    ids_after = sum(len(c) for c in (bpy.data.meshes, bpy.data.materials, bpy.data.armatures,
+                                     bpy.data.actions, bpy.data.images, bpy.data.node_groups))
+    return {"ids removed": ids_before - ids_after}
+
+def stage_library(config):
+    options = config.get("library") or {}
+    if not options.get("dir"):
+        return {"skipped": 1}
+    actions = [a for a in bpy.data.actions if not a.library]
+    result = library.shard_actions(actions, options["dir"], options.get("mode", "FOLDER"))
+    return {"shards written": result["shards_written"], "shards unchanged": result["shards_skipped"],
+            "actions": result["actions"]}
+
+def stage_save(config):
+    output = os.path.abspath(config["output"])
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    bpy.ops.wm.save_as_mainfile(filepath=output, compress=config.get("compress", True))
+    result = {"bytes": os.path.getsize(output)}
+    options = config.get("retarget") or {}
+    if options.get("rig"):
+        # 重定向结果没有对象使用，靠伪用户才能撑过清理阶段；这里报告实际存进文件的数量
+        suffix = options.get("suffix", "_retarget")
+        result["retarget actions saved"] = sum(1 for a in bpy.data.actions if a.name.endswith(suffix))
+    return result
+
+def main():
+    args = parse_args()
+    config = load_config(args.config)
+    if args.output:
+        config["output"] = args.output
+    validate_config(config)
+    if config.get("profile"):
+        pstats_dir = config.get("pstats_dir") or ""
+        profiling.enable(True, cprofile=bool(pstats_dir), pstats_dir=pstats_dir)
+
+    timer = StageTimer()
+    timer.run("prepare", stage_prepare, config)
+    timer.run("import", stage_import, config)
+    timer.run("transfer settings", stage_transfer_settings, config)
+    timer.run("root motion", stage_root_motion, config)
+    timer.run("verify", stage_verify, config)
+    timer.run("sidecar", stage_sidecar, config)
+    timer.run("retarget", stage_retarget, config)
+    timer.run("cleanup", stage_cleanup, config)
+    timer.run("library", stage_library, config)
+    timer.run("save", stage_save, config)
+    summary = timer.summary()
+
+    if config.get("timings_json"):
+        with open(config["timings_json"], "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        traceback.print_exc()
+        log(f"FAILED: {e}")
+        sys.exit(1)
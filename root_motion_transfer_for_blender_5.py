@@ -7,56 +7,45 @@ bl_info = {
     "description": "Restores the specific local-rotation logic from the 4.2 version, adapted for Blender 5.0 API.",
 }
 
+import os
 import bpy
-import mathutils
-
-# --- 核心辅助函数：兼容 Blender 5.0 ---
-
-def get_all_fcurves(action):
-    """兼容 Blender 5.0 的 F-Curve 获取器"""
-    if hasattr(action, "fcurves"):
-        for fc in action.fcurves: yield fc
-        return
-    if hasattr(action, "layers"):
-        for layer in action.layers:
-            for strip in layer.strips:
-                if hasattr(strip, "channelbags"):
-                    for channelbag in strip.channelbags:
-                        for fc in channelbag.fcurves: yield fc
-
-def find_fcurve_compat(action, data_path, index):
-    for fc in get_all_fcurves(action):
-        if fc.data_path == data_path and fc.array_index == index:
-            return fc
-    return None
-
-def get_or_create_fcurve(obj, action, data_path, index, group_name="Root"):
-    fc = find_fcurve_compat(action, data_path, index)
-    if fc: return fc
-    try:
-        obj.keyframe_insert(data_path=data_path, index=index, frame=0, group=group_name)
-    except Exception as e:
-        print(f"Error creating fcurve: {e}")
-        return None
-    return find_fcurve_compat(action, data_path, index)
+import time
+import numpy as np
+
+from mixamo_core import animdata, checkpoint, locomotion, profiling, quat, quantize, sidecar, trajectory
+
+# 低于此置信度的自动分类结果在面板中标记，需人工确认
+REVIEW_CONFIDENCE = 0.75
+
+# --- 核心辅助函数：基于 mixamo_core 的批量读写 ---
 
 def transfer_keyframes(source_fcurve, target_fcurve):
     if source_fcurve and target_fcurve:
-        target_fcurve.keyframe_points.clear()
-        for keyframe in source_fcurve.keyframe_points:
-            target_fcurve.keyframe_points.insert(keyframe.co.x, keyframe.co.y, options={'FAST'})
+        co = animdata.read_curve(source_fcurve)
+        with profiling.stage("keyframe writes", len(co), "keys"):
+            animdata.write_curve(target_fcurve, co[:, 0], co[:, 1])
 
 def zero_out_keyframes(fcurve):
     if fcurve:
-        for keyframe in fcurve.keyframe_points:
-            keyframe.co[1] = 0
-
-def insert_quaternion_keyframes(obj, action, bone_name, group_name, frame, quaternion):
-    base_path = f'pose.bones["{bone_name}"].rotation_quaternion'
-    for i in range(4):
-        fcurve = get_or_create_fcurve(obj, action, base_path, i, group_name)
-        if fcurve:
-            fcurve.keyframe_points.insert(frame, quaternion[i], options={'FAST'})
+        animdata.transform_values(fcurve, scale=0.0)
+
+def fill_constant(fcurve, frames, value):
+    """逐帧写入常量 (同帧旧关键帧被替换，等价于逐帧 insert)"""
+    with profiling.stage("keyframe writes", len(frames), "keys"):
+        animdata.merge_keys(fcurve, frames, np.full(len(frames), value, dtype=np.float32))
+
+def read_bone_quaternions(curves, pose_bone, frames):
+    """(F, 4) 的局部旋转；没有曲线的分量取当前姿态值"""
+    fcurves = curves.bone(pose_bone.name, "rotation_quaternion", 4)
+    current = pose_bone.rotation_quaternion
+    columns = [animdata.evaluate_curve(fc, frames) if fc else np.full(len(frames), current[i], dtype=np.float32)
+               for i, fc in enumerate(fcurves)]
+    return np.stack(columns, axis=1).astype(np.float64)
+
+def write_bone_quaternions(curves, bone_name, group_name, frames, quaternions):
+    with profiling.stage("keyframe writes", 4 * len(frames), "keys"):
+        for i, fc in enumerate(curves.ensure_bone(bone_name, "rotation_quaternion", 4, group_name)):
+            animdata.merge_keys(fc, frames, quaternions[:, i])
 
 # --- 核心逻辑：完全复刻 4.2 版本算法 ---
 
@@ -67,20 +56,15 @@ def transfer_motion_all_axes(hips_fcurves, root_fcurves, action):
         frame_1_value = hips_fcurves[1].evaluate(1)
 
     if hips_fcurves[1] and frame_1_value < 0:
-        for keyframe in hips_fcurves[1].keyframe_points:
-            keyframe.co[1] -= frame_1_value
-        hips_fcurves[1].update()
+        animdata.transform_values(hips_fcurves[1], offset=-frame_1_value)
 
     for i in range(3):
         if hips_fcurves[i] and root_fcurves[i]:
             transfer_keyframes(hips_fcurves[i], root_fcurves[i])
 
     if hips_fcurves[1]:
-        frame_start, frame_end = action.frame_range
-        for frame in range(int(frame_start), int(frame_end) + 1):
-            val = frame_1_value if frame_1_value < 0 else 0
-            hips_fcurves[1].keyframe_points.insert(frame, val, options={'FAST'})
-        hips_fcurves[1].update()
+        val = frame_1_value if frame_1_value < 0 else 0
+        fill_constant(hips_fcurves[1], animdata.frame_numbers(action), val)
 
 def transfer_motion_xz_axes(hips_fcurves, root_fcurves, action):
     """仅 XZ 轴转移"""
@@ -89,76 +73,43 @@ def transfer_motion_xz_axes(hips_fcurves, root_fcurves, action):
             transfer_keyframes(hips_fcurves[i], root_fcurves[i])
 
     if root_fcurves[1]: 
-        frame_start, frame_end = action.frame_range
-        for frame in range(int(frame_start), int(frame_end) + 1):
-            root_fcurves[1].keyframe_points.insert(frame, 0, options={'FAST'})
+        fill_constant(root_fcurves[1], animdata.frame_numbers(action), 0.0)
 
 def fill_root_location_with_zero(root_fcurves, action):
-    frame_start, frame_end = action.frame_range
+    frames = animdata.frame_numbers(action)
     for i in range(3):
         if root_fcurves[i]:
-            for frame in range(int(frame_start), int(frame_end) + 1):
-                root_fcurves[i].keyframe_points.insert(frame, 0, options={'FAST'})
-            root_fcurves[i].update()
+            fill_constant(root_fcurves[i], frames, 0.0)
 
-def transfer_y_rotation_legacy_logic(obj, hips_bone, root_bone, action):
+def transfer_y_rotation_legacy_logic(obj, hips_bone, root_bone, action, curves=None):
     """
     【复刻版逻辑】
     使用原 4.2 插件的 '局部 Y 轴提取' + '强制恢复 X/Z 分量' 逻辑。
     这对于 Mixamo 骨骼是最稳定的。
+    Hips 局部旋转直接从曲线读取，所有帧一次性向量化计算，不再逐帧 frame_set。
     """
+    curves = curves or animdata.FCurveIndex(action, obj)
+    frames = animdata.frame_numbers(action)
+
+    # 读取 Hips 的局部旋转 (注意：不是 Matrix/World)，以及第一帧作为基准
+    with profiling.stage("read hips rotation", len(frames), "frames"):
+        hips_original = read_bone_quaternions(curves, hips_bone, frames)
+        hips_initial = read_bone_quaternions(curves, hips_bone, np.array([1.0], dtype=np.float32))[0]
+
+    with profiling.stage("quaternion split", len(frames), "frames"):
+        # 1. 提取 Y 轴旋转 (Heading) 给 Root：假设 Hips 的局部 Y 轴是垂直轴 (Mixamo 标准)，
+        #    仅保留 W 和 Y 分量
+        # 2. Hips_New = Hips_Old * Root_Inv
+        # 3. 【关键步骤】强制恢复 Hips 的 X 和 Z 倾斜度，防止“躺平”或“乱飘”
+        root_new, hips_new = quat.split_heading(hips_original, hips_initial)
+
+    # 4. 批量写入 Root 与 Hips
+    write_bone_quaternions(curves, root_bone.name, "Root", frames, root_new)
+    write_bone_quaternions(curves, hips_bone.name, "Hips", frames, hips_new)
+
+    # 刷新姿态
     scene = bpy.context.scene
-    view_layer = bpy.context.view_layer
-    
-    original_frame = scene.frame_current
-    frame_start, frame_end = map(int, action.frame_range)
-
-    # 1. 获取第一帧的初始状态 (作为基准)
-    scene.frame_set(1)
-    view_layer.update() # Blender 5.0 必需
-    
-    # 获取 Local Rotation (注意：不是 Matrix/World)
-    hips_initial_quaternion = hips_bone.rotation_quaternion.copy()
-
-    for frame in range(frame_start, frame_end + 1):
-        scene.frame_set(frame)
-        view_layer.update() # 每一帧强制更新
-
-        # 读取当前 Hips 的局部旋转
-        hips_original_quaternion = hips_bone.rotation_quaternion.copy()
-        
-        # --- 核心复刻开始 ---
-        
-        # 1. 提取 Y 轴旋转 (Heading) 给 Root
-        # 假设 Hips 的局部 Y 轴是垂直轴 (Mixamo 标准)
-        # 仅保留 W 和 Y 分量，强制 X 和 Z 为 0
-        root_new_quaternion = mathutils.Quaternion((
-            hips_original_quaternion.w, 
-            0, 
-            hips_original_quaternion.y, 
-            0
-        )).normalized()
-
-        # 2. 应用给 Root
-        root_bone.rotation_quaternion = root_new_quaternion
-        insert_quaternion_keyframes(obj, action, "Root", "Root", frame, root_new_quaternion)
-
-        # 3. 计算 Hips 的新局部旋转 (逆运算)
-        # Hips_New = Hips_Old * Root_Inv
-        hips_new_quaternion = (hips_original_quaternion @ root_new_quaternion.inverted()).normalized()
-
-        # 4. 【关键步骤】强制恢复 Hips 的 X 和 Z 倾斜度
-        # 这就是防止“躺平”或“乱飘”的硬逻辑
-        hips_new_quaternion.x = hips_initial_quaternion.x
-        hips_new_quaternion.z = hips_initial_quaternion.z
-        
-        # --- 核心复刻结束 ---
-
-        # 5. 应用给 Hips
-        hips_bone.rotation_quaternion = hips_new_quaternion
-        insert_quaternion_keyframes(obj, action, "Hips", "Hips", frame, hips_new_quaternion)
-
-    scene.frame_set(original_frame)
+    scene.frame_set(scene.frame_current)
 
 # --- 操作符与 UI ---
 
@@ -188,75 +139,492 @@ def add_root_bone(armature, operator):
     bpy.ops.object.mode_set(mode='OBJECT')
     return True
 
+def transfer_action(armature, action, record_trajectory=False):
+    """
+    对一个动作做完整的 Root Motion 转移，返回处理的帧数。
+    record_trajectory 时先把转移前的 Hips 轨迹存到动作上 (供 Verify Transfer 使用)。
+    """
+    animdata.assign_action(armature, action)
+    if record_trajectory:
+        with profiling.stage("trajectory snapshot", 1, "actions"):
+            trajectory.record(action, armature)
+    curves = animdata.FCurveIndex(action, armature)
+
+    hips_fcurves = curves.bone("Hips", "location")
+    root_fcurves = curves.ensure_bone("Root", "location", group_name="Root")
+
+    mode = action.transfer_mode
+    with profiling.stage("location transfer", 1, "actions"):
+        if mode == "XYZ":
+            transfer_motion_all_axes(hips_fcurves, root_fcurves, action)
+        elif mode == "XZ":
+            transfer_motion_xz_axes(hips_fcurves, root_fcurves, action)
+        elif mode == "NONE":
+            fill_root_location_with_zero(root_fcurves, action)
+
+        if mode in {"XZ", "XYZ"}:
+            for i in [0, 2]:
+                if hips_fcurves[i]:
+                    zero_out_keyframes(hips_fcurves[i])
+
+    frames = animdata.frame_numbers(action)
+    if action.transfer_rotation:
+        hips_bone = armature.pose.bones.get("Hips")
+        root_bone = armature.pose.bones.get("Root")
+        if hips_bone and root_bone:
+            # 使用复刻版逻辑
+            with profiling.stage("rotation transfer", 1, "actions"):
+                transfer_y_rotation_legacy_logic(armature, hips_bone, root_bone, action, curves)
+    else:
+        identity = np.zeros((len(frames), 4), dtype=np.float32)
+        identity[:, 0] = 1.0
+        with profiling.stage("keyframe writes", 4 * len(frames), "keys"):
+            for i, fc in enumerate(curves.ensure_bone("Root", "rotation_quaternion", 4, "Root")):
+                animdata.write_curve(fc, frames, identity[:, i])
+    return len(frames)
+
+def throughput_message(actions, frames, seconds):
+    seconds = max(seconds, 1e-6)
+    return (f"{actions} actions, {frames} frames in {seconds:.2f}s "
+            f"({actions / seconds:.1f} actions/s, {frames / seconds:.0f} frames/s)")
+
+# --- 模态执行的进度 (面板读取) ---
+
+class TransferProgress:
+    running = False
+    cancel_requested = False
+    total = 0
+    done = 0
+    frames = 0
+    current = ""
+    t0 = 0.0
+
+    @classmethod
+    def start(cls, total):
+        cls.running = True
+        cls.cancel_requested = False
+        cls.total = total
+        cls.done = 0
+        cls.frames = 0
+        cls.current = ""
+        cls.t0 = time.perf_counter()
+
+    @classmethod
+    def elapsed(cls):
+        return time.perf_counter() - cls.t0
+
+    @classmethod
+    def eta(cls):
+        """按已完成动作的平均耗时估算剩余秒数 (还没有完成的动作时为 None)"""
+        if not cls.done:
+            return None
+        return cls.elapsed() / cls.done * (cls.total - cls.done)
+
+# 每次计时器触发最多处理这么久 (至少处理一个动作)，界面保持响应
+TICK_BUDGET = 0.1
+
 class ApplyTransferOperator(bpy.types.Operator):
+    """转移所有动作的 Root Motion。界面中以模态运行：显示进度，Esc 取消 (已处理的动作保留)"""
     bl_idname = "object.apply_transfer"
     bl_label = "Apply Transfer"
     bl_options = {'REGISTER', 'UNDO'}
 
-    def execute(self, context):
+    _timer = None
+    _run = None
+
+    def prepare(self, context):
         target_armature_name = context.scene.target_armature
         armature = bpy.data.objects.get(target_armature_name)
 
         if not armature or armature.type != 'ARMATURE':
             self.report({'ERROR'}, "请选择有效的骨架对象。")
-            return {'CANCELLED'}
+            return None
         
         if armature.name not in context.view_layer.objects:
              self.report({'ERROR'}, "目标骨架必须在当前可见层中。")
-             return {'CANCELLED'}
+             return None
              
         context.view_layer.objects.active = armature
         armature.select_set(True)
 
         bpy.ops.object.mode_set(mode='OBJECT')
 
-        if not add_root_bone(armature, self):
+        with profiling.stage("add_root_bone"):
+            if not add_root_bone(armature, self):
+                return None
+        return armature
+
+    # --- 阻塞执行 (脚本 / 无界面流水线) ---
+
+    def execute(self, context):
+        with profiling.run("Apply Transfer"):
+            return self.transfer_all(context)
+
+    def transfer_all(self, context):
+        armature = self.prepare(context)
+        if armature is None:
             return {'CANCELLED'}
 
-        for action in bpy.data.actions:
-            armature.animation_data.action = action
-            context.view_layer.update()
-
-            hips_path_base = 'pose.bones["Hips"].location'
-            hips_fcurves = [find_fcurve_compat(action, hips_path_base, i) for i in range(3)]
-            
-            root_path_base = 'pose.bones["Root"].location'
-            root_fcurves = [None] * 3
-            for i in range(3):
-                root_fcurves[i] = get_or_create_fcurve(armature, action, root_path_base, i, "Root")
-
-            mode = action.transfer_mode
-            if mode == "XYZ":
-                transfer_motion_all_axes(hips_fcurves, root_fcurves, action)
-            elif mode == "XZ":
-                transfer_motion_xz_axes(hips_fcurves, root_fcurves, action)
-            elif mode == "NONE":
-                fill_root_location_with_zero(root_fcurves, action)
-
-            if mode in {"XZ", "XYZ"}:
-                for i in [0, 2]:
-                    if hips_fcurves[i]:
-                        zero_out_keyframes(hips_fcurves[i])
-
-            if action.transfer_rotation:
-                hips_bone = armature.pose.bones.get("Hips")
-                root_bone = armature.pose.bones.get("Root")
-                if hips_bone and root_bone:
-                    # 使用复刻版逻辑
-                    transfer_y_rotation_legacy_logic(armature, hips_bone, root_bone, action)
-            else:
-                frame_start, frame_end = action.frame_range
-                root_rot_path = 'pose.bones["Root"].rotation_quaternion'
-                for i in range(4):
-                    fc = find_fcurve_compat(action, root_rot_path, i)
-                    if fc: fc.keyframe_points.clear()
-                
-                for frame in range(int(frame_start), int(frame_end) + 1):
-                    insert_quaternion_keyframes(armature, action, "Root", "Root", frame, (1, 0, 0, 0))
+        t0 = time.perf_counter()
+        frames = 0
+        # 链接的库动作只读，跳过
+        actions = [a for a in bpy.data.actions if not a.library]
+        for action in actions:
+            frames += transfer_action(armature, action, context.scene.record_trajectory)
+        print(f"[Root Motion] {throughput_message(len(actions), frames, time.perf_counter() - t0)}")
 
         self.report({'INFO'}, "动作转移完成 (Legacy Logic Restored)。")
         return {'FINISHED'}
 
+    # --- 模态执行 (界面) ---
+
+    def invoke(self, context, event):
+        if TransferProgress.running:
+            self.report({'WARNING'}, "Apply Transfer 正在运行。")
+            return {'CANCELLED'}
+        # profiling 的 run 跨越所有计时器回调，结束时打印一次汇总
+        self._run = profiling.run("Apply Transfer")
+        self._run.__enter__()
+        self.armature_name = ""
+        armature = self.prepare(context)
+        if armature is None:
+            self._run.__exit__(None, None, None)
+            return {'CANCELLED'}
+        self.armature_name = armature.name
+        # 保存名字而不是引用：模态期间动作可能被删除；链接的库动作只读，跳过
+        self.pending = [a.name for a in bpy.data.actions if not a.library]
+        TransferProgress.start(len(self.pending))
+
+        wm = context.window_manager
+        wm.progress_begin(0, max(len(self.pending), 1))
+        self._timer = wm.event_timer_add(0.01, window=context.window)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            TransferProgress.cancel_requested = True
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        armature = bpy.data.objects.get(self.armature_name)
+        if armature is None:
+            TransferProgress.cancel_requested = True
+
+        tick_start = time.perf_counter()
+        try:
+            while self.pending and not TransferProgress.cancel_requested:
+                action = bpy.data.actions.get(self.pending.pop(0))
+                if action is not None and not action.library:
+                    TransferProgress.current = action.name
+                    TransferProgress.frames += transfer_action(armature, action,
+                                                               context.scene.record_trajectory)
+                TransferProgress.done += 1
+                if time.perf_counter() - tick_start >= TICK_BUDGET:
+                    break
+        except Exception:
+            # 出错的动作之前的结果保留，计时器与进度状态必须清理
+            TransferProgress.cancel_requested = True
+            self.finish(context)
+            raise
+
+        context.window_manager.progress_update(TransferProgress.done)
+        for area in context.screen.areas if context.screen else ():
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+        if self.pending and not TransferProgress.cancel_requested:
+            return {'RUNNING_MODAL'}
+        return self.finish(context)
+
+    def finish(self, context):
+        wm = context.window_manager
+        wm.event_timer_remove(self._timer)
+        wm.progress_end()
+        TransferProgress.running = False
+        self._run.__exit__(None, None, None)
+
+        summary = throughput_message(TransferProgress.done, TransferProgress.frames, TransferProgress.elapsed())
+        print(f"[Root Motion] {summary}")
+        # 取消时已处理的动作是完整的，返回 FINISHED 让撤销记录这个部分结果
+        if TransferProgress.cancel_requested:
+            self.report({'WARNING'}, f"已取消：完成 {TransferProgress.done}/{TransferProgress.total}，{summary}")
+        else:
+            self.report({'INFO'}, f"动作转移完成 (Legacy Logic Restored)。{summary}")
+        return {'FINISHED'}
+
+class ApplyTransferCheckpointOperator(ApplyTransferOperator):
+    """Apply Transfer 的检查点变体：先压缩另存一份检查点 .blend，不压入撤销栈"""
+    bl_idname = "object.apply_transfer_checkpoint"
+    bl_label = "Apply Transfer (Checkpoint)"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        if checkpoint.save("apply_transfer", self) is None:
+            return {'CANCELLED'}
+        return super().execute(context)
+
+    def invoke(self, context, event):
+        if TransferProgress.running:
+            return super().invoke(context, event)
+        if checkpoint.save("apply_transfer", self) is None:
+            return {'CANCELLED'}
+        return super().invoke(context, event)
+
+class CancelTransferOperator(bpy.types.Operator):
+    """在当前动作处理完后停止 Apply Transfer"""
+    bl_idname = "object.cancel_transfer"
+    bl_label = "Cancel Transfer"
+
+    @classmethod
+    def poll(cls, context):
+        return TransferProgress.running
+
+    def execute(self, context):
+        TransferProgress.cancel_requested = True
+        return {'FINISHED'}
+
+def hips_rest_height(armature):
+    """Hips 静止高度 (分类统计量的长度单位)"""
+    hips = armature.data.bones.get("Hips") if armature else None
+    if hips is None:
+        return 1.0
+    height = abs(hips.head_local[2]) or hips.head_local.length
+    return height if height > 1e-6 else 1.0
+
+# classify_all 写入结果期间为 True，此时 transfer_mode / transfer_rotation 的 update 不清零置信度
+_classifying = False
+
+def reset_confidence(self, context):
+    """手动修改 Mode / Rotation 后，自动分类的置信度不再适用"""
+    if not _classifying and self.transfer_confidence:
+        self.transfer_confidence = 0.0
+
+def classify_all(actions, armature=None, fps=30.0):
+    """整个动作库一次分类，写入 transfer_mode / transfer_rotation / transfer_confidence"""
+    global _classifying
+    results = locomotion.classify_actions([a for a in actions if not a.library], armature,
+                                          hips_rest_height(armature), fps)
+    _classifying = True
+    try:
+        for action, mode, rotation, score, _stats in results:
+            action.transfer_mode = mode
+            action.transfer_rotation = rotation
+            action.transfer_confidence = score
+    finally:
+        _classifying = False
+    return results
+
+class ClassifyTransferOperator(bpy.types.Operator):
+    """根据 Hips 位移 / 速度 / 朝向变化自动设置每个动作的 Transfer Mode 与 Rotation"""
+    bl_idname = "object.classify_transfer"
+    bl_label = "Auto Classify"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        armature = bpy.data.objects.get(context.scene.target_armature or "")
+        if armature is not None and armature.type != 'ARMATURE':
+            armature = None
+        with profiling.run("Auto Classify"):
+            with profiling.stage("classify", len(bpy.data.actions), "actions"):
+                results = classify_all(bpy.data.actions, armature,
+                                       context.scene.render.fps / context.scene.render.fps_base)
+
+        if not results:
+            self.report({'WARNING'}, "没有找到带 Hips 曲线的动作。")
+            return {'CANCELLED'}
+        review = sum(1 for _a, _m, _r, score, _s in results if score < REVIEW_CONFIDENCE)
+        self.report({'INFO'}, f"Classified {len(results)} actions; {review} 个置信度低于 {REVIEW_CONFIDENCE:.2f}，请检查。")
+        return {'FINISHED'}
+
+class ExportCompressedOperator(bpy.types.Operator):
+    """把每个动作的 Root / Hips 轨道量化压缩写成 .mxqa 二进制 (smallest-three 旋转 + 16 位定点位移)"""
+    bl_idname = "object.export_compressed_root_motion"
+    bl_label = "Export Compressed"
+
+    directory: bpy.props.StringProperty(name="Output Folder", subtype='DIR_PATH')
+    bones: bpy.props.StringProperty(
+        name="Bones",
+        description="要导出的骨骼 (逗号分隔)",
+        default=",".join(quantize.DEFAULT_BONES),
+    )
+    max_rotation_error: bpy.props.FloatProperty(
+        name="Max Rotation Error",
+        description="解码后允许的最大旋转误差 (度)，超过的轨道改存 float32",
+        default=0.01, min=0.0, precision=4,
+    )
+    max_translation_error: bpy.props.FloatProperty(
+        name="Max Translation Error",
+        description="解码后允许的最大位移误差 (场景单位)，超过的轨道改存 float32",
+        default=0.0005, min=0.0, precision=5,
+    )
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        if not self.directory:
+            self.report({'ERROR'}, "请选择输出目录。")
+            return {'CANCELLED'}
+        os.makedirs(self.directory, exist_ok=True)
+        armature = bpy.data.objects.get(context.scene.target_armature or "")
+        bones = tuple(b.strip() for b in self.bones.split(",") if b.strip())
+        fps = context.scene.render.fps / context.scene.render.fps_base
+        bounds = {"max_rotation_error": np.radians(self.max_rotation_error),
+                  "max_translation_error": self.max_translation_error}
+
+        raw_total = packed_total = 0
+        written = fallbacks = 0
+        with profiling.run("Export Compressed"):
+            with profiling.stage("quantize", len(bpy.data.actions), "actions"):
+                for action, path in output_paths(self.directory, bpy.data.actions, ".mxqa"):
+                    result = quantize.compress_action(action, path, bones, armature, fps, **bounds)
+                    if not result["tracks"]:
+                        os.remove(path)
+                        continue
+                    written += 1
+                    raw_total += result["raw_bytes"]
+                    packed_total += result["bytes"]
+                    fallbacks += len(result["fallbacks"])
+                    print(f"[quantize] {action.name}: {result['raw_bytes']} -> {result['bytes']} bytes "
+                          f"({result['bytes'] / result['raw_bytes']:.0%}), "
+                          f"rot {np.degrees(result['max_rotation_error']):.5f}°, "
+                          f"loc {result['max_translation_error']:.6f}"
+                          + (f", float32: {', '.join(result['fallbacks'])}" if result["fallbacks"] else ""))
+
+        if not written:
+            self.report({'WARNING'}, f"没有动作包含 {', '.join(bones)} 的曲线。")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Exported {written} clips, {raw_total / 1024:.1f} KB -> {packed_total / 1024:.1f} KB "
+                              f"({packed_total / raw_total:.0%})；{fallbacks} 条轨道超出误差上限，存为 float32。")
+        return {'FINISHED'}
+
+def output_paths(folder, actions, extension):
+    """
+    本地动作 -> 输出文件路径 [(action, path)]。clean_name 会把不同的名字清洗成相同的文件名
+    ("Walk Left" 与 "Walk_Left")，重名 (不区分大小写) 时按动作名顺序依次加 _2、_3 后缀。
+    """
+    used = set()
+    paths = []
+    for action in sorted((a for a in actions if not a.library), key=lambda a: a.name):
+        base = bpy.path.clean_name(action.name)
+        stem, n = base, 1
+        while stem.lower() in used:
+            n += 1
+            stem = f"{base}_{n}"
+        used.add(stem.lower())
+        paths.append((action, os.path.join(folder, stem + extension)))
+    return paths
+
+def write_sidecars(folder, armature=None, fps=30.0):
+    """为每个已转移 (有 Root 位移曲线) 的本地动作写 .rmtrack，返回 [(action, header)]"""
+    os.makedirs(folder, exist_ok=True)
+    written = []
+    with profiling.stage("sidecar tracks", len(bpy.data.actions), "actions"):
+        for action, path in output_paths(folder, bpy.data.actions, sidecar.EXTENSION):
+            header = sidecar.write_action(action, path, armature, fps)
+            if header is not None:
+                written.append((action, header))
+    return written
+
+class ExportSidecarOperator(bpy.types.Operator):
+    """为每个动作写 Root Motion 附属轨道 (.rmtrack)：逐帧位移 / 朝向增量、总位移与平均速度，可直接内存映射"""
+    bl_idname = "object.export_root_motion_sidecar"
+    bl_label = "Export Root Motion Tracks"
+
+    directory: bpy.props.StringProperty(name="Output Folder", subtype='DIR_PATH')
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        if not self.directory:
+            self.report({'ERROR'}, "请选择输出目录。")
+            return {'CANCELLED'}
+        armature = bpy.data.objects.get(context.scene.target_armature or "")
+        fps = context.scene.render.fps / context.scene.render.fps_base
+        with profiling.run("Export Root Motion Tracks"):
+            written = write_sidecars(self.directory, armature, fps)
+
+        if not written:
+            self.report({'WARNING'}, "没有动作包含 Root 位移曲线，请先 Apply Transfer。")
+            return {'CANCELLED'}
+        for action, header in written:
+            print(f"[sidecar] {action.name}: {header['frames']} frames, distance {header['distance']:.3f}, "
+                  f"{header['average_speed']:.3f}/s, yaw {np.degrees(header['total_yaw']):.1f}°")
+        self.report({'INFO'}, f"Wrote {len(written)} root motion tracks to {self.directory}")
+        return {'FINISHED'}
+
+def verify_all(actions, armature, position_tolerance=trajectory.POSITION_TOLERANCE,
+               heading_tolerance=trajectory.HEADING_TOLERANCE):
+    """
+    比较每个动作转移前后的 Hips 世界轨迹，返回 [(action, result)] (没有转移前快照的动作跳过)。
+    比较完删除快照，逐帧数据不留在 .blend 与撤销步骤里。
+    """
+    results = []
+    with profiling.stage("verify trajectory", len(actions), "actions"):
+        for action in actions:
+            if action.library:
+                continue
+            result = trajectory.verify(action, armature, position_tolerance, heading_tolerance)
+            if result is not None:
+                results.append((action, result))
+                trajectory.discard(action)
+    return results
+
+class VerifyTransferOperator(bpy.types.Operator):
+    """比较转移前后 Hips 的世界位置与朝向，列出偏差超过容差的动作"""
+    bl_idname = "object.verify_transfer"
+    bl_label = "Verify Transfer"
+
+    position_tolerance: bpy.props.FloatProperty(
+        name="Position Tolerance",
+        description="Hips 世界位置允许的最大偏差",
+        default=trajectory.POSITION_TOLERANCE, min=0.0, subtype='DISTANCE',
+    )
+    heading_tolerance: bpy.props.FloatProperty(
+        name="Heading Tolerance",
+        description="Hips 朝向允许的最大偏差 (度)",
+        default=np.degrees(trajectory.HEADING_TOLERANCE), min=0.0,
+    )
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        armature = bpy.data.objects.get(context.scene.target_armature or "")
+        if armature is None or armature.type != 'ARMATURE':
+            self.report({'ERROR'}, "请先选择目标骨架。")
+            return {'CANCELLED'}
+        with profiling.run("Verify Transfer"):
+            results = verify_all(bpy.data.actions, armature, self.position_tolerance,
+                                 np.radians(self.heading_tolerance))
+
+        if not results:
+            self.report({'WARNING'}, "没有动作记录了转移前的轨迹，请勾选 Record Trajectory 后 Apply Transfer。")
+            return {'CANCELLED'}
+        flagged = [(action, r) for action, r in results if not r["ok"]]
+        for action, r in flagged:
+            print(f"[verify] {action.name}: position {r['position']:.4f}, heading {np.degrees(r['heading']):.2f}° "
+                  f"(frame {r['frame']:.0f})")
+        if flagged:
+            names = ", ".join(action.name for action, _r in flagged[:5]) + (" ..." if len(flagged) > 5 else "")
+            self.report({'WARNING'}, f"{len(flagged)} / {len(results)} 个动作偏差超过容差: {names}")
+        else:
+            self.report({'INFO'}, f"Verified {len(results)} actions, 全部在容差内。")
+        return {'FINISHED'}
+
+def draw_progress(layout):
+    box = layout.box()
+    done, total = TransferProgress.done, TransferProgress.total
+    box.progress(factor=done / max(total, 1), type='BAR', text=f"{done} / {total}")
+    eta = TransferProgress.eta()
+    box.label(text=TransferProgress.current or "...", icon='ACTION')
+    box.label(text=f"ETA {eta:.0f}s" if eta is not None else "ETA ...", icon='TIME')
+    box.operator("object.cancel_transfer", text="Cancel", icon='CANCEL')
+
 class RootMotionPanel(bpy.types.Panel):
     bl_idname = "OBJECT_PT_root_motion"
     bl_label = "Root Motion Transfer"
@@ -281,17 +649,40 @@ class RootMotionPanel(bpy.types.Panel):
             box = layout.box()
             row = box.row()
             row.label(text=action.name, icon='ACTION')
+            if action.transfer_confidence > 0.0:
+                low = action.transfer_confidence < REVIEW_CONFIDENCE
+                row.label(text=f"{action.transfer_confidence:.0%}", icon='ERROR' if low else 'CHECKMARK')
             col = box.column(align=True)
             col.prop(action, "transfer_mode", text="Mode")
             col.prop(action, "transfer_rotation", text="Rotation")
 
         layout.separator()
-        layout.operator("object.apply_transfer", text="Apply Transfer", icon='POSE_HLT')
+        layout.operator("object.classify_transfer", text="Auto Classify", icon='VIEWZOOM')
+        if TransferProgress.running:
+            draw_progress(layout)
+        else:
+            layout.operator(checkpoint.operator_id(context, "object.apply_transfer"),
+                            text="Apply Transfer", icon='POSE_HLT')
+        row = layout.row(align=True)
+        row.prop(context.scene, "record_trajectory", text="Record Trajectory")
+        row.operator("object.verify_transfer", text="Verify Transfer", icon='CHECKMARK')
+        row = layout.row(align=True)
+        row.operator("object.export_compressed_root_motion", text="Export Compressed", icon='EXPORT')
+        row.operator("object.export_root_motion_sidecar", text="Export Tracks", icon='EXPORT')
+        checkpoint.draw_panel(layout, context)
+        profiling.draw_panel(layout, context, ("Apply Transfer", "Auto Classify", "Verify Transfer",
+                                                  "Export Compressed", "Export Root Motion Tracks"))
 
 # --- 注册 ---
 
 def register():
     bpy.utils.register_class(ApplyTransferOperator)
+    bpy.utils.register_class(ClassifyTransferOperator)
+    bpy.utils.register_class(ApplyTransferCheckpointOperator)
+    bpy.utils.register_class(CancelTransferOperator)
+    bpy.utils.register_class(VerifyTransferOperator)
+    bpy.utils.register_class(ExportCompressedOperator)
+    bpy.utils.register_class(ExportSidecarOperator)
     bpy.utils.register_class(RootMotionPanel)
     
     bpy.types.Scene.target_armature = bpy.props.EnumProperty(
@@ -299,6 +690,11 @@ def register():
         description="选择目标骨架",
         items=lambda self, context: [(obj.name, obj.name, "") for obj in bpy.data.objects if obj.type == 'ARMATURE'],
     )
+    bpy.types.Scene.record_trajectory = bpy.props.BoolProperty(
+        name="Record Trajectory",
+        description="Apply Transfer 前把每个动作的 Hips 世界轨迹存到动作上，供 Verify Transfer 比较 (比较后删除)",
+        default=False,
+    )
     
     bpy.types.Action.transfer_mode = bpy.props.EnumProperty(
         name="Transfer Mode",
@@ -309,23 +705,44 @@ def register():
             ('NONE', "No Transfer", "不转移位移"),
         ],
         default='XZ',
+        update=reset_confidence,
     )
     bpy.types.Action.transfer_rotation = bpy.props.BoolProperty(
         name="Transfer Rotation",
         description="是否转移 Z 轴 (Heading) 旋转",
         default=False,
+        update=reset_confidence,
+    )
+    bpy.types.Action.transfer_confidence = bpy.props.FloatProperty(
+        name="Transfer Confidence",
+        description="自动分类的置信度 (0 = 未分类或手动设置)",
+        default=0.0, min=0.0, max=1.0,
     )
+    profiling.register()
+    checkpoint.register()
 
 def unregister():
     bpy.utils.unregister_class(ApplyTransferOperator)
+    bpy.utils.unregister_class(ClassifyTransferOperator)
+    bpy.utils.unregister_class(ApplyTransferCheckpointOperator)
+    bpy.utils.unregister_class(CancelTransferOperator)
+    bpy.utils.unregister_class(VerifyTransferOperator)
+    bpy.utils.unregister_class(ExportCompressedOperator)
+    bpy.utils.unregister_class(ExportSidecarOperator)
     bpy.utils.unregister_class(RootMotionPanel)
     
     if hasattr(bpy.types.Scene, "target_armature"):
         del bpy.types.Scene.target_armature
+    if hasattr(bpy.types.Scene, "record_trajectory"):
+        del bpy.types.Scene.record_trajectory
     if hasattr(bpy.types.Action, "transfer_mode"):
         del bpy.types.Action.transfer_mode
     if hasattr(bpy.types.Action, "transfer_rotation"):
         del bpy.types.Action.transfer_rotation
+    if hasattr(bpy.types.Action, "transfer_confidence"):
+        del bpy.types.Action.transfer_confidence
+    profiling.unregister()
+    checkpoint.unregister()
 
 if __name__ == "__main__":
     register()
\ No newline at end of file